@@ -60,8 +60,87 @@ ALTER TABLE fichiers_audio ADD COLUMN date_upload TIMESTAMP DEFAULT CURRENT_TIME
 -- Mettre à jour les lignes existantes
 UPDATE fichiers_audio SET date_upload = CURRENT_TIMESTAMP WHERE date_upload IS NULL;
 
+-- Secondes de silence retirées par la pré-passe VAD
+ALTER TABLE fichiers_audio ADD COLUMN skipped_seconds FLOAT DEFAULT 0;
+
+-- Options de traitement (indications de participants) lues par l'ordonnanceur
+ALTER TABLE fichiers_audio ADD COLUMN options JSONB DEFAULT '{}';
+CREATE INDEX idx_fichiers_audio_status ON fichiers_audio(status);
+
+-- File de jobs pour les workers (app/worker.py) : bail, heartbeat et tentatives
+ALTER TABLE fichiers_audio ADD COLUMN worker_id VARCHAR(100);
+ALTER TABLE fichiers_audio ADD COLUMN lease_expires_at TIMESTAMP;
+ALTER TABLE fichiers_audio ADD COLUMN attempts INTEGER DEFAULT 0;
+ALTER TABLE fichiers_audio ADD COLUMN last_error TEXT;
+
+-- Table 5 : Statistiques de réunion (calculées à l'ingestion)
+CREATE TABLE meeting_stats (
+    id_audio INTEGER PRIMARY KEY REFERENCES fichiers_audio(id_audio) ON DELETE CASCADE,
+    
+    duration FLOAT NOT NULL,
+    num_speakers INTEGER NOT NULL,
+    num_segments INTEGER NOT NULL,
+    num_turns INTEGER NOT NULL,
+    num_interruptions INTEGER NOT NULL,
+    words_per_minute FLOAT NOT NULL,
+    speaker_stats JSONB NOT NULL,       -- {"SPEAKER_00": {"talk_time", "turns", ...}}
+    
+    computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+
+-- Table 6 : Segments stockés par blocs (SEGMENT_STORAGE=blocks, app/segment_store.py)
+-- Un bloc = jusqu'à SEGMENT_BLOCK_SIZE segments en colonnes + texte concaténé
+CREATE TABLE transcription_blocks (
+    id_audio INTEGER NOT NULL REFERENCES fichiers_audio(id_audio) ON DELETE CASCADE,
+    block_number INTEGER NOT NULL,
+    
+    first_sequence INTEGER NOT NULL,    -- sequence_number du premier segment du bloc
+    num_segments INTEGER NOT NULL,
+    starts JSONB NOT NULL,              -- [0.0, 4.2, ...]
+    ends JSONB NOT NULL,
+    speaker_dict JSONB NOT NULL,        -- ["SPEAKER_00", "SPEAKER_01"]
+    speaker_codes JSONB NOT NULL,       -- [0, 1, 0, ...] (indices dans speaker_dict)
+    text TEXT NOT NULL,                 -- textes concaténés
+    text_offsets JSONB NOT NULL,        -- num_segments + 1 offsets (en caractères)
+    -- Compaction des tours de parole (IA/compaction.py) : une entrée (ou null) par segment du bloc
+    sub_offsets JSONB,
+    
+    PRIMARY KEY (id_audio, block_number)
+);
+
+-- Format dans lequel les segments du fichier ont été écrits ('rows' ou 'blocks')
+ALTER TABLE fichiers_audio ADD COLUMN segment_storage VARCHAR(10) DEFAULT 'rows';
+
+-- Compaction des tours de parole (IA/compaction.py) : segments d'origine d'un segment fusionné
+-- [[début, fin, position dans le texte], ...], timestamps relatifs au début du segment
+ALTER TABLE transcriptions ADD COLUMN sub_offsets JSONB;
+
+-- Vue de compatibilité : les deux formats avec les colonnes de transcriptions
+CREATE VIEW transcription_segments AS
+SELECT id_audio, text_brut, start_time, end_time, speaker, sequence_number, sub_offsets
+FROM transcriptions
+UNION ALL
+SELECT b.id_audio,
+    substr(b.text, (b.text_offsets->>(i - 1))::int + 1,
+           (b.text_offsets->>i)::int - (b.text_offsets->>(i - 1))::int) AS text_brut,
+    (b.starts->>(i - 1))::float AS start_time,
+    (b.ends->>(i - 1))::float AS end_time,
+    b.speaker_dict->>((b.speaker_codes->>(i - 1))::int) AS speaker,
+    b.first_sequence + i - 1 AS sequence_number,
+    NULLIF(b.sub_offsets->(i - 1), 'null'::jsonb) AS sub_offsets
+FROM transcription_blocks b, generate_series(1, b.num_segments) AS i;
+
+-- Cycle de vie du stockage audio (app/storage.py)
+-- storage_tier : 'original' (tel qu'uploadé) → 'archived' (Opus) → 'deleted' (audio supprimé, transcription conservée)
+ALTER TABLE fichiers_audio ADD COLUMN storage_tier VARCHAR(20) DEFAULT 'original';
+ALTER TABLE fichiers_audio ADD COLUMN storage_bytes BIGINT;
+ALTER TABLE fichiers_audio ADD COLUMN archived_at TIMESTAMP;
+ALTER TABLE fichiers_audio ADD COLUMN outputs_purged_at TIMESTAMP;
 
 SELECT * FROM utilisateurs;
 SELECT * FROM fichiers_audio;
 SELECT * FROM transcriptions;
-SELECT * FROM resumes;
\ No newline at end of file
+SELECT * FROM resumes;
+SELECT * FROM meeting_stats;
+SELECT * FROM transcription_segments;
\ No newline at end of file
@@ -0,0 +1,95 @@
+# backend/IA/analytics.py
+import numpy as np
+
+
+def compute_meeting_stats(segments: list, diar_segments: list = None) -> dict:
+    """
+    Statistiques de la réunion, calculées en une passe vectorisée sur les segments.
+
+    Args:
+        segments: [{"start", "end", "speaker", "text"}, ...] (segments transcrits)
+        diar_segments: segments Pyannote (facultatif) — plus précis pour détecter
+            les interruptions car ils contiennent les chevauchements de parole
+
+    Retourne :
+    {
+        "duration": 1834.2,
+        "num_speakers": 3,
+        "num_segments": 412,
+        "num_turns": 96,
+        "num_interruptions": 14,
+        "words_per_minute": 142.7,
+        "speakers": {
+            "SPEAKER_00": {"talk_time": ..., "talk_ratio": ..., "turns": ...,
+                           "segments": ..., "words": ..., "words_per_minute": ...,
+                           "interruptions": ...},
+            ...
+        }
+    }
+    """
+    if not segments:
+        return {
+            "duration": 0.0,
+            "num_speakers": 0,
+            "num_segments": 0,
+            "num_turns": 0,
+            "num_interruptions": 0,
+            "words_per_minute": 0.0,
+            "speakers": {}
+        }
+
+    starts = np.fromiter((s["start"] for s in segments), dtype=np.float64, count=len(segments))
+    ends = np.fromiter((s["end"] for s in segments), dtype=np.float64, count=len(segments))
+    words = np.fromiter((len(s["text"].split()) for s in segments), dtype=np.float64, count=len(segments))
+    speakers, codes = np.unique([s["speaker"] for s in segments], return_inverse=True)
+    n = len(speakers)
+
+    durations = np.clip(ends - starts, 0, None)
+    talk_time = np.bincount(codes, weights=durations, minlength=n)
+    word_counts = np.bincount(codes, weights=words, minlength=n)
+    segment_counts = np.bincount(codes, minlength=n)
+
+    # Un tour de parole commence à chaque changement de speaker
+    turn_starts = np.concatenate([[True], codes[1:] != codes[:-1]])
+    turns = np.bincount(codes[turn_starts], minlength=n)
+
+    # Interruption : un speaker commence avant que le précédent ait fini
+    interruptions = np.zeros(n, dtype=np.int64)
+    source = diar_segments if diar_segments else segments
+    if len(source) > 1:
+        src = sorted(source, key=lambda s: s["start"])
+        src_starts = np.fromiter((s["start"] for s in src), dtype=np.float64, count=len(src))
+        src_ends = np.fromiter((s["end"] for s in src), dtype=np.float64, count=len(src))
+        src_speakers = np.array([s["speaker"] for s in src])
+        interrupting = (src_starts[1:] < src_ends[:-1]) & (src_speakers[1:] != src_speakers[:-1])
+        # On ne compte que les speakers présents dans la transcription
+        idx = np.searchsorted(speakers, src_speakers[1:][interrupting])
+        idx = idx[(idx < n) & (speakers[np.minimum(idx, n - 1)] == src_speakers[1:][interrupting])]
+        interruptions = np.bincount(idx, minlength=n)
+
+    duration = float(ends.max())
+    total_talk = float(talk_time.sum())
+    with np.errstate(divide="ignore", invalid="ignore"):
+        wpm = np.where(talk_time > 0, word_counts / (talk_time / 60), 0.0)
+        ratios = talk_time / total_talk if total_talk > 0 else np.zeros(n)
+
+    return {
+        "duration": duration,
+        "num_speakers": int(n),
+        "num_segments": len(segments),
+        "num_turns": int(turn_starts.sum()),
+        "num_interruptions": int(interruptions.sum()),
+        "words_per_minute": round(float(words.sum()) / (duration / 60), 1) if duration > 0 else 0.0,
+        "speakers": {
+            str(speaker): {
+                "talk_time": round(float(talk_time[i]), 1),
+                "talk_ratio": round(float(ratios[i]), 3),
+                "turns": int(turns[i]),
+                "segments": int(segment_counts[i]),
+                "words": int(word_counts[i]),
+                "words_per_minute": round(float(wpm[i]), 1),
+                "interruptions": int(interruptions[i])
+            }
+            for i, speaker in enumerate(speakers)
+        }
+    }
@@ -0,0 +1,240 @@
+# backend/IA/asr.py
+import os
+import time
+import threading
+from abc import ABC, abstractmethod
+import numpy as np
+import soundfile as sf
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ============ CONFIGURATION ============
+
+# "groq" : API Whisper Groq (historique) | "local" : Whisper CPU hors ligne | "fake" : tests
+ASR_BACKEND = os.getenv("ASR_BACKEND", "groq")
+ASR_LANGUAGE = os.getenv("ASR_LANGUAGE", "fr")
+
+GROQ_ASR_MODEL = os.getenv("GROQ_ASR_MODEL", "whisper-large-v3-turbo")
+# Serveur Groq alternatif (ex. faux serveur de loadtest/fake_groq.py) ; vide = API officielle
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+
+# Whisper local : dossier du checkpoint transformers (ex. whisper-small téléchargé au préalable)
+LOCAL_ASR_MODEL_PATH = os.getenv("LOCAL_ASR_MODEL_PATH")
+LOCAL_ASR_INT8 = os.getenv("LOCAL_ASR_INT8", "true").lower() in ("1", "true", "yes")
+LOCAL_ASR_BEAM_SIZE = int(os.getenv("LOCAL_ASR_BEAM_SIZE", "1"))
+LOCAL_ASR_CHUNK_SECONDS = float(os.getenv("LOCAL_ASR_CHUNK_SECONDS", "30"))
+# Recouvrement entre deux morceaux : un mot coupé à la frontière est entier dans l'un des deux
+LOCAL_ASR_OVERLAP_SECONDS = float(os.getenv("LOCAL_ASR_OVERLAP_SECONDS", "2"))
+LOCAL_ASR_BATCH_SIZE = int(os.getenv("LOCAL_ASR_BATCH_SIZE", "4"))
+
+# Le feature extractor Whisper complète ou tronque chaque entrée à 30 s :
+# au-delà, la fin du morceau serait perdue sans erreur
+WHISPER_MAX_CHUNK_SECONDS = 30
+
+
+class ASRBackend(ABC):
+    """
+    Interface commune de transcription.
+
+    transcribe() retourne la structure consommée par match_speaker_to_text :
+    [{"start": 0.0, "end": 4.2, "text": "..."}, ...]
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def transcribe(self, wav_path: str) -> list:
+        """Segments horodatés de l'audio"""
+
+
+class GroqWhisperBackend(ASRBackend):
+    """Whisper via l'API Groq"""
+
+    name = "groq"
+
+    def __init__(self, api_key: str = None, model: str = None):
+        self.api_key = api_key or os.getenv("GROQ_API_KEY")
+        if not self.api_key:
+            raise ValueError("❌ GROQ_API_KEY manquante pour la transcription Groq")
+        self.model = model or GROQ_ASR_MODEL
+
+    def transcribe(self, wav_path):
+        from groq import Groq
+
+        client = Groq(api_key=self.api_key, base_url=GROQ_BASE_URL)
+        with open(wav_path, "rb") as file:
+            transcription = client.audio.transcriptions.create(
+                file=file,
+                model=self.model,
+                response_format="verbose_json",
+                timestamp_granularities=["segment"],
+                language=ASR_LANGUAGE
+            )
+        return [
+            {"start": seg["start"], "end": seg["end"], "text": seg["text"]}
+            for seg in transcription.segments
+        ]
+
+
+class LocalWhisperBackend(ASRBackend):
+    """
+    Whisper local sur CPU, sans réseau.
+    Le modèle est chargé depuis le disque, quantifié int8 si demandé, et l'audio
+    est décodé par morceaux de LOCAL_ASR_CHUNK_SECONDS (30 s au plus) traités par
+    lots. Deux morceaux successifs se recouvrent de LOCAL_ASR_OVERLAP_SECONDS :
+    chaque segment n'est gardé que dans le morceau qui possède son milieu
+    (frontière au milieu du recouvrement), ce qui évite les doublons.
+    """
+
+    name = "local"
+
+    def __init__(self, model_path: str = None, int8: bool = None, beam_size: int = None,
+                 chunk_seconds: float = None, batch_size: int = None, overlap_seconds: float = None):
+        self.model_path = model_path or LOCAL_ASR_MODEL_PATH
+        if not self.model_path:
+            raise ValueError("❌ LOCAL_ASR_MODEL_PATH manquant pour la transcription locale")
+        self.int8 = LOCAL_ASR_INT8 if int8 is None else int8
+        self.beam_size = beam_size or LOCAL_ASR_BEAM_SIZE
+        self.chunk_seconds = chunk_seconds or LOCAL_ASR_CHUNK_SECONDS
+        if self.chunk_seconds > WHISPER_MAX_CHUNK_SECONDS:
+            print(f"⚠️ LOCAL_ASR_CHUNK_SECONDS={self.chunk_seconds} ramené à {WHISPER_MAX_CHUNK_SECONDS}s (limite de Whisper)")
+            self.chunk_seconds = WHISPER_MAX_CHUNK_SECONDS
+        self.overlap_seconds = LOCAL_ASR_OVERLAP_SECONDS if overlap_seconds is None else overlap_seconds
+        if not 0 <= self.overlap_seconds < self.chunk_seconds / 2:
+            raise ValueError(f"❌ Recouvrement invalide : {self.overlap_seconds}s pour des morceaux de {self.chunk_seconds}s")
+        self.batch_size = batch_size or LOCAL_ASR_BATCH_SIZE
+        self._processor = None
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._model is not None:
+                return
+            import torch
+            from transformers import WhisperProcessor, WhisperForConditionalGeneration
+
+            print(f"⏳ Chargement de Whisper local ({self.model_path})...")
+            t0 = time.perf_counter()
+            processor = WhisperProcessor.from_pretrained(self.model_path, local_files_only=True)
+            model = WhisperForConditionalGeneration.from_pretrained(self.model_path, local_files_only=True)
+            model.eval()
+            if self.int8:
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            self._processor = processor
+            self._model = model
+            print(f"✅ Whisper local chargé en {time.perf_counter() - t0:.1f}s")
+
+    def _iter_chunks(self, wav_path):
+        """
+        Morceaux recouvrants lus un par un :
+        (offset_secondes, échantillons, sample_rate, (garder_depuis, garder_jusqu_a))
+        """
+        with sf.SoundFile(wav_path) as f:
+            sr = f.samplerate
+            window = int(sr * self.chunk_seconds)
+            overlap = int(sr * self.overlap_seconds)
+            start = 0
+            while start < f.frames:
+                f.seek(start)
+                data = f.read(window, dtype="float32", always_2d=True)
+                last = start + len(data) >= f.frames
+                keep_from = (start + overlap / 2) / sr if start else float("-inf")
+                keep_until = float("inf") if last else (start + window - overlap / 2) / sr
+                yield start / sr, data.mean(axis=1), sr, (keep_from, keep_until)
+                if last:
+                    break
+                start += window - overlap
+
+    def _decode_batch(self, batch):
+        import torch
+
+        offsets = [b[0] for b in batch]
+        sr = batch[0][2]
+        features = self._processor(
+            [b[1] for b in batch], sampling_rate=sr, return_tensors="pt"
+        ).input_features
+        with torch.inference_mode():
+            generated = self._model.generate(
+                features,
+                language=ASR_LANGUAGE,
+                task="transcribe",
+                num_beams=self.beam_size,
+                return_timestamps=True
+            )
+        decoded = self._processor.batch_decode(generated, skip_special_tokens=True, output_offsets=True)
+
+        segments = []
+        for chunk_offset, (_, samples, _, (keep_from, keep_until)), result in zip(offsets, batch, decoded):
+            chunk_end = chunk_offset + len(samples) / sr
+            for part in result["offsets"]:
+                start, end = part["timestamp"]
+                text = part["text"].strip()
+                if not text:
+                    continue
+                start = chunk_offset + (start or 0.0)
+                end = min(chunk_offset + end if end is not None else chunk_end, chunk_end)
+                # Segment du recouvrement : gardé par un seul des deux morceaux
+                if not keep_from <= (start + end) / 2 < keep_until:
+                    continue
+                segments.append({"start": start, "end": end, "text": text})
+        return segments
+
+    def transcribe(self, wav_path):
+        self._load()
+        segments = []
+        batch = []
+        for chunk in self._iter_chunks(wav_path):
+            batch.append(chunk)
+            if len(batch) == self.batch_size:
+                segments.extend(self._decode_batch(batch))
+                batch = []
+        if batch:
+            segments.extend(self._decode_batch(batch))
+        return segments
+
+
+class FakeASRBackend(ASRBackend):
+    """
+    Transcription déterministe pour les tests : un segment toutes les
+    segment_seconds secondes de l'audio, avec un texte fixe ou numéroté.
+    """
+
+    name = "fake"
+
+    def __init__(self, segment_seconds: float = 5.0, texts: list = None):
+        self.segment_seconds = segment_seconds
+        self.texts = texts
+
+    def transcribe(self, wav_path):
+        duration = sf.info(wav_path).duration
+        starts = np.arange(0.0, duration, self.segment_seconds)
+        segments = []
+        for i, start in enumerate(starts):
+            text = self.texts[i % len(self.texts)] if self.texts else f"Segment numéro {i + 1}."
+            segments.append({
+                "start": float(start),
+                "end": float(min(start + self.segment_seconds, duration)),
+                "text": text
+            })
+        return segments
+
+
+BACKENDS = {
+    GroqWhisperBackend.name: GroqWhisperBackend,
+    LocalWhisperBackend.name: LocalWhisperBackend,
+    FakeASRBackend.name: FakeASRBackend,
+}
+
+_backends = {}
+
+
+def get_asr_backend(backend: str = None) -> ASRBackend:
+    """Backend de transcription partagé par le processus"""
+    backend = backend or ASR_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"❌ Backend de transcription inconnu : {backend} (disponibles : {', '.join(BACKENDS)})")
+    if backend not in _backends:
+        _backends[backend] = BACKENDS[backend]()
+    return _backends[backend]
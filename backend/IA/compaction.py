@@ -0,0 +1,89 @@
+# backend/IA/compaction.py
+"""
+Compaction des tours de parole : les segments Whisper consécutifs d'un même
+speaker sont fusionnés (dans la limite de COMPACTION_MAX_SECONDS, et tant que
+le silence entre eux ne dépasse pas COMPACTION_MAX_GAP_SECONDS).
+
+Moins de lignes en base, moins de balises [SPEAKER] répétées dans les prompts
+et moins de lignes à afficher. Les timestamps d'origine sont conservés dans
+"offsets" : un triplet [début, fin, position dans le texte] par sous-segment,
+début et fin relatifs au début du segment fusionné.
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ============ CONFIGURATION ============
+
+COMPACTION_ENABLED = os.getenv("COMPACTION_ENABLED", "true").lower() in ("1", "true", "yes")
+COMPACTION_MAX_SECONDS = float(os.getenv("COMPACTION_MAX_SECONDS", "60"))
+COMPACTION_MAX_GAP_SECONDS = float(os.getenv("COMPACTION_MAX_GAP_SECONDS", "1.0"))
+
+
+def expand_segment(seg: dict) -> list:
+    """Sous-segments d'origine d'un segment (lui-même s'il n'a pas été fusionné)"""
+    offsets = seg.get("offsets")
+    if not offsets:
+        return [{"start": seg["start"], "end": seg["end"], "speaker": seg["speaker"], "text": seg["text"]}]
+    text = seg["text"]
+    bounds = [o[2] for o in offsets] + [len(text)]
+    return [
+        {
+            "start": round(seg["start"] + o[0], 3),
+            "end": round(seg["start"] + o[1], 3),
+            "speaker": seg["speaker"],
+            "text": text[bounds[i]:bounds[i + 1]].strip()
+        }
+        for i, o in enumerate(offsets)
+    ]
+
+
+def expand_segments(segments):
+    """Inverse de compact_segments (générateur), pour les sous-titres notamment"""
+    for seg in segments:
+        yield from expand_segment(seg)
+
+
+def _merge(parts: list) -> dict:
+    start = parts[0]["start"]
+    texts, offsets, position = [], [], 0
+    for part in parts:
+        text = part["text"].strip()
+        if texts:
+            position += 1  # espace de séparation
+        offsets.append([round(part["start"] - start, 3), round(part["end"] - start, 3), position])
+        texts.append(text)
+        position += len(text)
+    merged = {
+        "start": start,
+        "end": parts[-1]["end"],
+        "speaker": parts[0]["speaker"],
+        "text": " ".join(texts)
+    }
+    if len(parts) > 1:
+        merged["offsets"] = offsets
+    return merged
+
+
+def compact_segments(segments, max_seconds: float = None, max_gap: float = None):
+    """
+    Fusionne les segments consécutifs d'un même speaker (générateur).
+    Accepte des segments déjà compactés : leurs sous-segments sont repris.
+    """
+    max_seconds = COMPACTION_MAX_SECONDS if max_seconds is None else max_seconds
+    max_gap = COMPACTION_MAX_GAP_SECONDS if max_gap is None else max_gap
+
+    parts = []
+    for seg in segments:
+        for sub in expand_segment(seg):
+            if parts:
+                same_speaker = sub["speaker"] == parts[0]["speaker"]
+                close = sub["start"] - parts[-1]["end"] <= max_gap
+                fits = sub["end"] - parts[0]["start"] <= max_seconds
+                if not (same_speaker and close and fits):
+                    yield _merge(parts)
+                    parts = []
+            parts.append(sub)
+    if parts:
+        yield _merge(parts)
@@ -0,0 +1,140 @@
+# backend/IA/compression.py
+"""
+Compression extractive du texte envoyé au LLM (compte-rendu Groq).
+
+Au lieu de tronquer la transcription, on garde les phrases les plus
+informatives jusqu'à PROMPT_TOKEN_BUDGET tokens :
+- phrases vectorisées en TF-IDF (scikit-learn), score = centralité
+  (similarité cosinus moyenne avec les autres phrases, calculée sur la
+  matrice creuse sans construire la matrice n × n)
+- les phrases de décision / d'action (« on a décidé », « il faut », « avant le »...)
+  sont retenues en priorité
+- une phrase trop proche d'une phrase déjà retenue (redondance) est écartée
+- les phrases retenues sont rendues dans l'ordre d'origine
+
+Le nombre de tokens est estimé (PROMPT_CHARS_PER_TOKEN caractères par token),
+sans tokenizer : l'ordre de grandeur suffit pour tenir le budget.
+"""
+import os
+import re
+import math
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ============ CONFIGURATION ============
+
+PROMPT_COMPRESSION = os.getenv("PROMPT_COMPRESSION", "true").lower() in ("1", "true", "yes")
+# Tokens de transcription dans le prompt du compte-rendu : ≈ la taille de l'ancienne
+# troncature (3000 caractères ≈ 750 tokens), pour un coût Groq inchangé ; un budget
+# plus grand garde plus de phrases au prix d'un prompt plus long
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "750"))
+PROMPT_CHARS_PER_TOKEN = float(os.getenv("PROMPT_CHARS_PER_TOKEN", "4"))
+# Similarité cosinus au-delà de laquelle une phrase est jugée redondante
+PROMPT_REDUNDANCY_THRESHOLD = float(os.getenv("PROMPT_REDUNDANCY_THRESHOLD", "0.6"))
+
+# Phrases courtes sans indice (« Oui. », « D'accord. ») : du bavardage
+MIN_SENTENCE_WORDS = 4
+
+STOP_WORDS = set("""
+a à ai alors au aussi autre avec avoir bah ben bon c ça ce cela ces cet cette ceux
+chez comme d dans de des du elle elles en est et été être eu eux fait faire il ils
+j je l la le les leur leurs lui m ma mais me même mes moi mon n ne ni nos notre nous
+on ou où par pas peu peut plus pour qu que quel quelle qui quoi s sa sans se ses si
+son sont sur t ta te tes toi ton tous tout très tu un une vos votre vous y oui non
+voilà donc enfin ok okay euh hum truc chose choses va vais vas fais
+""".split())
+
+# Indices de décision, d'action et d'échéance (recherchés en minuscules)
+CUE_PATTERNS = [
+    r"\bdécid", r"\bvalid", r"\bd'accord pour\b", r"\bon part sur\b", r"\bon retient\b",
+    r"\bconclu", r"\bil faut\b", r"\bil faudra", r"\bdoit\b", r"\bdoivent\b", r"\bdevra",
+    r"\bje m'en occupe\b", r"\bje (?:vais|peux) (?:m'en charger|le faire|envoyer|préparer)",
+    r"\bon (?:va|doit)\b", r"\baction", r"\bresponsable\b", r"\bchargée? de\b",
+    r"\bavant (?:le|la|lundi|mardi|mercredi|jeudi|vendredi|demain|la fin)\b",
+    r"\bd'ici\b", r"\béchéance", r"\bdeadline\b", r"\bdate limite\b",
+    r"\bprochaine (?:réunion|étape|fois)\b", r"\bbudget\b", r"\blivr",
+]
+CUE_RE = re.compile("|".join(CUE_PATTERNS))
+
+SENTENCE_RE = re.compile(r"[^.!?\n]+[.!?]*")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / PROMPT_CHARS_PER_TOKEN)
+
+
+def split_sentences(text: str) -> list:
+    return [s.strip() for s in SENTENCE_RE.findall(text) if s.strip()]
+
+
+def has_cue(sentence: str) -> bool:
+    return CUE_RE.search(sentence.lower()) is not None
+
+
+def score_sentences(sentences: list):
+    """
+    Matrice TF-IDF normalisée (creuse) et centralité de chaque phrase
+    (similarité cosinus moyenne avec les autres).
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer(
+        lowercase=True,
+        token_pattern=r"(?u)\b\w\w+\b",
+        stop_words=list(STOP_WORDS),
+        sublinear_tf=True
+    )
+    try:
+        matrix = vectorizer.fit_transform(sentences)
+    except ValueError:
+        # Que des mots vides : aucune phrase ne se distingue
+        return None, np.zeros(len(sentences))
+    # Σ_j cos(i, j) = x_i · Σ_j x_j (lignes normalisées) : O(nnz), sans matrice n × n
+    totals = np.asarray(matrix @ matrix.sum(axis=0).T).ravel()
+    self_similarity = np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel()
+    centrality = (totals - self_similarity) / max(len(sentences) - 1, 1)
+    return matrix, centrality
+
+
+def compress_text(text: str, token_budget: int = None, redundancy_threshold: float = None) -> str:
+    """
+    Texte réduit à token_budget tokens (estimés) par sélection de phrases.
+    Un texte déjà sous le budget est rendu tel quel.
+    """
+    token_budget = token_budget or PROMPT_TOKEN_BUDGET
+    redundancy_threshold = PROMPT_REDUNDANCY_THRESHOLD if redundancy_threshold is None else redundancy_threshold
+    if estimate_tokens(text) <= token_budget:
+        return text
+
+    sentences = split_sentences(text)
+    if not sentences:
+        return text[:int(token_budget * PROMPT_CHARS_PER_TOKEN)]
+
+    matrix, centrality = score_sentences(sentences)
+    cues = np.array([has_cue(s) for s in sentences])
+    lengths = np.array([len(s.split()) for s in sentences])
+    eligible = cues | (lengths >= MIN_SENTENCE_WORDS)
+
+    # Indices de décision / action d'abord, puis les plus centrales
+    order = sorted(np.flatnonzero(eligible), key=lambda i: (not cues[i], -centrality[i]))
+
+    selected = []
+    used = 0
+    max_chars = token_budget * PROMPT_CHARS_PER_TOKEN
+    # Similarité maximale de chaque phrase avec les phrases déjà retenues
+    closest = np.zeros(len(sentences))
+    for i in order:
+        cost = len(sentences[i]) + 1
+        if used + cost > max_chars or closest[i] > redundancy_threshold:
+            continue
+        selected.append(i)
+        used += cost
+        if matrix is not None:
+            closest = np.maximum(closest, (matrix @ matrix[i].T).toarray().ravel())
+
+    if not selected:
+        # Une seule phrase plus longue que le budget : on la coupe
+        return text[:int(max_chars)]
+    return " ".join(sentences[i] for i in sorted(selected))
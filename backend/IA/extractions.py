@@ -1,6 +1,22 @@
 # backend/IA/extractions.py
 import re
 
+
+def format_time(seconds):
+    """Temps en mm:ss.s"""
+    minutes = int(seconds // 60)
+    secs = seconds % 60
+    return f"{minutes:02d}:{secs:04.1f}"
+
+
+def format_segments(segments):
+    """Formate les segments : [mm:ss.s - mm:ss.s] [SPEAKER] texte"""
+    return [
+        f"[{format_time(seg['start'])} - {format_time(seg['end'])}] [{seg['speaker']}] {seg['text']}"
+        for seg in segments
+    ]
+
+
 def extract_pure_text(transcription_with_meta: str) -> str:
     """
     Extrait uniquement le texte parlé d'une transcription avec timestamps et speakers.
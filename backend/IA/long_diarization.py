@@ -0,0 +1,162 @@
+# backend/IA/long_diarization.py
+import os
+import numpy as np
+import soundfile as sf
+import torch
+from dotenv import load_dotenv
+from sklearn.cluster import AgglomerativeClustering
+
+load_dotenv()
+
+# ============ CONFIGURATION ============
+
+# "auto" : fenêtré au-delà de LONG_FORM_THRESHOLD_SECONDS | "full" | "windowed"
+DIARIZATION_MODE = os.getenv("DIARIZATION_MODE", "auto")
+LONG_FORM_THRESHOLD_SECONDS = float(os.getenv("LONG_FORM_THRESHOLD_SECONDS", "3600"))
+# Taille des fenêtres et recouvrement : la mémoire dépend de la fenêtre, pas de la durée totale
+DIARIZATION_WINDOW_SECONDS = float(os.getenv("DIARIZATION_WINDOW_SECONDS", "600"))
+DIARIZATION_WINDOW_OVERLAP = float(os.getenv("DIARIZATION_WINDOW_OVERLAP", "30"))
+# Distance cosinus maximale pour considérer deux speakers de fenêtres différentes comme la même personne
+WINDOW_CLUSTER_THRESHOLD = float(os.getenv("WINDOW_CLUSTER_THRESHOLD", "0.5"))
+
+
+def use_windowed_mode(wav_path: str) -> bool:
+    """Choisit le mode fenêtré selon DIARIZATION_MODE et la durée de l'audio"""
+    if DIARIZATION_MODE == "windowed":
+        return True
+    if DIARIZATION_MODE == "full":
+        return False
+    return sf.info(wav_path).duration > LONG_FORM_THRESHOLD_SECONDS
+
+
+def iter_windows(wav_path: str, window_seconds: float, overlap_seconds: float):
+    """
+    Fenêtres recouvrantes lues une par une depuis le disque.
+    Retourne (start, end, core_start, core_end, waveform, sample_rate) :
+    chaque fenêtre « possède » sa zone centrale [core_start, core_end).
+    """
+    with sf.SoundFile(wav_path) as f:
+        sr = f.samplerate
+        total = f.frames / sr
+        step = max(window_seconds - overlap_seconds, 1.0)
+        start = 0.0
+        while start < total:
+            end = min(start + window_seconds, total)
+            core_start = 0.0 if start == 0 else start + overlap_seconds / 2
+            core_end = total if end >= total else end - overlap_seconds / 2
+
+            f.seek(int(start * sr))
+            data = f.read(int((end - start) * sr), dtype="float32", always_2d=True)
+            waveform = torch.from_numpy(data.mean(axis=1)).unsqueeze(0)
+            yield start, end, core_start, core_end, waveform, sr
+
+            if end >= total:
+                break
+            start += step
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def cluster_window_speakers(embeddings: np.ndarray, num_speakers: int = None,
+                            threshold: float = WINDOW_CLUSTER_THRESHOLD) -> np.ndarray:
+    """Regroupe les speakers locaux de toutes les fenêtres en speakers globaux"""
+    if len(embeddings) == 0:
+        return np.zeros(0, dtype=np.int64)
+    if len(embeddings) == 1:
+        return np.zeros(1, dtype=np.int64)
+    if num_speakers:
+        clustering = AgglomerativeClustering(
+            n_clusters=min(num_speakers, len(embeddings)), metric="cosine", linkage="average"
+        )
+    else:
+        clustering = AgglomerativeClustering(
+            n_clusters=None, distance_threshold=threshold, metric="cosine", linkage="average"
+        )
+    return clustering.fit_predict(_normalize(embeddings))
+
+
+def diarize_windowed(pipeline, wav_path: str, num_speakers=None, min_speakers=None, max_speakers=None,
+                     window_seconds: float = None, overlap_seconds: float = None):
+    """
+    Diarisation longue durée à mémoire bornée.
+
+    Pyannote tourne sur des fenêtres recouvrantes ; les speakers de chaque fenêtre
+    sont rapprochés par clustering de leurs embeddings, puis les segments sont
+    fusionnés en une seule liste continue.
+
+    Retourne (segments, speaker_embeddings), comme diarize().
+    """
+    window_seconds = window_seconds or DIARIZATION_WINDOW_SECONDS
+    overlap_seconds = DIARIZATION_WINDOW_OVERLAP if overlap_seconds is None else overlap_seconds
+
+    # Dans une fenêtre, on ne connaît qu'une borne supérieure du nombre de participants
+    window_hints = {}
+    if num_speakers or max_speakers:
+        window_hints["max_speakers"] = num_speakers or max_speakers
+
+    local_segments = []    # (fenêtre, label local, start, end)
+    local_keys = []        # (fenêtre, label local) avec embedding valide
+    local_embeddings = []
+    orphan_keys = []       # speakers trop courts pour avoir un embedding
+
+    for w, (start, end, core_start, core_end, waveform, sr) in enumerate(
+            iter_windows(wav_path, window_seconds, overlap_seconds)):
+        print(f"🪟 Fenêtre {w + 1} : {start:.0f}s → {end:.0f}s")
+        diarization, embeddings = pipeline(
+            {"waveform": waveform, "sample_rate": sr}, return_embeddings=True, **window_hints
+        )
+        del waveform
+
+        for turn, _, label in diarization.itertracks(yield_label=True):
+            seg_start = max(start + turn.start, core_start)
+            seg_end = min(start + turn.end, core_end)
+            if seg_end > seg_start:
+                local_segments.append((w, label, seg_start, seg_end))
+
+        for i, label in enumerate(diarization.labels()):
+            emb = np.asarray(embeddings[i], dtype=np.float32) if embeddings is not None else None
+            if emb is not None and np.isfinite(emb).all():
+                local_keys.append((w, label))
+                local_embeddings.append(emb)
+            else:
+                orphan_keys.append((w, label))
+
+    # Rapprochement des speakers entre fenêtres
+    matrix = np.stack(local_embeddings) if local_embeddings else np.zeros((0, 0), dtype=np.float32)
+    clusters = cluster_window_speakers(matrix, num_speakers=num_speakers)
+    global_ids = {key: int(c) for key, c in zip(local_keys, clusters)}
+    next_id = int(clusters.max()) + 1 if len(clusters) else 0
+    for key in orphan_keys:
+        global_ids[key] = next_id
+        next_id += 1
+
+    # Labels globaux numérotés par ordre d'apparition
+    local_segments.sort(key=lambda s: s[2])
+    names = {}
+    for w, label, _, _ in local_segments:
+        gid = global_ids[(w, label)]
+        if gid not in names:
+            names[gid] = f"SPEAKER_{len(names):02d}"
+
+    # Fusion des segments coupés aux frontières des fenêtres
+    segments = []
+    for w, label, seg_start, seg_end in local_segments:
+        speaker = names[global_ids[(w, label)]]
+        if segments and segments[-1]["speaker"] == speaker and seg_start - segments[-1]["end"] <= 0.05:
+            segments[-1]["end"] = max(segments[-1]["end"], seg_end)
+        else:
+            segments.append({"start": seg_start, "end": seg_end, "speaker": speaker})
+
+    # Un embedding (centroïde) par speaker global, pour l'index des participants
+    speaker_embeddings = {}
+    for gid, name in names.items():
+        members = [local_embeddings[i] for i, key in enumerate(local_keys) if global_ids[key] == gid]
+        if members:
+            centroid = _normalize(np.stack(members)).mean(axis=0)
+            speaker_embeddings[name] = centroid.astype(np.float32)
+
+    return segments, speaker_embeddings
@@ -1,13 +1,44 @@
 # backend/IA/pipeline_service.py
 import os
+import json
+from collections.abc import Mapping
+from contextlib import nullcontext
 from typing import Dict, Tuple
 from datetime import datetime
-from .transcriptiondiarization import transcription_with_diarization
-from .extractions import extract_pure_text, extract_by_speaker
+from .extractions import extract_pure_text, extract_by_speaker, format_segments
 from .cleaning import clean_text
 from .resume import summarize_text_local
-from .save_pdf import save_files
-from .resume import generate_compte_rendu
+from .save_pdf import save_files, save_files_parts
+from .resume import generate_compte_rendu, generate_structured_report, SUMMARY_MODE
+from .speaker_index import SpeakerIndex, save_meeting_embeddings
+from .analytics import compute_meeting_stats
+from .compaction import COMPACTION_ENABLED, compact_segments
+
+# Mode streaming : les étapes travaillent segment par segment et les textes
+# volumineux sont écrits dans output_dir au lieu d'être gardés en mémoire
+PIPELINE_STREAMING = os.getenv("PIPELINE_STREAMING", "false").lower() in ("1", "true", "yes")
+# Plafond mémoire (Mo) pour les textes relus depuis le disque (résumés)
+PIPELINE_MEMORY_LIMIT_MB = int(os.getenv("PIPELINE_MEMORY_LIMIT_MB", "256"))
+
+
+class SpeakerTextFiles(Mapping):
+    """
+    Textes nettoyés par speaker, relus depuis leur fichier à chaque accès :
+    un seul texte en mémoire à la fois (mode streaming, résumé "llm").
+    """
+    
+    def __init__(self, paths: dict, read):
+        self._paths = paths
+        self._read = read
+    
+    def __getitem__(self, speaker):
+        return clean_text(self._read(self._paths[speaker]))
+    
+    def __iter__(self):
+        return iter(self._paths)
+    
+    def __len__(self):
+        return len(self._paths)
 
 
 class TranscriptionPipeline:
@@ -16,9 +47,31 @@ class TranscriptionPipeline:
     Peut être utilisé par l'API ou en standalone.
     """
     
-    def __init__(self, audio_file: str, output_dir: str = None):
+    def __init__(self, audio_file: str, output_dir: str = None, user_id: int = None,
+                 num_speakers: int = None, min_speakers: int = None, max_speakers: int = None,
+                 streaming: bool = None, memory_limit_mb: int = None, profiler=None,
+                 compaction: bool = None, summary_mode: str = None):
         self.audio_file = audio_file
         self.output_dir = output_dir or os.getcwd()
+        # Mode streaming : mémoire bornée quelle que soit la durée de la réunion
+        self.streaming = PIPELINE_STREAMING if streaming is None else streaming
+        memory_limit_mb = memory_limit_mb or PIPELINE_MEMORY_LIMIT_MB
+        # Jusqu'à 4 octets par caractère ; on garde de la marge pour les modèles
+        self.max_text_chars = memory_limit_mb * 1024 * 1024 // 8
+        # Si user_id est fourni, les participants déjà connus de l'utilisateur sont reconnus
+        self.user_id = user_id
+        # Indications sur le nombre de participants, transmises à Pyannote
+        self.speaker_hints = {
+            "num_speakers": num_speakers,
+            "min_speakers": min_speakers,
+            "max_speakers": max_speakers
+        }
+        # Profilage optionnel (IA/profiling.JobProfiler) ; None = aucun surcoût
+        self.profiler = profiler
+        # Fusion des segments consécutifs d'un même speaker (IA/compaction.py)
+        self.compaction = COMPACTION_ENABLED if compaction is None else compaction
+        # "local" (BART par speaker) ou "llm" (un seul appel Groq pour tous les résumés)
+        self.summary_mode = summary_mode or SUMMARY_MODE
         
         # Résultats du pipeline
         self.raw_transcription = None
@@ -30,6 +83,17 @@ class TranscriptionPipeline:
         self.pdf_path = None
         self.docx_path = None
         self.num_speakers = 0
+        self.speaker_embeddings = {}
+        self.speaker_mapping = {}
+        self.vad_stats = None
+        self.segments = []
+        self.diar_segments = []
+        self.stats = None
+        
+        # Fichiers de débordement (mode streaming)
+        self.segments_path = os.path.join(self.output_dir, "segments.jsonl")
+        self.cleaned_text_path = os.path.join(self.output_dir, "transcription_nettoyee.txt")
+        self.by_speaker_paths = {}
         
     def run(self, save_intermediary_files: bool = False) -> Dict:
         """
@@ -41,13 +105,32 @@ class TranscriptionPipeline:
         Returns:
             Dict contenant tous les résultats du pipeline
         """
+        if self.streaming:
+            return self._run_streaming(save_intermediary_files)
         
         # 1️⃣ Transcription avec diarisation
         print("\n" + "="*60)
         print("🎤 ÉTAPE 1 : TRANSCRIPTION + DIARISATION")
         print("="*60)
         
-        self.raw_transcription = transcription_with_diarization(self.audio_file)
+        transcription = self._transcribe()
+        self.segments = transcription["segments"]
+        self.diar_segments = transcription["diar_segments"]
+        self.speaker_embeddings = transcription["speaker_embeddings"]
+        self.speaker_mapping = transcription["speaker_mapping"]
+        self.vad_stats = transcription["vad"]
+        
+        # Empreintes vocales conservées pour pouvoir nommer les participants ensuite
+        if self.speaker_embeddings:
+            save_meeting_embeddings(self.speaker_embeddings, self.output_dir)
+        
+        # 📊 Statistiques de la réunion (calculées une seule fois, à l'ingestion, sur les segments d'origine)
+        self.stats = compute_meeting_stats(self.segments, self.diar_segments)
+        print(f"📊 {self.stats['num_turns']} tours de parole, {self.stats['num_interruptions']} interruptions, "
+              f"{self.stats['words_per_minute']} mots/min")
+        
+        self.segments = list(self._compact(self.segments))
+        self.raw_transcription = "\n".join(format_segments(self.segments))
         
         if save_intermediary_files:
             raw_file = os.path.join(self.output_dir, "transcription_brute_avec_meta.txt")
@@ -55,6 +138,56 @@ class TranscriptionPipeline:
                 f.write(self.raw_transcription)
             print(f"✅ Transcription complète sauvegardée : {raw_file}")
         
+        return self._run_downstream(save_intermediary_files)
+    
+    def regenerate(self, segments, save_intermediary_files: bool = False) -> Dict:
+        """
+        Reconstruit les résultats dérivés (texte nettoyé, résumés, documents) à partir
+        de segments déjà transcrits, sans relancer la diarisation ni la transcription.
+        
+        Args:
+            segments: itérable de {"start", "end", "speaker", "text"} (ex. lignes de la table transcriptions)
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        
+        if self.streaming:
+            with open(self.segments_path, "w", encoding="utf-8") as f:
+                for seg in self._compact(segments):
+                    f.write(json.dumps(seg, ensure_ascii=False) + "\n")
+            return self._run_streaming_downstream(save_intermediary_files)
+        
+        self.segments = list(self._compact(segments))
+        self.raw_transcription = "\n".join(format_segments(self.segments))
+        return self._run_downstream(save_intermediary_files)
+    
+    def rebuild_documents(self, segments, summary: str) -> Dict:
+        """
+        Réécrit seulement le PDF/Word avec un nouveau compte-rendu (ex. régénéré en
+        streaming), sans refaire les résumés. Le texte nettoyé est reconstruit
+        segment par segment, comme en mode streaming.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.summary = summary
+        speakers = set()
+        with open(self.cleaned_text_path, "w", encoding="utf-8") as f:
+            for seg in segments:
+                text = seg["text"].strip()
+                if not text:
+                    continue
+                speakers.add(seg["speaker"])
+                f.write(clean_text(text) + "\n")
+        self.num_speakers = len(speakers)
+        
+        base_name = os.path.join(self.output_dir, "transcription_finale")
+        with self._stage("documents"):
+            save_files_parts(self._iter_final_content, base_name=base_name)
+        self.pdf_path = f"{base_name}.pdf"
+        self.docx_path = f"{base_name}.docx"
+        return {"pdf_path": self.pdf_path, "docx_path": self.docx_path}
+    
+    def _run_downstream(self, save_intermediary_files: bool = False) -> Dict:
+        """Étapes 2 à 6, à partir de self.raw_transcription"""
+        
         # 2️⃣ Extraction du texte pur
         print("\n" + "="*60)
         print("📝 ÉTAPE 2 : EXTRACTION DU TEXTE PUR")
@@ -90,37 +223,53 @@ class TranscriptionPipeline:
         print("📋 ÉTAPE 4 : GÉNÉRATION DU RÉSUMÉ")
         print("="*60)
         
-        try:
-            print("📋 Génération du compte-rendu structuré...")
-            compte_rendu_data = generate_compte_rendu(
-            self.cleaned_text, 
-            self.speaker_summaries
+        self.by_speaker = extract_by_speaker(self.raw_transcription)
+        structured = None
+        if self.summary_mode == "llm":
+            structured = self._structured_report(
+                self.cleaned_text,
+                {speaker: clean_text(text) for speaker, text in self.by_speaker.items()}
             )
-            self.summary = compte_rendu_data["compte_rendu_complet"]
-            self.resume_court = compte_rendu_data["resume_court"]
-        except Exception as e:
-            print(f"⚠️ Erreur génération compte-rendu: {e}")
-            self.summary = self.cleaned_text[:500] + "..."
-            self.resume_court = self.summary
+        
+        if structured:
+            self.summary = structured["compte_rendu_complet"]
+            self.resume_court = structured["resume_court"]
+        else:
+            try:
+                print("📋 Génération du compte-rendu structuré...")
+                with self._stage("compte_rendu"):
+                    compte_rendu_data = generate_compte_rendu(
+                    self.cleaned_text, 
+                    self.speaker_summaries
+                    )
+                self.summary = compte_rendu_data["compte_rendu_complet"]
+                self.resume_court = compte_rendu_data["resume_court"]
+            except Exception as e:
+                print(f"⚠️ Erreur génération compte-rendu: {e}")
+                self.summary = self.cleaned_text[:500] + "..."
+                self.resume_court = self.summary
         
         # 5️⃣ Organisation par locuteur
         print("\n" + "="*60)
         print("👥 ÉTAPE 5 : ORGANISATION PAR LOCUTEUR")
         print("="*60)
         
-        self.by_speaker = extract_by_speaker(self.raw_transcription)
         self.num_speakers = len(self.by_speaker)
         
-        for speaker, text in self.by_speaker.items():
-            print(f"📝 Génération du résumé pour {speaker}...")
-            try:
-                cleaned_speaker_text = clean_text(text)
-                speaker_summary = summarize_text_local(cleaned_speaker_text, max_length=100, min_length=30)
-                self.speaker_summaries[speaker] = speaker_summary
-            except Exception as e:
-                print(f"⚠️ Erreur résumé {speaker}: {e}")
-                cleaned_speaker_text = clean_text(text)
-                self.speaker_summaries[speaker] = cleaned_speaker_text[:200] + "..."
+        # Une seule mesure pour toute la boucle (le profileur torch ne s'ouvre qu'une fois)
+        with self._stage("resumes_par_speaker", torch_ops=True):
+            for speaker, text in self.by_speaker.items():
+                if speaker in self.speaker_summaries:
+                    continue
+                print(f"📝 Génération du résumé pour {speaker}...")
+                try:
+                    cleaned_speaker_text = clean_text(text)
+                    speaker_summary = summarize_text_local(cleaned_speaker_text, max_length=100, min_length=30)
+                    self.speaker_summaries[speaker] = speaker_summary
+                except Exception as e:
+                    print(f"⚠️ Erreur résumé {speaker}: {e}")
+                    cleaned_speaker_text = clean_text(text)
+                    self.speaker_summaries[speaker] = cleaned_speaker_text[:200] + "..."
         
         if save_intermediary_files:
             speaker_file = os.path.join(self.output_dir, "résumé_par_locuteur.txt")
@@ -142,7 +291,8 @@ class TranscriptionPipeline:
         final_content = self._build_final_content()
         
         base_name = os.path.join(self.output_dir, "transcription_finale")
-        save_files(final_content, base_name=base_name)
+        with self._stage("documents"):
+            save_files(final_content, base_name=base_name)
         
         self.pdf_path = f"{base_name}.pdf"
         self.docx_path = f"{base_name}.docx"
@@ -155,6 +305,246 @@ class TranscriptionPipeline:
         
         return self.get_results()
     
+    def _run_streaming(self, save_intermediary_files: bool = False) -> Dict:
+        """
+        Pipeline à mémoire bornée : les segments sont écrits dans segments.jsonl,
+        puis chaque étape les relit un par un. Le nettoyage se fait segment par
+        segment ; les textes envoyés aux résumés sont limités à max_text_chars.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        
+        # 1️⃣ Transcription avec diarisation
+        print("\n" + "="*60)
+        print("🎤 ÉTAPE 1 : TRANSCRIPTION + DIARISATION (streaming)")
+        print("="*60)
+        
+        transcription = self._transcribe()
+        self.speaker_embeddings = transcription["speaker_embeddings"]
+        self.speaker_mapping = transcription["speaker_mapping"]
+        self.vad_stats = transcription["vad"]
+        if self.speaker_embeddings:
+            save_meeting_embeddings(self.speaker_embeddings, self.output_dir)
+        
+        self.stats = compute_meeting_stats(transcription["segments"], transcription["diar_segments"])
+        
+        num_segments = 0
+        with open(self.segments_path, "w", encoding="utf-8") as f:
+            for seg in self._compact(transcription["segments"]):
+                f.write(json.dumps(seg, ensure_ascii=False) + "\n")
+                num_segments += 1
+        print(f"✅ {num_segments} segments écrits : {self.segments_path}")
+        
+        # On ne garde plus rien de la transcription en mémoire
+        del transcription
+        
+        return self._run_streaming_downstream(save_intermediary_files)
+    
+    def _run_streaming_downstream(self, save_intermediary_files: bool = False) -> Dict:
+        """Étapes 2 à 6 en streaming, à partir de segments.jsonl"""
+        if save_intermediary_files:
+            raw_file = os.path.join(self.output_dir, "transcription_brute_avec_meta.txt")
+            with open(raw_file, "w", encoding="utf-8") as f:
+                for line in format_segments(self.iter_segments()):
+                    f.write(line + "\n")
+            print(f"✅ Transcription complète sauvegardée : {raw_file}")
+        
+        # 2️⃣ 3️⃣ Extraction, nettoyage et répartition par locuteur en une passe
+        print("\n" + "="*60)
+        print("🧹 ÉTAPES 2-3 : EXTRACTION + NETTOYAGE (streaming)")
+        print("="*60)
+        
+        speakers_dir = os.path.join(self.output_dir, "speakers")
+        os.makedirs(speakers_dir, exist_ok=True)
+        speaker_files = {}
+        pure_chars = cleaned_chars = 0
+        pure_file = open(os.path.join(self.output_dir, "transcription_texte_pur.txt"), "w", encoding="utf-8") \
+            if save_intermediary_files else None
+        try:
+            with open(self.cleaned_text_path, "w", encoding="utf-8") as cleaned_file:
+                for seg in self.iter_segments():
+                    text = seg["text"].strip()
+                    if not text:
+                        continue
+                    cleaned = clean_text(text)
+                    pure_chars += len(text)
+                    cleaned_chars += len(cleaned)
+                    if pure_file:
+                        pure_file.write(text + "\n")
+                    cleaned_file.write(cleaned + "\n")
+                    
+                    speaker = seg["speaker"]
+                    if speaker not in speaker_files:
+                        path = os.path.join(speakers_dir, f"speaker_{len(speaker_files):02d}.txt")
+                        self.by_speaker_paths[speaker] = path
+                        speaker_files[speaker] = open(path, "w", encoding="utf-8")
+                    speaker_files[speaker].write(text + "\n")
+        finally:
+            if pure_file:
+                pure_file.close()
+            for f in speaker_files.values():
+                f.close()
+        
+        self.num_speakers = len(self.by_speaker_paths)
+        print(f"📊 Réduction : {pure_chars} → {cleaned_chars} caractères")
+        
+        # 4️⃣ Résumé (sur un extrait borné du texte nettoyé)
+        print("\n" + "="*60)
+        print("📋 ÉTAPE 4 : GÉNÉRATION DU RÉSUMÉ")
+        print("="*60)
+        
+        cleaned_excerpt = self._read_text(self.cleaned_text_path)
+        structured = None
+        if self.summary_mode == "llm":
+            # Même prompt qu'en mode normal ; les textes sont relus à la demande
+            structured = self._structured_report(
+                cleaned_excerpt,
+                SpeakerTextFiles(self.by_speaker_paths, self._read_text)
+            )
+        
+        if structured:
+            self.summary = structured["compte_rendu_complet"]
+            self.resume_court = structured["resume_court"]
+        else:
+            try:
+                with self._stage("compte_rendu"):
+                    compte_rendu_data = generate_compte_rendu(cleaned_excerpt, self.speaker_summaries)
+                self.summary = compte_rendu_data["compte_rendu_complet"]
+                self.resume_court = compte_rendu_data["resume_court"]
+            except Exception as e:
+                print(f"⚠️ Erreur génération compte-rendu: {e}")
+                self.summary = cleaned_excerpt[:500] + "..."
+                self.resume_court = self.summary
+        del cleaned_excerpt
+        
+        # 5️⃣ Résumés par locuteur, un fichier à la fois
+        print("\n" + "="*60)
+        print("👥 ÉTAPE 5 : ORGANISATION PAR LOCUTEUR")
+        print("="*60)
+        
+        with self._stage("resumes_par_speaker", torch_ops=True):
+            for speaker, path in self.by_speaker_paths.items():
+                if speaker in self.speaker_summaries:
+                    continue
+                print(f"📝 Génération du résumé pour {speaker}...")
+                cleaned_speaker_text = clean_text(self._read_text(path))
+                try:
+                    self.speaker_summaries[speaker] = summarize_text_local(cleaned_speaker_text, max_length=100, min_length=30)
+                except Exception as e:
+                    print(f"⚠️ Erreur résumé {speaker}: {e}")
+                    self.speaker_summaries[speaker] = cleaned_speaker_text[:200] + "..."
+        
+        print(f"👥 Nombre de locuteurs : {self.num_speakers}")
+        
+        # 6️⃣ Génération PDF et Word, paragraphe par paragraphe
+        print("\n" + "="*60)
+        print("📄 ÉTAPE 6 : GÉNÉRATION PDF/WORD")
+        print("="*60)
+        
+        base_name = os.path.join(self.output_dir, "transcription_finale")
+        with self._stage("documents"):
+            save_files_parts(self._iter_final_content, base_name=base_name)
+        
+        self.pdf_path = f"{base_name}.pdf"
+        self.docx_path = f"{base_name}.docx"
+        
+        print("\n" + "="*60)
+        print("🎉 TRAITEMENT TERMINÉ")
+        print("="*60)
+        print(f"📂 Dossier de sortie : {self.output_dir}")
+        
+        return self.get_results()
+    
+    def _transcribe(self) -> Dict:
+        """
+        Diarisation + transcription de l'audio.
+        Import différé : Pyannote (et HUGGINGFACE_TOKEN) n'est chargé que pour
+        transcrire, pas pour regenerate() qui repart des segments stockés.
+        """
+        from .transcriptiondiarization import run_transcription
+        
+        speaker_index = SpeakerIndex.load(self.user_id) if self.user_id is not None else None
+        with self._stage("transcription_diarisation", torch_ops=True):
+            return run_transcription(
+                self.audio_file,
+                speaker_index=speaker_index,
+                speaker_hints=self.speaker_hints
+            )
+    
+    def _compact(self, segments):
+        """Segments compactés si la compaction est active (générateur)"""
+        if not self.compaction:
+            yield from segments
+            return
+        count = compacted = 0
+        for seg in compact_segments(segments):
+            count += len(seg.get("offsets") or [None])
+            compacted += 1
+            yield seg
+        print(f"🧱 Compaction : {count} → {compacted} segments")
+    
+    def _structured_report(self, cleaned_text: str, speaker_texts):
+        """
+        Mode "llm" : compte-rendu et résumés par speaker en un seul appel Groq.
+        Remplit speaker_summaries ; None en cas d'échec (l'appelant repasse en mode local).
+        Les speakers oubliés par le modèle sont résumés ensuite par BART.
+        """
+        print(f"📋 Compte-rendu et résumés de {len(speaker_texts)} speakers en un seul appel...")
+        try:
+            with self._stage("compte_rendu_structure"):
+                structured = generate_structured_report(cleaned_text, speaker_texts)
+        except Exception as e:
+            print(f"⚠️ Erreur appel unique, retour au mode local : {e}")
+            return None
+        self.speaker_summaries.update(structured["speaker_summaries"])
+        missing = set(speaker_texts) - set(structured["speaker_summaries"])
+        if missing:
+            print(f"⚠️ Résumés manquants (repli BART) : {', '.join(sorted(missing))}")
+        return structured
+    
+    def _stage(self, name: str, torch_ops: bool = False):
+        """Mesure d'une étape si le profilage est actif, sinon contexte vide"""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.stage(name, torch_ops=torch_ops)
+    
+    def iter_segments(self):
+        """Segments de la transcription, un par un (relus depuis segments.jsonl en mode streaming)"""
+        if not self.streaming:
+            yield from self.segments
+            return
+        with open(self.segments_path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+    
+    def _read_text(self, path: str) -> str:
+        """Relit un fichier texte, tronqué à max_text_chars caractères"""
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read(self.max_text_chars)
+        return " ".join(text.split("\n"))
+    
+    def _iter_final_content(self, paragraph_chars: int = 2000):
+        """Contenu final pour PDF/Word, produit paragraphe par paragraphe"""
+        yield f"""COMPTE-RENDU DE RÉUNION
+Date : {datetime.now().strftime("%d/%m/%Y")}
+Nombre de participants : {self.num_speakers}"""
+        yield '='*70
+        yield self.summary
+        yield '='*70
+        yield "TRANSCRIPTION COMPLÈTE"
+        
+        paragraph = []
+        size = 0
+        with open(self.cleaned_text_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                paragraph.append(line)
+                size += len(line) + 1
+                if size >= paragraph_chars:
+                    yield " ".join(paragraph)
+                    paragraph, size = [], 0
+        if paragraph:
+            yield " ".join(paragraph)
+    
     def _build_final_content(self) -> str:
         """Construit le contenu final pour PDF/Word avec format professionnel"""
     
@@ -179,14 +569,23 @@ TRANSCRIPTION COMPLÈTE
         """Retourne tous les résultats du pipeline"""
         return {
             "raw_transcription": self.raw_transcription,
+            "segments": self.segments,
+            "stats": self.stats,
             "pure_text": self.pure_text,
             "cleaned_text": self.cleaned_text,
             "summary": self.summary,
             "by_speaker": self.by_speaker,
             "speaker_summaries": self.speaker_summaries,
             "num_speakers": self.num_speakers,
+            "speaker_mapping": self.speaker_mapping,
+            "skipped_seconds": self.vad_stats["skipped_seconds"] if self.vad_stats else 0.0,
             "pdf_path": self.pdf_path,
-            "docx_path": self.docx_path
+            "docx_path": self.docx_path,
+            # Mode streaming : les textes sont dans ces fichiers plutôt qu'en mémoire
+            "streaming": self.streaming,
+            "segments_path": self.segments_path if self.streaming else None,
+            "cleaned_text_path": self.cleaned_text_path if self.streaming else None,
+            "by_speaker_paths": self.by_speaker_paths
         }
     
     def get_speaker_data(self) -> list:
@@ -0,0 +1,148 @@
+# backend/IA/profiling.py
+"""
+Profilage optionnel d'un traitement (un job = un fichier audio).
+
+- Échantillonneur : un thread relève la pile du thread du job toutes les
+  PROFILE_INTERVAL_MS millisecondes et compte les piles identiques. Le résultat
+  est écrit au format « folded » (une ligne « a;b;c N » par pile), lisible par
+  flamegraph.pl, speedscope ou inferno.
+- Étapes : durée de chaque étape du pipeline et, pour les étapes torch
+  (Pyannote, BART), les opérateurs les plus coûteux via torch.profiler.
+
+Rien n'est instancié quand le profilage n'est pas demandé : coût nul.
+"""
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+from collections import Counter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ============ CONFIGURATION ============
+
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "10"))
+PROFILE_TORCH_OPS = os.getenv("PROFILE_TORCH_OPS", "true").lower() in ("1", "true", "yes")
+# Nombre d'opérateurs torch conservés par étape
+PROFILE_TOP_OPS = int(os.getenv("PROFILE_TOP_OPS", "30"))
+
+PROFILE_DIRNAME = "profile"
+FOLDED_FILENAME = "stacks.folded"
+REPORT_FILENAME = "profile.json"
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Échantillonne la pile d'un thread donné, depuis un thread séparé"""
+
+    def __init__(self, thread_id: int, interval_ms: float = None):
+        self.thread_id = thread_id
+        self.interval = (interval_ms or PROFILE_INTERVAL_MS) / 1000
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write_folded(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class JobProfiler:
+    """
+    Profil d'un job : échantillonnage du thread courant + durées et opérateurs
+    torch par étape. Écrit dans output_dir/profile/ à l'arrêt.
+    """
+
+    def __init__(self, output_dir: str, interval_ms: float = None, torch_ops: bool = None):
+        self.profile_dir = os.path.join(output_dir, PROFILE_DIRNAME)
+        self.torch_ops = PROFILE_TORCH_OPS if torch_ops is None else torch_ops
+        self.sampler = SamplingProfiler(threading.get_ident(), interval_ms)
+        self.stages = {}
+        self.ops = {}
+        self._t0 = None
+
+    def start(self):
+        self._t0 = time.perf_counter()
+        self.sampler.start()
+        print(f"🔬 Profilage activé ({self.sampler.interval * 1000:.0f} ms)")
+        return self
+
+    @contextmanager
+    def stage(self, name: str, torch_ops: bool = False):
+        """
+        Mesure une étape (cumulée si elle est appelée plusieurs fois) ;
+        torch_ops=True enregistre aussi les opérateurs torch.
+        """
+        t0 = time.perf_counter()
+        try:
+            if torch_ops and self.torch_ops:
+                import torch.profiler
+                with torch.profiler.profile(activities=[torch.profiler.ProfilerActivity.CPU]) as prof:
+                    yield
+                ops = self.ops.setdefault(name, {})
+                for event in prof.key_averages():
+                    calls, self_us, cpu_us = ops.get(event.key, (0, 0.0, 0.0))
+                    ops[event.key] = (calls + event.count,
+                                      self_us + event.self_cpu_time_total,
+                                      cpu_us + event.cpu_time_total)
+            else:
+                yield
+        finally:
+            self.stages[name] = round(self.stages.get(name, 0.0) + time.perf_counter() - t0, 3)
+
+    def _top_ops(self) -> dict:
+        return {
+            name: [
+                {"op": op, "calls": calls, "self_cpu_ms": round(self_us / 1000, 3), "cpu_ms": round(cpu_us / 1000, 3)}
+                for op, (calls, self_us, cpu_us) in sorted(ops.items(), key=lambda item: item[1][1],
+                                                           reverse=True)[:PROFILE_TOP_OPS]
+            ]
+            for name, ops in self.ops.items()
+        }
+
+    def stop(self) -> str:
+        """Arrête l'échantillonnage et écrit le profil ; retourne le dossier"""
+        self.sampler.stop()
+        os.makedirs(self.profile_dir, exist_ok=True)
+        self.sampler.write_folded(os.path.join(self.profile_dir, FOLDED_FILENAME))
+        report = {
+            "total_seconds": round(time.perf_counter() - self._t0, 3),
+            "interval_ms": self.sampler.interval * 1000,
+            "samples": self.sampler.samples,
+            "stages": self.stages,
+            "torch_ops": self._top_ops()
+        }
+        with open(os.path.join(self.profile_dir, REPORT_FILENAME), "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"🔬 Profil écrit : {self.profile_dir} ({self.sampler.samples} échantillons)")
+        return self.profile_dir
@@ -1,19 +1,32 @@
 # backend/IA/resume.py
 import os
-from transformers import pipeline
+import json
 from groq import Groq
 from dotenv import load_dotenv
+from .summarizers import get_summarizer
+from .compression import PROMPT_COMPRESSION, PROMPT_CHARS_PER_TOKEN, compress_text, estimate_tokens
 
 load_dotenv()
 
-# ============ ANCIENNE FONCTION (pour compatibilité) ============
+# ============ CONFIGURATION ============
+
+# "local" : compte-rendu Groq puis un résumé BART par speaker ;
+# "llm" : compte-rendu et résumés par speaker en un seul appel Groq (sortie JSON)
+SUMMARY_MODE = os.getenv("SUMMARY_MODE", "local").lower()
+# Tokens d'extraits de parole envoyés pour l'ensemble des speakers (mode "llm"),
+# répartis au prorata du temps de parole
+SPEAKER_TOKEN_BUDGET = int(os.getenv("SPEAKER_TOKEN_BUDGET", "1500"))
+# Plancher par speaker : un participant discret garde quelques phrases
+MIN_SPEAKER_TOKENS = 80
 
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+# ============ ANCIENNE FONCTION (pour compatibilité) ============
 
 def summarize_text_local(text: str, max_length: int = 150, min_length: int = 50) -> str:
     """
-    Résumé local avec BART (ancienne méthode - toujours disponible)
+    Résumé local (ancienne méthode - toujours disponible).
+    Le modèle dépend de SUMMARIZER_BACKEND : BART fp32 par défaut, ou checkpoint quantifié int8.
     """
+    summarizer = get_summarizer()
     sentences = text.split(". ")
     segments = []
     current_segment = ""
@@ -29,26 +42,25 @@ def summarize_text_local(text: str, max_length: int = 150, min_length: int = 50)
 
     summaries = []
     for seg in segments:
-        summary_list = summarizer(seg, max_length=max_length, min_length=min_length, do_sample=False)
-        summaries.append(summary_list[0]['summary_text'])
+        summaries.append(summarizer.summarize(seg, max_length=max_length, min_length=min_length))
 
     return " ".join(summaries)
 
 
 # ============ NOUVELLE FONCTION (compte-rendu structuré) ============
 
-def generate_compte_rendu(cleaned_text: str, speakers_summaries: dict = None) -> dict:
-    """
-    Génère un compte-rendu de réunion structuré avec Groq
-    
-    Retourne:
-    {
-        "compte_rendu_complet": "...",
-        "resume_court": "..."
-    }
-    """
-    client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-    
+COMPTE_RENDU_MODEL = "llama-3.3-70b-versatile"
+
+SYSTEM_PROMPT = "Tu es un assistant expert en rédaction de comptes-rendus de réunion. Tu produis des résumés structurés, clairs et professionnels en français."
+
+
+def groq_client() -> Groq:
+    return Groq(api_key=os.getenv("GROQ_API_KEY"), base_url=os.getenv("GROQ_BASE_URL") or None)
+
+
+def build_compte_rendu_messages(cleaned_text: str, speakers_summaries: dict = None,
+                                compress: bool = None, token_budget: int = None) -> list:
+    """Messages du compte-rendu (transcription compressée ou tronquée + résumés par speaker)"""
     # Préparer le contexte avec les résumés par speaker si disponible
     context_speakers = ""
     if speakers_summaries:
@@ -56,11 +68,14 @@ def generate_compte_rendu(cleaned_text: str, speakers_summaries: dict = None) ->
         for speaker, summary in speakers_summaries.items():
             context_speakers += f"- {speaker}: {summary}\n"
     
+    compress = PROMPT_COMPRESSION if compress is None else compress
+    transcript = compress_text(cleaned_text, token_budget) if compress else cleaned_text[:3000]
+    
     prompt = f"""Tu es un assistant qui génère des comptes-rendus de réunion professionnels.
 
 Voici la transcription d'une réunion :
 
-{cleaned_text[:3000]}
+{transcript}
 {context_speakers}
 
 Génère un compte-rendu structuré au format suivant (en français correct, sans anglicismes) :
@@ -90,31 +105,48 @@ Génère un compte-rendu structuré au format suivant (en français correct, san
 
 Sois concis, professionnel et factuel. Ne mentionne que ce qui est réellement dit dans la transcription."""
 
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def extract_resume_court(compte_rendu: str) -> str:
+    """Résumé exécutif (premier paragraphe après le titre) pour le résumé court"""
+    return compte_rendu.split('\n\n')[1] if '\n\n' in compte_rendu else compte_rendu[:300]
+
+
+def generate_compte_rendu(cleaned_text: str, speakers_summaries: dict = None,
+                          compress: bool = None, token_budget: int = None) -> dict:
+    """
+    Génère un compte-rendu de réunion structuré avec Groq
+    
+    La transcription est réduite à token_budget tokens par sélection des phrases
+    les plus informatives (IA/compression.py) ; compress=False reprend l'ancienne
+    troncature aux 3000 premiers caractères.
+    
+    Retourne:
+    {
+        "compte_rendu_complet": "...",
+        "resume_court": "..."
+    }
+    """
+    client = groq_client()
+    messages = build_compte_rendu_messages(cleaned_text, speakers_summaries, compress, token_budget)
+
     try:
         completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "Tu es un assistant expert en rédaction de comptes-rendus de réunion. Tu produis des résumés structurés, clairs et professionnels en français."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
+            model=COMPTE_RENDU_MODEL,
+            messages=messages,
             temperature=0.3,
             max_tokens=2000
         )
         
         compte_rendu = completion.choices[0].message.content
         
-        # Extraire le résumé exécutif pour le résumé court
-        resume_court = compte_rendu.split('\n\n')[1] if '\n\n' in compte_rendu else compte_rendu[:300]
-        
         return {
             "compte_rendu_complet": compte_rendu,
-            "resume_court": resume_court
+            "resume_court": extract_resume_court(compte_rendu)
         }
         
     except Exception as e:
@@ -130,4 +162,199 @@ Sois concis, professionnel et factuel. Ne mentionne que ce qui est réellement d
             return {
                 "compte_rendu_complet": cleaned_text[:1000] + "...",
                 "resume_court": cleaned_text[:300] + "..."
-            }
\ No newline at end of file
+            }
+
+
+def stream_compte_rendu(cleaned_text: str, speakers_summaries: dict = None,
+                        compress: bool = None, token_budget: int = None):
+    """
+    Compte-rendu en streaming (générateur d'événements) :
+    - ("delta", "texte")                                   à chaque fragment reçu
+    - ("section", {"titre": "...", "contenu": "..."})      dès qu'une section « # TITRE » est complète
+    - ("done", {"compte_rendu_complet", "resume_court"})   à la fin
+    Les erreurs de l'API sont propagées (pas de repli BART : l'appelant garde l'ancien résumé).
+    """
+    client = groq_client()
+    stream = client.chat.completions.create(
+        model=COMPTE_RENDU_MODEL,
+        messages=build_compte_rendu_messages(cleaned_text, speakers_summaries, compress, token_budget),
+        temperature=0.3,
+        max_tokens=2000,
+        stream=True
+    )
+
+    text = ""
+    section_start = 0
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        yield "delta", delta
+        text += delta
+        
+        # Une section se termine quand le titre de la suivante commence
+        while True:
+            next_title = text.find("\n# ", section_start + 1)
+            if next_title < 0:
+                break
+            section = _parse_section(text[section_start:next_title])
+            if section:
+                yield "section", section
+            section_start = next_title + 1
+    
+    section = _parse_section(text[section_start:])
+    if section:
+        yield "section", section
+    yield "done", {"compte_rendu_complet": text, "resume_court": extract_resume_court(text)}
+
+
+def _parse_section(block: str):
+    block = block.strip()
+    if not block:
+        return None
+    if not block.startswith("#"):
+        return {"titre": "", "contenu": block}
+    title, _, content = block.partition("\n")
+    return {"titre": title.lstrip("#").strip(), "contenu": content.strip()}
+
+
+# ============ APPEL UNIQUE (compte-rendu + résumés par speaker) ============
+
+STRUCTURED_REPORT_PROMPT = """Tu es un assistant qui génère des comptes-rendus de réunion professionnels.
+
+Voici la transcription d'une réunion :
+
+{transcript}
+
+Voici des extraits de la parole de chaque intervenant :
+{speaker_excerpts}
+
+Identifiants des intervenants (clés JSON attendues) : {speaker_ids}
+
+Réponds uniquement avec un objet JSON de la forme :
+{{
+  "compte_rendu": "compte-rendu en Markdown avec les sections # RÉSUMÉ EXÉCUTIF, # CONTEXTE ET OBJECTIF, # POINTS CLÉS DISCUTÉS, # DÉCISIONS PRISES, # ACTIONS À ENTREPRENDRE, # PROCHAINES ÉTAPES",
+  "resume_court": "2-3 phrases résumant l'essentiel de la réunion",
+  "resumes_par_intervenant": {{"<identifiant>": "2-3 phrases : positions, propositions et engagements de cet intervenant"}}
+}}
+
+Une entrée par identifiant, sans en ajouter. Écris en français correct, sans anglicismes.
+Sois concis, professionnel et factuel. Ne mentionne que ce qui est réellement dit dans la transcription."""
+
+
+def speaker_budgets(speaker_texts: dict, token_budget: int = None) -> dict:
+    """Budget de tokens de chaque speaker, au prorata de sa parole (avec un plancher)"""
+    token_budget = token_budget or SPEAKER_TOKEN_BUDGET
+    tokens = {speaker: estimate_tokens(text) for speaker, text in speaker_texts.items()}
+    total = sum(tokens.values()) or 1
+    return {
+        speaker: min(n, max(MIN_SPEAKER_TOKENS, token_budget * n // total))
+        for speaker, n in tokens.items()
+    }
+
+
+def speaker_excerpts(speaker_texts, token_budget: int = None) -> dict:
+    """
+    Extrait de chaque speaker sous sa part de token_budget (compression, ou
+    troncature si PROMPT_COMPRESSION=false), parts calculées sur les textes complets.
+    speaker_texts peut être un Mapping qui relit chaque texte à la demande : chaque
+    texte est parcouru une fois pour les parts, puis une fois pour être réduit.
+    """
+    excerpts = {}
+    for speaker, budget in speaker_budgets(speaker_texts, token_budget).items():
+        text = speaker_texts[speaker]
+        excerpts[speaker] = compress_text(text, budget) if PROMPT_COMPRESSION \
+            else text[:int(budget * PROMPT_CHARS_PER_TOKEN)]
+    return excerpts
+
+
+def build_structured_report_messages(cleaned_text: str, speaker_texts,
+                                     token_budget: int = None, speaker_token_budget: int = None) -> list:
+    """Messages de l'appel unique : transcription et extraits par speaker, chacun sous son budget"""
+    if PROMPT_COMPRESSION:
+        transcript = compress_text(cleaned_text, token_budget)
+    else:
+        transcript = cleaned_text[:3000]
+    
+    excerpts = speaker_excerpts(speaker_texts, speaker_token_budget)
+    
+    prompt = STRUCTURED_REPORT_PROMPT.format(
+        transcript=transcript,
+        speaker_excerpts="\n".join(f"- {speaker} : {excerpt}" for speaker, excerpt in excerpts.items()),
+        speaker_ids=json.dumps(list(speaker_texts), ensure_ascii=False)
+    )
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def parse_structured_report(content: str, speakers: list) -> dict:
+    """
+    Valide la réponse JSON du modèle.
+    Lève ValueError si le compte-rendu manque ou si aucun speaker attendu n'est résumé ;
+    un speaker oublié par le modèle est simplement absent de speaker_summaries.
+    """
+    try:
+        data = json.loads(content)
+    except (TypeError, json.JSONDecodeError) as e:
+        raise ValueError(f"réponse non JSON : {e}")
+    if not isinstance(data, dict):
+        raise ValueError("la réponse n'est pas un objet JSON")
+    
+    compte_rendu = data.get("compte_rendu")
+    if not isinstance(compte_rendu, str) or not compte_rendu.strip():
+        raise ValueError("champ 'compte_rendu' absent ou vide")
+    compte_rendu = compte_rendu.strip()
+    
+    resume_court = data.get("resume_court")
+    if not isinstance(resume_court, str) or not resume_court.strip():
+        resume_court = extract_resume_court(compte_rendu)
+    
+    summaries = data.get("resumes_par_intervenant")
+    if not isinstance(summaries, dict):
+        raise ValueError("champ 'resumes_par_intervenant' absent")
+    # Clés rapprochées sans tenir compte de la casse ni des espaces ; les inconnues sont ignorées
+    by_key = {str(speaker).strip().lower(): speaker for speaker in speakers}
+    speaker_summaries = {}
+    for key, summary in summaries.items():
+        speaker = by_key.get(str(key).strip().lower())
+        if speaker is not None and isinstance(summary, str) and summary.strip():
+            speaker_summaries[speaker] = summary.strip()
+    if speakers and not speaker_summaries:
+        raise ValueError("aucun résumé pour les intervenants attendus")
+    
+    return {
+        "compte_rendu_complet": compte_rendu,
+        "resume_court": resume_court.strip(),
+        "speaker_summaries": speaker_summaries
+    }
+
+
+def generate_structured_report(cleaned_text: str, speaker_texts,
+                               token_budget: int = None, speaker_token_budget: int = None) -> dict:
+    """
+    Compte-rendu général et résumés par speaker en une seule requête Groq
+    (sortie JSON validée), à la place d'un passage BART par speaker.
+    
+    speaker_texts : {"SPEAKER_00": "texte nettoyé", ...} (dict ou Mapping relu à la demande)
+    
+    Retourne:
+    {
+        "compte_rendu_complet": "...",
+        "resume_court": "...",
+        "speaker_summaries": {"SPEAKER_00": "...", ...}
+    }
+    Les erreurs (API ou réponse invalide) sont propagées : l'appelant repasse en mode local.
+    """
+    client = groq_client()
+    completion = client.chat.completions.create(
+        model=COMPTE_RENDU_MODEL,
+        messages=build_structured_report_messages(cleaned_text, speaker_texts, token_budget, speaker_token_budget),
+        temperature=0.3,
+        max_tokens=2000 + 150 * len(speaker_texts),
+        response_format={"type": "json_object"}
+    )
+    return parse_structured_report(completion.choices[0].message.content, list(speaker_texts))
@@ -24,3 +24,33 @@ def save_as_word(text, filename="transcription.docx"):
 def save_files(text, base_name="transcription"):
     save_as_pdf(text, f"{base_name}.pdf")
     save_as_word(text, f"{base_name}.docx")
+
+
+# ============ ÉCRITURE PAR MORCEAUX (pipeline en streaming) ============
+
+def save_as_pdf_parts(parts, filename="transcription.pdf"):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 16)
+    pdf.ln(10)
+    pdf.set_font("Arial", size=12)
+    for paragraph in parts:
+        pdf.multi_cell(0, 10, paragraph)
+        pdf.ln(5)
+    pdf.output(filename)
+    print(f"✅ PDF sauvegardé sous {filename}")
+
+def save_as_word_parts(parts, filename="transcription.docx"):
+    doc = Document()
+    for paragraph in parts:
+        doc.add_paragraph(paragraph)
+    doc.save(filename)
+    print(f"✅ Word sauvegardé sous {filename}")
+
+def save_files_parts(make_parts, base_name="transcription"):
+    """
+    Comme save_files, mais le contenu est produit paragraphe par paragraphe.
+    make_parts : fonction retournant un nouvel itérateur de paragraphes (appelée une fois par format).
+    """
+    save_as_pdf_parts(make_parts(), f"{base_name}.pdf")
+    save_as_word_parts(make_parts(), f"{base_name}.docx")
@@ -0,0 +1,183 @@
+# backend/IA/speaker_index.py
+import os
+import json
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Dossier racine des index de voix (un sous-dossier par utilisateur)
+SPEAKER_INDEX_DIR = os.getenv("SPEAKER_INDEX_DIR", "speaker_index")
+# Similarité cosinus minimale pour reconnaître un participant connu
+SPEAKER_MATCH_THRESHOLD = float(os.getenv("SPEAKER_MATCH_THRESHOLD", "0.6"))
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """Normalise chaque ligne (norme L2) pour que le produit scalaire soit un cosinus."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class SpeakerIndex:
+    """
+    Index des empreintes vocales d'un utilisateur.
+
+    Les embeddings Pyannote sont stockés normalisés dans une matrice float32
+    (embeddings.npy) avec la liste des noms associés (names.json).
+    Une même personne peut avoir plusieurs empreintes (une par réunion).
+    """
+
+    def __init__(self, path: str, names: list = None, embeddings: np.ndarray = None):
+        self.path = path
+        self.names = list(names or [])
+        self.embeddings = embeddings if embeddings is not None else np.zeros((0, 0), dtype=np.float32)
+
+    @classmethod
+    def load(cls, user_id, index_dir: str = None) -> "SpeakerIndex":
+        """Charge l'index d'un utilisateur (vide s'il n'existe pas encore)"""
+        path = os.path.join(index_dir or SPEAKER_INDEX_DIR, f"user_{user_id}")
+        names_file = os.path.join(path, "names.json")
+        matrix_file = os.path.join(path, "embeddings.npy")
+
+        if not (os.path.exists(names_file) and os.path.exists(matrix_file)):
+            return cls(path)
+
+        with open(names_file, "r", encoding="utf-8") as f:
+            names = json.load(f)
+        embeddings = np.load(matrix_file).astype(np.float32, copy=False)
+        return cls(path, names, embeddings)
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def participants(self) -> list:
+        """Noms connus, sans doublons, dans l'ordre d'ajout"""
+        return list(dict.fromkeys(self.names))
+
+    def add(self, name: str, embeddings) -> None:
+        """
+        Ajoute une ou plusieurs empreintes pour un participant (mise à jour incrémentale).
+        Les vecteurs non finis (speaker trop court pour Pyannote) sont ignorés.
+        """
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        vectors = vectors[np.isfinite(vectors).all(axis=1)]
+        if len(vectors) == 0:
+            return
+
+        vectors = _normalize(vectors)
+        if len(self.names) == 0:
+            self.embeddings = vectors
+        else:
+            if vectors.shape[1] != self.embeddings.shape[1]:
+                raise ValueError(
+                    f"❌ Dimension d'embedding incompatible : {vectors.shape[1]} au lieu de {self.embeddings.shape[1]}"
+                )
+            self.embeddings = np.vstack([self.embeddings, vectors])
+        self.names.extend([name] * len(vectors))
+
+    def remove(self, name: str) -> int:
+        """Supprime toutes les empreintes d'un participant. Retourne le nombre supprimé."""
+        keep = np.array([n != name for n in self.names], dtype=bool)
+        removed = int((~keep).sum())
+        if removed:
+            self.embeddings = self.embeddings[keep]
+            self.names = [n for n in self.names if n != name]
+        return removed
+
+    def save(self) -> None:
+        """Écrit l'index sur disque (écriture atomique)"""
+        os.makedirs(self.path, exist_ok=True)
+        matrix_file = os.path.join(self.path, "embeddings.npy")
+        names_file = os.path.join(self.path, "names.json")
+
+        tmp_matrix = matrix_file + ".tmp.npy"
+        np.save(tmp_matrix, self.embeddings.astype(np.float32, copy=False))
+        os.replace(tmp_matrix, matrix_file)
+
+        tmp_names = names_file + ".tmp"
+        with open(tmp_names, "w", encoding="utf-8") as f:
+            json.dump(self.names, f, ensure_ascii=False)
+        os.replace(tmp_names, names_file)
+
+    def similarities(self, queries) -> tuple:
+        """
+        Similarité cosinus entre chaque requête et chaque participant connu.
+
+        Retourne (participants, scores) avec scores de forme (nb_requêtes, nb_participants) :
+        le meilleur score parmi toutes les empreintes de chaque participant.
+        """
+        participants = self.participants
+        queries = _normalize(queries)
+        if len(self.names) == 0:
+            return participants, np.full((len(queries), 0), -np.inf, dtype=np.float32)
+
+        # Un seul produit matriciel pour toutes les requêtes et toutes les empreintes
+        sims = queries @ self.embeddings.T
+
+        name_ids = {name: i for i, name in enumerate(participants)}
+        row_ids = np.fromiter((name_ids[n] for n in self.names), dtype=np.int64, count=len(self.names))
+        best = np.full((len(queries), len(participants)), -np.inf, dtype=np.float32)
+        for q in range(len(queries)):
+            np.maximum.at(best[q], row_ids, sims[q])
+        return participants, best
+
+    def identify(self, speaker_embeddings: dict, threshold: float = None) -> dict:
+        """
+        Associe les clusters d'une nouvelle réunion aux participants connus.
+
+        Args:
+            speaker_embeddings: {"SPEAKER_00": embedding, ...}
+            threshold: similarité minimale (SPEAKER_MATCH_THRESHOLD par défaut)
+
+        Returns:
+            {"SPEAKER_00": "Julien", ...} — seuls les clusters reconnus sont présents.
+            Un participant n'est attribué qu'à un seul cluster.
+        """
+        threshold = SPEAKER_MATCH_THRESHOLD if threshold is None else threshold
+        labels = [
+            label for label, emb in speaker_embeddings.items()
+            if emb is not None and np.isfinite(np.asarray(emb, dtype=np.float32)).all()
+        ]
+        if not labels or len(self.names) == 0:
+            return {}
+
+        participants, scores = self.similarities(np.stack([speaker_embeddings[l] for l in labels]))
+
+        # Affectation gloutonne des meilleures paires (cluster, participant)
+        mapping = {}
+        used = set()
+        order = np.argsort(scores, axis=None)[::-1]
+        for flat in order:
+            q, p = np.unravel_index(flat, scores.shape)
+            if scores[q, p] < threshold:
+                break
+            if labels[q] in mapping or participants[p] in used:
+                continue
+            mapping[labels[q]] = participants[p]
+            used.add(participants[p])
+        return mapping
+
+
+def save_meeting_embeddings(speaker_embeddings: dict, output_dir: str) -> str:
+    """Sauvegarde les embeddings des speakers d'une réunion (speaker_embeddings.npz)"""
+    path = os.path.join(output_dir, "speaker_embeddings.npz")
+    labels = list(speaker_embeddings.keys())
+    matrix = np.stack([np.asarray(speaker_embeddings[l], dtype=np.float32) for l in labels]) if labels else np.zeros((0, 0), dtype=np.float32)
+    np.savez(path, labels=np.array(labels), embeddings=matrix)
+    return path
+
+
+def load_meeting_embeddings(output_dir: str) -> dict:
+    """Relit les embeddings sauvegardés par save_meeting_embeddings"""
+    path = os.path.join(output_dir, "speaker_embeddings.npz")
+    if not os.path.exists(path):
+        return {}
+    data = np.load(path)
+    return {str(label): emb for label, emb in zip(data["labels"], data["embeddings"])}
@@ -0,0 +1,188 @@
+# backend/IA/summarizers.py
+import os
+import time
+import threading
+from abc import ABC, abstractmethod
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ============ CONFIGURATION ============
+
+# "bart" : pipeline transformers fp32 (comportement historique)
+# "quantized" : checkpoint seq2seq local, quantifié int8 pour le CPU
+# "fake" : premiers mots du texte, sans modèle (tests de charge)
+SUMMARIZER_BACKEND = os.getenv("SUMMARIZER_BACKEND", "bart")
+SUMMARIZER_MODEL = os.getenv("SUMMARIZER_MODEL", "facebook/bart-large-cnn")
+# Dossier local du checkpoint (ex. un modèle plus petit ou francophone type BARThez)
+SUMMARIZER_MODEL_PATH = os.getenv("SUMMARIZER_MODEL_PATH")
+SUMMARIZER_NUM_BEAMS = int(os.getenv("SUMMARIZER_NUM_BEAMS", "2"))
+SUMMARIZER_MAX_INPUT_TOKENS = int(os.getenv("SUMMARIZER_MAX_INPUT_TOKENS", "1024"))
+
+
+def current_rss_mb() -> float:
+    """Mémoire résidente du processus (Mo)"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        # Hors Linux : pic de mémoire (ko sous Linux, octets sous macOS)
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        # Windows : pas de module resource, la mesure mémoire est désactivée
+        return 0.0
+
+
+class SummarizerBackend(ABC):
+    """
+    Interface commune des modèles de résumé locaux.
+    Le modèle est chargé au premier appel ; mémoire et latence sont mesurées.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.stats = {
+            "backend": self.name,
+            "load_seconds": 0.0,
+            "rss_mb": 0.0,
+            "calls": 0,
+            "total_seconds": 0.0,
+        }
+
+    def load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            rss_before = current_rss_mb()
+            t0 = time.perf_counter()
+            self._load()
+            self.stats["load_seconds"] = round(time.perf_counter() - t0, 2)
+            self.stats["rss_mb"] = round(current_rss_mb() - rss_before, 1)
+            self._loaded = True
+        print(f"✅ Résumeur '{self.name}' chargé en {self.stats['load_seconds']}s (+{self.stats['rss_mb']} Mo)")
+
+    def summarize(self, text: str, max_length: int = 150, min_length: int = 50) -> str:
+        self.load()
+        t0 = time.perf_counter()
+        summary = self._summarize(text, max_length, min_length)
+        self.stats["calls"] += 1
+        self.stats["total_seconds"] += time.perf_counter() - t0
+        return summary
+
+    def report(self) -> dict:
+        """Mémoire et latence moyenne du backend"""
+        calls = self.stats["calls"]
+        return {
+            **self.stats,
+            "total_seconds": round(self.stats["total_seconds"], 2),
+            "avg_latency_seconds": round(self.stats["total_seconds"] / calls, 3) if calls else None,
+        }
+
+    @abstractmethod
+    def _load(self):
+        """Charge le modèle (appelé une seule fois, sous verrou)"""
+
+    @abstractmethod
+    def _summarize(self, text: str, max_length: int, min_length: int) -> str:
+        """Résumé d'un texte déjà découpé à la taille du modèle"""
+
+
+class PipelineSummarizer(SummarizerBackend):
+    """Pipeline transformers "summarization" (BART fp32, comportement historique)"""
+
+    name = "bart"
+
+    def __init__(self, model: str = None):
+        super().__init__()
+        self.model = model or SUMMARIZER_MODEL
+        self._pipeline = None
+
+    def _load(self):
+        from transformers import pipeline
+        self._pipeline = pipeline("summarization", model=self.model)
+
+    def _summarize(self, text, max_length, min_length):
+        summary_list = self._pipeline(text, max_length=max_length, min_length=min_length, do_sample=False)
+        return summary_list[0]['summary_text']
+
+
+class QuantizedSeq2SeqSummarizer(SummarizerBackend):
+    """
+    Checkpoint seq2seq chargé depuis le disque, quantifié dynamiquement en int8
+    (couches Linear) pour l'inférence CPU.
+    """
+
+    name = "quantized"
+
+    def __init__(self, model_path: str = None, num_beams: int = None):
+        super().__init__()
+        self.model_path = model_path or SUMMARIZER_MODEL_PATH
+        if not self.model_path:
+            raise ValueError("❌ SUMMARIZER_MODEL_PATH manquant pour le résumeur quantifié")
+        self.num_beams = num_beams or SUMMARIZER_NUM_BEAMS
+        self._tokenizer = None
+        self._model = None
+
+    def _load(self):
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+        self._tokenizer = AutoTokenizer.from_pretrained(self.model_path, local_files_only=True)
+        model = AutoModelForSeq2SeqLM.from_pretrained(self.model_path, local_files_only=True)
+        model.eval()
+        self._model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    def _summarize(self, text, max_length, min_length):
+        import torch
+
+        inputs = self._tokenizer(
+            text, return_tensors="pt", truncation=True, max_length=SUMMARIZER_MAX_INPUT_TOKENS
+        )
+        with torch.inference_mode():
+            output = self._model.generate(
+                **inputs,
+                max_length=max_length,
+                min_length=min_length,
+                num_beams=self.num_beams,
+                do_sample=False,
+                early_stopping=True
+            )
+        return self._tokenizer.decode(output[0], skip_special_tokens=True)
+
+
+class FakeSummarizer(SummarizerBackend):
+    """Résumé factice (les max_length premiers mots), pour les tests sans modèle"""
+
+    name = "fake"
+
+    def _load(self):
+        pass
+
+    def _summarize(self, text, max_length, min_length):
+        return " ".join(text.split()[:max_length])
+
+
+BACKENDS = {
+    PipelineSummarizer.name: PipelineSummarizer,
+    QuantizedSeq2SeqSummarizer.name: QuantizedSeq2SeqSummarizer,
+    FakeSummarizer.name: FakeSummarizer,
+}
+
+_summarizers = {}
+
+
+def get_summarizer(backend: str = None) -> SummarizerBackend:
+    """Résumeur partagé par le processus (un seul chargement par backend)"""
+    backend = backend or SUMMARIZER_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"❌ Résumeur inconnu : {backend} (disponibles : {', '.join(BACKENDS)})")
+    if backend not in _summarizers:
+        _summarizers[backend] = BACKENDS[backend]()
+    return _summarizers[backend]
@@ -1,9 +1,16 @@
 # backend/IA/transcriptiondiarization.py
 import os
+import tempfile
 import subprocess
+import numpy as np
+import soundfile as sf
+import torch
 from dotenv import load_dotenv
-from groq import Groq
 from pyannote.audio import Pipeline
+from .vad import VAD_ENABLED, remove_silences
+from .asr import ASR_BACKEND, get_asr_backend
+from .long_diarization import use_windowed_mode, diarize_windowed
+from .extractions import format_segments
 
 # 1️⃣ Charger les variables d'environnement
 load_dotenv()
@@ -13,19 +20,46 @@ print("✅ Clés API chargées correctement.")
 groq_api_key = os.getenv("GROQ_API_KEY")
 hf_token = os.getenv("HUGGINGFACE_TOKEN")
 
-if not groq_api_key or not hf_token:
+# "pyannote" (défaut) | "fake" : diarisation factice pour les tests de charge (loadtest/)
+DIARIZATION_BACKEND = os.getenv("DIARIZATION_BACKEND", "pyannote")
+FAKE_DIARIZATION_TURN_SECONDS = float(os.getenv("FAKE_DIARIZATION_TURN_SECONDS", "8"))
+
+# La clé Groq n'est nécessaire que pour la transcription via l'API,
+# le token Hugging Face que pour Pyannote
+if (ASR_BACKEND == "groq" and not groq_api_key) or (DIARIZATION_BACKEND == "pyannote" and not hf_token):
     raise ValueError("❌ Clés API manquantes (Groq ou Hugging Face)")
 
 # 3️⃣ Configuration de base
 base_dir = os.path.dirname(__file__)
 audio_path = os.path.join(base_dir, "audio", "meet2.m4a")
 
+# Réglages de la diarisation par nœud (vides = valeurs par défaut de Pyannote)
+DIARIZATION_EMBEDDING_BATCH_SIZE = os.getenv("DIARIZATION_EMBEDDING_BATCH_SIZE")
+DIARIZATION_SEGMENTATION_BATCH_SIZE = os.getenv("DIARIZATION_SEGMENTATION_BATCH_SIZE")
+TORCH_NUM_THREADS = os.getenv("TORCH_NUM_THREADS")
+
+# Dossier des WAV de travail (vide = dossier temporaire du système)
+WAV_TMP_DIR = os.getenv("WAV_TMP_DIR") or None
+
 # 4️⃣ Conversion en WAV
 def convert_to_wav(audio_path):
-    base, ext = os.path.splitext(audio_path)
-    wav_path = base + ".wav"
-    if not os.path.exists(wav_path):
-        print(f"🎧 Conversion du fichier {audio_path} en {wav_path} ...")
+    """
+    WAV 16 kHz mono de travail. Écrit dans WAV_TMP_DIR et non plus à côté de
+    l'original (≈115 Mo par heure) : l'appelant le supprime après usage.
+    Un WAV déjà en 16 kHz mono est utilisé tel quel ; tout autre WAV (44,1 kHz,
+    stéréo...) est converti comme les autres formats.
+    """
+    if os.path.splitext(audio_path)[1].lower() == ".wav":
+        try:
+            info = sf.info(audio_path)
+            if info.samplerate == 16000 and info.channels == 1:
+                return audio_path
+        except RuntimeError:
+            pass  # WAV illisible par soundfile : ffmpeg s'en charge
+    fd, wav_path = tempfile.mkstemp(suffix=".wav", dir=WAV_TMP_DIR)
+    os.close(fd)
+    print(f"🎧 Conversion du fichier {audio_path} en {wav_path} ...")
+    try:
         subprocess.run([
             "ffmpeg", "-y",
             "-i", audio_path,
@@ -33,27 +67,44 @@ def convert_to_wav(audio_path):
             "-ac", "1",
             wav_path
         ], check=True)
+    except Exception:
+        os.remove(wav_path)
+        raise
     return wav_path
 
-wav_path = convert_to_wav(audio_path)
-print(f"✅ Fichier WAV prêt : {wav_path}")
-
 # 5️⃣ Charger le pipeline Pyannote    
-print("⏳ Chargement du pipeline de diarisation (pyannote)...")
-pipeline = Pipeline.from_pretrained("pyannote/speaker-diarization", use_auth_token=hf_token)
-print("✅ Pipeline chargé avec succès !")
+if DIARIZATION_BACKEND == "fake":
+    pipeline = None
+    print("⚠️ Diarisation factice (DIARIZATION_BACKEND=fake)")
+else:
+    print("⏳ Chargement du pipeline de diarisation (pyannote)...")
+    pipeline = Pipeline.from_pretrained("pyannote/speaker-diarization", use_auth_token=hf_token)
+    print("✅ Pipeline chargé avec succès !")
+
+def configure_diarization(embedding_batch_size=None, segmentation_batch_size=None, num_threads=None):
+    """Ajuste les tailles de lot Pyannote et le nombre de threads torch"""
+    if pipeline is not None and embedding_batch_size:
+        pipeline.embedding_batch_size = int(embedding_batch_size)
+    if pipeline is not None and segmentation_batch_size:
+        pipeline.segmentation_batch_size = int(segmentation_batch_size)
+    if num_threads:
+        torch.set_num_threads(int(num_threads))
+
+configure_diarization(
+    DIARIZATION_EMBEDDING_BATCH_SIZE,
+    DIARIZATION_SEGMENTATION_BATCH_SIZE,
+    TORCH_NUM_THREADS
+)
 
-# 6️⃣ Fonction utilitaire pour formater le temps en mm:ss.s
-def format_time(seconds):
-    minutes = int(seconds // 60)
-    secs = seconds % 60
-    return f"{minutes:02d}:{secs:04.1f}"
+# 6️⃣ Formatage mm:ss.s et lignes [début - fin] [SPEAKER] texte : voir extractions.py
 
 # 7️⃣ Fusion diarisation + transcription avec timestamps
-def match_speaker_to_text(diar_segments, text_segments):
+def assign_speakers(diar_segments, text_segments):
     """
     Associe chaque segment de texte au speaker correspondant.
     Remplace UNKNOWN par le speaker le plus proche dans le temps.
+
+    Retourne : [{"start": 0.0, "end": 6.5, "speaker": "SPEAKER_00", "text": "..."}, ...]
     """
     result = []
     
@@ -88,50 +139,135 @@ def match_speaker_to_text(diar_segments, text_segments):
         elif not speaker:
             speaker = "SPEAKER_00"
 
-        # Ajout du timestamp formaté
-        start_f = format_time(start)
-        end_f = format_time(end)
-        result.append(f"[{start_f} - {end_f}] [{speaker}] {text}")
+        result.append({"start": start, "end": end, "speaker": speaker, "text": text})
     
     return result
 
-# 8️⃣ Fonction principale
-def transcription_with_diarization(audio_file=None):
+def match_speaker_to_text(diar_segments, text_segments):
     """
-    Retourne le texte complet avec diarisation et timestamps.
-    Si audio_file est fourni, on l'utilise à la place du fichier par défaut.
+    Associe chaque segment de texte au speaker correspondant.
+    Retourne les lignes formatées avec timestamps.
     """
-    global audio_path, wav_path
+    return format_segments(assign_speakers(diar_segments, text_segments))
 
-    if audio_file:
-        audio_path = audio_file
-        wav_path = convert_to_wav(audio_path)
+# 8️⃣ Diarisation Pyannote
+def fake_diarize(wav_path, num_speakers=None):
+    """
+    Diarisation déterministe pour les tests de charge : les speakers alternent
+    toutes les FAKE_DIARIZATION_TURN_SECONDS secondes, empreintes fixes par speaker.
+    """
+    num_speakers = num_speakers or 2
+    duration = sf.info(wav_path).duration
+    segments = []
+    for i, start in enumerate(np.arange(0.0, duration, FAKE_DIARIZATION_TURN_SECONDS)):
+        segments.append({
+            "start": float(start),
+            "end": float(min(start + FAKE_DIARIZATION_TURN_SECONDS, duration)),
+            "speaker": f"SPEAKER_{i % num_speakers:02d}"
+        })
+    rng = np.random.default_rng(0)
+    speaker_embeddings = {
+        f"SPEAKER_{i:02d}": rng.standard_normal(192).astype(np.float32)
+        for i in range(min(num_speakers, len(segments)))
+    }
+    return segments, speaker_embeddings
 
-    # Diarisation
-    print("🎧 Détection des intervenants...")
-    diarization = pipeline(wav_path)
-    segments = [{"start": t.start, "end": t.end, "speaker": s} for t, _, s in diarization.itertracks(yield_label=True)]
+def diarize(wav_path, num_speakers=None, min_speakers=None, max_speakers=None):
+    """
+    Lance Pyannote et retourne (segments, embeddings).
+    embeddings : {"SPEAKER_00": vecteur, ...} (un centroïde par speaker détecté)
+    num_speakers / min_speakers / max_speakers : indications sur le nombre de
+    participants, qui réduisent la recherche du clustering.
+    Au-delà de LONG_FORM_THRESHOLD_SECONDS, la diarisation se fait par fenêtres.
+    """
+    if pipeline is None:
+        return fake_diarize(wav_path, num_speakers or max_speakers)
+    
+    hints = {
+        key: value for key, value in
+        (("num_speakers", num_speakers), ("min_speakers", min_speakers), ("max_speakers", max_speakers))
+        if value
+    }
     
-    # DEBUG : Voir les speakers détectés
-    print("🔍 Speakers détectés par Pyannote:")
-    for seg in segments:
-        print(f"  - {seg['speaker']}: {seg['start']:.1f}s → {seg['end']:.1f}s")
+    # Enregistrements longs : fenêtres recouvrantes, mémoire bornée
+    if use_windowed_mode(wav_path):
+        print("🪟 Diarisation par fenêtres (enregistrement long)...")
+        return diarize_windowed(pipeline, wav_path, **hints)
     
-    print(f"👥 Intervenants détectés : {set(seg['speaker'] for seg in segments)}")
-
-    # Transcription Groq
-    print("\n🎙️ Lancement de la transcription complète (Groq)...")
-    client = Groq(api_key=groq_api_key)
-    with open(wav_path, "rb") as file:
-        transcription = client.audio.transcriptions.create(
-            file=file,
-            model="whisper-large-v3-turbo",
-            response_format="verbose_json",
-            timestamp_granularities=["segment"],
-            language="fr"
-        )
-
-    fusion = match_speaker_to_text(segments, transcription.segments)
+    diarization, embeddings = pipeline(wav_path, return_embeddings=True, **hints)
+    segments = [{"start": t.start, "end": t.end, "speaker": s} for t, _, s in diarization.itertracks(yield_label=True)]
+    speaker_embeddings = {label: embeddings[i] for i, label in enumerate(diarization.labels())}
+    return segments, speaker_embeddings
+
+# 9️⃣ Fonction principale
+def run_transcription(audio_file=None, speaker_index=None, vad=None, speaker_hints=None):
+    """
+    Transcription + diarisation, avec les données structurées.
+    Si speaker_index (SpeakerIndex) est fourni, les speakers reconnus sont renommés
+    avec le nom du participant.
+    Si vad est actif (VAD_ENABLED par défaut), les longs silences sont retirés avant
+    Pyannote et Whisper ; les timestamps restent ceux de l'audio original.
+    speaker_hints : {"num_speakers": 4} ou {"min_speakers": 2, "max_speakers": 6}
+
+    Retourne :
+    {
+        "text": "[00:00.0 - 00:06.5] [SPEAKER_00] ...",
+        "segments": [{"start", "end", "speaker", "text"}, ...],
+        "diar_segments": [...],
+        "speaker_embeddings": {"SPEAKER_00": vecteur, ...},
+        "speaker_mapping": {"SPEAKER_00": "Julien", ...},
+        "vad": {"total_seconds": ..., "speech_seconds": ..., "skipped_seconds": ...}
+    }
+    """
+    source_path = audio_file or audio_path
+    wav_path = convert_to_wav(source_path)
+    speech_path = wav_path
+    try:
+        # Pré-passe VAD : on n'envoie que la parole à Pyannote et Whisper
+        vad = VAD_ENABLED if vad is None else vad
+        time_map, vad_stats = None, None
+        if vad:
+            print("🔇 Détection des silences...")
+            speech_path, time_map, vad_stats = remove_silences(wav_path)
+            print(f"⏩ {vad_stats['skipped_seconds']:.1f}s de silence ignorées sur {vad_stats['total_seconds']:.1f}s")
+
+        # Diarisation
+        print("🎧 Détection des intervenants...")
+        segments, speaker_embeddings = diarize(speech_path, **(speaker_hints or {}))
+        if time_map:
+            segments = time_map.remap_segments(segments)
+
+        # DEBUG : Voir les speakers détectés
+        print("🔍 Speakers détectés par Pyannote:")
+        for seg in segments:
+            print(f"  - {seg['speaker']}: {seg['start']:.1f}s → {seg['end']:.1f}s")
+
+        print(f"👥 Intervenants détectés : {set(seg['speaker'] for seg in segments)}")
+
+        # Reconnaissance des participants récurrents
+        speaker_mapping = {}
+        if speaker_index is not None and len(speaker_index):
+            speaker_mapping = speaker_index.identify(speaker_embeddings)
+            for seg in segments:
+                seg["speaker"] = speaker_mapping.get(seg["speaker"], seg["speaker"])
+            speaker_embeddings = {speaker_mapping.get(l, l): emb for l, emb in speaker_embeddings.items()}
+            for label, name in speaker_mapping.items():
+                print(f"🪪 {label} reconnu : {name}")
+
+        # Transcription (Groq, Whisper local ou fake selon ASR_BACKEND)
+        asr = get_asr_backend()
+        print(f"\n🎙️ Lancement de la transcription complète ({asr.name})...")
+        text_segments = asr.transcribe(speech_path)
+        if time_map:
+            text_segments = time_map.remap_segments(text_segments)
+    finally:
+        # WAV de travail supprimés, même en cas d'erreur : rien ne reste à côté de l'original
+        for path in {speech_path, wav_path} - {source_path}:
+            if os.path.exists(path):
+                os.remove(path)
+
+    speaker_segments = assign_speakers(segments, text_segments)
+    fusion = format_segments(speaker_segments)
 
     # Sauvegarde dans un fichier texte
     output_path = os.path.join(base_dir, "transcription_avec_diarisation.txt")
@@ -139,5 +275,19 @@ def transcription_with_diarization(audio_file=None):
         f.write("\n".join(fusion))
     print(f"\n✅ Transcription avec timestamps enregistrée ici : {output_path}\n")
 
+    return {
+        "text": "\n".join(fusion),
+        "segments": speaker_segments,
+        "diar_segments": segments,
+        "speaker_embeddings": speaker_embeddings,
+        "speaker_mapping": speaker_mapping,
+        "vad": vad_stats
+    }
+
+def transcription_with_diarization(audio_file=None):
+    """
+    Retourne le texte complet avec diarisation et timestamps.
+    Si audio_file est fourni, on l'utilise à la place du fichier par défaut.
+    """
     # Retour du texte fusionné
-    return "\n".join(fusion)
\ No newline at end of file
+    return run_transcription(audio_file)["text"]
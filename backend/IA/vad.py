@@ -0,0 +1,175 @@
+# backend/IA/vad.py
+import os
+import numpy as np
+import soundfile as sf
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Pré-passe de détection de parole (VAD par énergie) avant Pyannote et Whisper
+VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() in ("1", "true", "yes")
+VAD_FRAME_MS = int(os.getenv("VAD_FRAME_MS", "30"))
+VAD_MARGIN_DB = float(os.getenv("VAD_MARGIN_DB", "12"))
+VAD_MIN_SILENCE = float(os.getenv("VAD_MIN_SILENCE", "1.0"))  # secondes
+VAD_PADDING = float(os.getenv("VAD_PADDING", "0.25"))  # secondes
+
+# Lecture par blocs : la forme d'onde complète n'est jamais chargée en mémoire
+BLOCK_SECONDS = 60
+
+
+class TimeMap:
+    """
+    Correspondance entre le temps de l'audio compressé (silences retirés)
+    et le temps de l'audio original.
+    """
+
+    def __init__(self, regions):
+        regions = np.asarray(regions, dtype=np.float64).reshape(-1, 2)
+        self.orig_starts = regions[:, 0]
+        self.orig_ends = regions[:, 1]
+        durations = self.orig_ends - self.orig_starts
+        self.comp_starts = np.concatenate([[0.0], np.cumsum(durations)[:-1]]) if len(durations) else np.zeros(0)
+        self.speech_seconds = float(durations.sum())
+
+    def to_original(self, t):
+        """Convertit un (ou plusieurs) temps compressé(s) en temps original"""
+        t_arr = np.asarray(t, dtype=np.float64)
+        if len(self.comp_starts) == 0:
+            return t_arr if t_arr.ndim else float(t_arr)
+        i = np.clip(np.searchsorted(self.comp_starts, t_arr, side="right") - 1, 0, len(self.comp_starts) - 1)
+        result = np.minimum(self.orig_starts[i] + (t_arr - self.comp_starts[i]), self.orig_ends[i])
+        return result if result.ndim else float(result)
+
+    def remap_segments(self, segments) -> list:
+        """Recalcule start/end de segments {"start", "end", ...} dans le temps original"""
+        if not segments:
+            return []
+        starts = self.to_original([s["start"] for s in segments])
+        ends = self.to_original([s["end"] for s in segments])
+        remapped = []
+        for seg, start, end in zip(segments, starts, ends):
+            seg = dict(seg)
+            seg["start"] = float(start)
+            seg["end"] = float(max(end, start))
+            remapped.append(seg)
+        return remapped
+
+
+def frame_energies(wav_path: str, frame_ms: int = VAD_FRAME_MS) -> tuple:
+    """Énergie (dB) de chaque trame, calculée bloc par bloc. Retourne (energies_db, sample_rate, total_seconds)"""
+    info = sf.info(wav_path)
+    sr = info.samplerate
+    frame_len = max(1, int(sr * frame_ms / 1000))
+    block_len = frame_len * max(1, int(BLOCK_SECONDS * 1000 / frame_ms))
+
+    energies = []
+    for block in sf.blocks(wav_path, blocksize=block_len, dtype="float32", always_2d=True):
+        mono = block.mean(axis=1)
+        n_frames = len(mono) // frame_len
+        if n_frames == 0:
+            continue
+        frames = mono[:n_frames * frame_len].reshape(n_frames, frame_len)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        energies.append(20 * np.log10(rms + 1e-10))
+
+    energies = np.concatenate(energies) if energies else np.zeros(0, dtype=np.float32)
+    return energies, sr, info.frames / sr
+
+
+def detect_speech(energies_db: np.ndarray, frame_ms: int = VAD_FRAME_MS,
+                  margin_db: float = VAD_MARGIN_DB, min_silence: float = VAD_MIN_SILENCE,
+                  padding: float = VAD_PADDING, total_seconds: float = None) -> list:
+    """
+    Régions de parole [(start, end), ...] en secondes.
+    Le seuil s'adapte au bruit de fond de l'enregistrement.
+    """
+    if len(energies_db) == 0:
+        return []
+
+    frame_s = frame_ms / 1000
+    total_seconds = total_seconds if total_seconds is not None else len(energies_db) * frame_s
+
+    noise_floor = np.percentile(energies_db, 10)
+    loud = np.percentile(energies_db, 95)
+    # Seuil au-dessus du bruit de fond, sans dépasser le niveau de la parole
+    threshold = max(min(noise_floor + margin_db, loud - margin_db), -60.0)
+    active = energies_db > threshold
+
+    # Débuts / fins des zones actives
+    edges = np.diff(np.concatenate([[0], active.astype(np.int8), [0]]))
+    starts = np.flatnonzero(edges == 1) * frame_s
+    ends = np.flatnonzero(edges == -1) * frame_s
+    if len(starts) == 0:
+        return []
+
+    # Fusion des zones séparées par un silence trop court pour être retiré
+    keep = np.concatenate([[True], (starts[1:] - ends[:-1]) >= min_silence])
+    merged_starts = starts[keep]
+    merged_ends = np.maximum.reduceat(ends, np.flatnonzero(keep))
+
+    merged_starts = np.maximum(merged_starts - padding, 0.0)
+    merged_ends = np.minimum(merged_ends + padding, total_seconds)
+
+    # Le padding peut faire se chevaucher deux régions
+    regions = []
+    for start, end in zip(merged_starts, merged_ends):
+        if regions and start <= regions[-1][1]:
+            regions[-1][1] = max(regions[-1][1], end)
+        else:
+            regions.append([float(start), float(end)])
+    return [tuple(r) for r in regions]
+
+
+def write_regions(wav_path: str, regions: list, output_path: str) -> None:
+    """Écrit un WAV ne contenant que les régions demandées, mises bout à bout"""
+    with sf.SoundFile(wav_path) as src, sf.SoundFile(
+        output_path, "w", samplerate=src.samplerate, channels=src.channels, subtype="PCM_16"
+    ) as dst:
+        sr = src.samplerate
+        block_len = sr * BLOCK_SECONDS
+        for start, end in regions:
+            first = int(round(start * sr))
+            remaining = int(round(end * sr)) - first
+            src.seek(first)
+            while remaining > 0:
+                data = src.read(min(block_len, remaining), dtype="float32", always_2d=True)
+                if len(data) == 0:
+                    break
+                dst.write(data)
+                remaining -= len(data)
+
+
+def remove_silences(wav_path: str) -> tuple:
+    """
+    Pré-passe VAD : retire les longs silences (début, fin, pauses).
+
+    Retourne (speech_wav_path, time_map, stats) ; l'appelant supprime speech_wav_path
+    après usage, y compris en cas d'erreur (voir run_transcription).
+    Si aucune parole n'est détectée ou si rien n'est à retirer, le WAV original est retourné.
+    """
+    energies, sr, total_seconds = frame_energies(wav_path)
+    regions = detect_speech(energies, total_seconds=total_seconds)
+
+    time_map = TimeMap(regions) if regions else None
+    speech_seconds = time_map.speech_seconds if time_map else total_seconds
+    stats = {
+        "total_seconds": round(total_seconds, 2),
+        "speech_seconds": round(speech_seconds, 2),
+        "skipped_seconds": round(max(total_seconds - speech_seconds, 0.0), 2),
+    }
+
+    if not regions or stats["skipped_seconds"] < VAD_MIN_SILENCE:
+        stats["skipped_seconds"] = 0.0
+        stats["speech_seconds"] = stats["total_seconds"]
+        return wav_path, None, stats
+
+    base, _ = os.path.splitext(wav_path)
+    speech_path = base + ".speech.wav"
+    try:
+        write_regions(wav_path, regions, speech_path)
+    except Exception:
+        # Pas de WAV partiel laissé à côté de l'original
+        if os.path.exists(speech_path):
+            os.remove(speech_path)
+        raise
+    return speech_path, time_map, stats
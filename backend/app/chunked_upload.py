@@ -0,0 +1,265 @@
+# backend/app/chunked_upload.py
+"""
+Upload reprenable par morceaux : init → PUT morceau N (dans n'importe quel ordre,
+en parallèle) → complete.
+
+Chaque session vit dans CHUNKED_UPLOAD_DIR/{upload_id}/ :
+- meta.json : nom, taille, taille des morceaux, options de traitement
+- data.part : fichier pré-alloué, chaque morceau écrit à son offset (n * chunk_size)
+- chunks/{n} : accusé de réception contenant le SHA-256 du morceau
+
+Le SHA-256 du fichier complet est calculé au fil de l'eau : dès que les morceaux
+contigus depuis le début sont arrivés, ils sont ajoutés au hash. À la fin il ne
+reste que la queue éventuelle à hacher (tout est recalculé si le processus a redémarré).
+
+Vérification du fichier complet, au choix du client :
+- sha256 (annoncé à l'init) : SHA-256 du fichier entier
+- chunks_sha256 (envoyé à complete) : SHA-256 de la liste des SHA-256 hexadécimaux
+  des morceaux, dans l'ordre. Le client le calcule avec les hash qu'il envoie déjà
+  morceau par morceau (un navigateur n'a pas de hash incrémental) ; le serveur le
+  reconstruit à partir des accusés de réception.
+
+Chaque morceau reçu et chaque consultation de la session la « touchent » (mtime
+du dossier) : seules les sessions inactives depuis UPLOAD_SESSION_TTL_HOURS sont supprimées.
+"""
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ============ CONFIGURATION ============
+
+CHUNKED_UPLOAD_DIR = os.getenv("CHUNKED_UPLOAD_DIR", os.path.join("uploads", "sessions"))
+CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+# Sessions non terminées supprimées après ce délai
+UPLOAD_SESSION_TTL_HOURS = float(os.getenv("UPLOAD_SESSION_TTL_HOURS", "24"))
+
+
+class UploadError(Exception):
+    """Erreur de protocole (session inconnue, morceau invalide, checksum...)"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# Hash incrémental du fichier complet, par session (dans ce processus)
+_hashers = {}
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _session_lock(upload_id: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(upload_id, threading.Lock())
+
+
+def _session_dir(upload_id: str) -> str:
+    # upload_id vient de l'URL : uuid hexadécimal uniquement
+    if not upload_id.isalnum():
+        raise UploadError("Session d'upload inconnue", 404)
+    return os.path.join(CHUNKED_UPLOAD_DIR, upload_id)
+
+
+def load_session(upload_id: str, user_id: int = None) -> dict:
+    path = os.path.join(_session_dir(upload_id), "meta.json")
+    if not os.path.exists(path):
+        raise UploadError("Session d'upload inconnue", 404)
+    with open(path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if user_id is not None and meta["user_id"] != user_id:
+        raise UploadError("Session d'upload inconnue", 404)
+    return meta
+
+
+def received_chunks(upload_id: str) -> list:
+    chunks_dir = os.path.join(_session_dir(upload_id), "chunks")
+    return sorted(int(name) for name in os.listdir(chunks_dir) if name.isdigit())
+
+
+def _touch(upload_id: str):
+    """Dernière activité de la session = mtime de son dossier"""
+    try:
+        os.utime(_session_dir(upload_id))
+    except FileNotFoundError:
+        pass
+
+
+def chunks_manifest_digest(digests: list) -> str:
+    """SHA-256 de la liste des SHA-256 des morceaux (hexadécimaux, concaténés dans l'ordre)"""
+    return hashlib.sha256("".join(digests).encode("ascii")).hexdigest()
+
+
+def cleanup_expired_sessions():
+    """Supprime les sessions abandonnées (inactives depuis UPLOAD_SESSION_TTL_HOURS)"""
+    if not os.path.isdir(CHUNKED_UPLOAD_DIR):
+        return
+    limit = time.time() - UPLOAD_SESSION_TTL_HOURS * 3600
+    for upload_id in os.listdir(CHUNKED_UPLOAD_DIR):
+        path = os.path.join(CHUNKED_UPLOAD_DIR, upload_id)
+        if os.path.getmtime(path) < limit:
+            shutil.rmtree(path, ignore_errors=True)
+            _hashers.pop(upload_id, None)
+
+
+def init_upload(user_id: int, filename: str, size: int, chunk_size: int = None,
+                sha256: str = None, title: str = None, options: dict = None) -> dict:
+    """Crée une session et pré-alloue le fichier de destination"""
+    chunk_size = chunk_size or CHUNK_SIZE
+    if size <= 0 or size > UPLOAD_MAX_BYTES:
+        raise UploadError(f"Taille invalide (maximum {UPLOAD_MAX_BYTES} octets)")
+    if chunk_size <= 0 or chunk_size > MAX_CHUNK_SIZE:
+        raise UploadError(f"Taille de morceau invalide (maximum {MAX_CHUNK_SIZE} octets)")
+
+    cleanup_expired_sessions()
+
+    upload_id = uuid.uuid4().hex
+    session_dir = _session_dir(upload_id)
+    os.makedirs(os.path.join(session_dir, "chunks"))
+    with open(os.path.join(session_dir, "data.part"), "wb") as f:
+        f.truncate(size)
+
+    meta = {
+        "upload_id": upload_id,
+        "user_id": user_id,
+        "filename": os.path.basename(filename),
+        "size": size,
+        "chunk_size": chunk_size,
+        "total_chunks": (size + chunk_size - 1) // chunk_size,
+        "sha256": sha256.lower() if sha256 else None,
+        "title": title,
+        "options": options or {},
+        "created_at": time.time()
+    }
+    with open(os.path.join(session_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return meta
+
+
+def _advance_hash(upload_id: str, meta: dict):
+    """Ajoute au hash global les morceaux contigus déjà reçus (verrou de session tenu)"""
+    session_dir = _session_dir(upload_id)
+    state = _hashers.setdefault(upload_id, {"hasher": hashlib.sha256(), "next": 0})
+    chunks_dir = os.path.join(session_dir, "chunks")
+    with open(os.path.join(session_dir, "data.part"), "rb") as f:
+        while state["next"] < meta["total_chunks"] and \
+                os.path.exists(os.path.join(chunks_dir, str(state["next"]))):
+            f.seek(state["next"] * meta["chunk_size"])
+            state["hasher"].update(f.read(meta["chunk_size"]))
+            state["next"] += 1
+    return state
+
+
+def write_chunk(upload_id: str, user_id: int, index: int, data: bytes, sha256: str = None) -> dict:
+    """
+    Écrit le morceau `index` à son offset après vérification de sa taille et de son checksum.
+    Idempotent : renvoyer un morceau déjà reçu ne change rien.
+    """
+    meta = load_session(upload_id, user_id)
+    if index < 0 or index >= meta["total_chunks"]:
+        raise UploadError(f"Morceau {index} hors limites (0..{meta['total_chunks'] - 1})")
+
+    offset = index * meta["chunk_size"]
+    expected = min(meta["chunk_size"], meta["size"] - offset)
+    if len(data) != expected:
+        raise UploadError(f"Morceau {index} : {len(data)} octets reçus, {expected} attendus")
+
+    digest = hashlib.sha256(data).hexdigest()
+    if sha256 and sha256.lower() != digest:
+        raise UploadError(f"Morceau {index} : checksum invalide", 422)
+
+    session_dir = _session_dir(upload_id)
+    _touch(upload_id)
+    marker = os.path.join(session_dir, "chunks", str(index))
+    if os.path.exists(marker):
+        with open(marker, "r") as f:
+            if f.read() != digest:
+                raise UploadError(f"Morceau {index} déjà reçu avec un contenu différent", 409)
+        return {"index": index, "sha256": digest, "hashed_chunks": _hashers.get(upload_id, {}).get("next", 0)}
+
+    fd = os.open(os.path.join(session_dir, "data.part"), os.O_WRONLY)
+    try:
+        os.lseek(fd, offset, os.SEEK_SET)
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+    # Accusé de réception écrit après les données (atomique)
+    with open(marker + ".tmp", "w") as f:
+        f.write(digest)
+    os.replace(marker + ".tmp", marker)
+
+    with _session_lock(upload_id):
+        state = _advance_hash(upload_id, meta)
+
+    return {"index": index, "sha256": digest, "hashed_chunks": state["next"]}
+
+
+def upload_status(upload_id: str, user_id: int) -> dict:
+    meta = load_session(upload_id, user_id)
+    _touch(upload_id)
+    received = received_chunks(upload_id)
+    received_set = set(received)
+    return {
+        "upload_id": upload_id,
+        "filename": meta["filename"],
+        "size": meta["size"],
+        "chunk_size": meta["chunk_size"],
+        "total_chunks": meta["total_chunks"],
+        "received": received,
+        "missing": [i for i in range(meta["total_chunks"]) if i not in received_set]
+    }
+
+
+def complete_upload(upload_id: str, user_id: int, destination_dir: str,
+                    chunks_sha256: str = None) -> dict:
+    """
+    Vérifie que tous les morceaux sont là, termine le hash, le compare au SHA-256
+    annoncé à l'init et le manifeste des morceaux à chunks_sha256 (s'ils sont
+    fournis), puis déplace le fichier dans destination_dir.
+    Retourne {"path", "sha256", "chunks_sha256", "meta"}.
+    """
+    with _session_lock(upload_id):
+        meta = load_session(upload_id, user_id)
+        missing = meta["total_chunks"] - len(received_chunks(upload_id))
+        if missing:
+            raise UploadError(f"{missing} morceaux manquants", 409)
+
+        state = _advance_hash(upload_id, meta)
+        digest = state["hasher"].hexdigest()
+        _hashers.pop(upload_id, None)
+
+        if meta["sha256"] and meta["sha256"] != digest:
+            raise UploadError("Checksum du fichier complet invalide", 422)
+
+        chunks_dir = os.path.join(_session_dir(upload_id), "chunks")
+        digests = []
+        for index in range(meta["total_chunks"]):
+            with open(os.path.join(chunks_dir, str(index)), "r") as f:
+                digests.append(f.read())
+        manifest = chunks_manifest_digest(digests)
+        if chunks_sha256 and chunks_sha256.lower() != manifest:
+            raise UploadError("Checksum des morceaux invalide : le fichier reçu diffère de celui envoyé", 422)
+
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(destination_dir, f"{timestamp}_{meta['filename']}")
+        session_dir = _session_dir(upload_id)
+        os.replace(os.path.join(session_dir, "data.part"), path)
+        shutil.rmtree(session_dir, ignore_errors=True)
+
+    with _locks_guard:
+        _locks.pop(upload_id, None)
+
+    return {"path": path, "sha256": digest, "chunks_sha256": manifest, "meta": meta}
@@ -0,0 +1,122 @@
+# backend/app/database.py
+import os
+import psycopg2
+from psycopg2.extras import RealDictCursor, Json
+from dotenv import load_dotenv
+
+# ============ CHARGEMENT VARIABLES D'ENVIRONNEMENT ============
+load_dotenv()
+
+# Configuration DB depuis .env
+DATABASE_URL = os.getenv("DATABASE_URL")
+if not DATABASE_URL:
+    db_user = os.getenv("DB_USER", "postgres")
+    db_password = os.getenv("DB_PASSWORD")
+    db_host = os.getenv("DB_HOST", "localhost")
+    db_port = os.getenv("DB_PORT", "5432")
+    db_name = os.getenv("DB_NAME", "transcription_db")
+    
+    if not db_password:
+        raise ValueError("❌ DB_PASSWORD ou DATABASE_URL manquant dans .env")
+    
+    DATABASE_URL = f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+
+print(f"✅ Connexion DB configurée")
+
+# ============ CONNEXION DB ============
+
+def connect():
+    """Nouvelle connexion (curseurs dict)"""
+    return psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
+
+def get_db():
+    conn = connect()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+# ============ LECTURE / ÉCRITURE ============
+
+def iter_transcription_rows(audio_id: int, batch_size: int = 1000):
+    """
+    Parcourt les segments d'un fichier avec un curseur serveur (générateur).
+    Utilise sa propre connexion : elle reste ouverte pendant tout le parcours.
+    """
+    conn = connect()
+    try:
+        cur = conn.cursor(name=f"segments_{audio_id}")
+        cur.itersize = batch_size
+        cur.execute(
+            """SELECT text_brut, start_time, end_time, speaker, sub_offsets
+            FROM transcription_segments 
+            WHERE id_audio = %s 
+            ORDER BY sequence_number""",
+            (audio_id,)
+        )
+        for row in cur:
+            seg = {
+                "start": row['start_time'],
+                "end": row['end_time'],
+                "speaker": row['speaker'],
+                "text": row['text_brut']
+            }
+            if row['sub_offsets']:
+                seg["offsets"] = row['sub_offsets']
+            yield seg
+        cur.close()
+    finally:
+        conn.close()
+
+def save_meeting_stats(cur, audio_id: int, stats: dict):
+    """Enregistrer (ou remplacer) les statistiques d'une réunion"""
+    cur.execute(
+        """INSERT INTO meeting_stats 
+            (id_audio, duration, num_speakers, num_segments, num_turns, 
+             num_interruptions, words_per_minute, speaker_stats) 
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (id_audio) DO UPDATE SET 
+                duration = EXCLUDED.duration,
+                num_speakers = EXCLUDED.num_speakers,
+                num_segments = EXCLUDED.num_segments,
+                num_turns = EXCLUDED.num_turns,
+                num_interruptions = EXCLUDED.num_interruptions,
+                words_per_minute = EXCLUDED.words_per_minute,
+                speaker_stats = EXCLUDED.speaker_stats,
+                computed_at = CURRENT_TIMESTAMP""",
+        (audio_id, stats["duration"], stats["num_speakers"], stats["num_segments"],
+         stats["num_turns"], stats["num_interruptions"], stats["words_per_minute"],
+         Json(stats["speakers"]))
+    )
+
+def save_general_resume(cur, audio_id: int, summary: str):
+    """Remplacer le seul résumé général (les résumés par speaker sont conservés)"""
+    cur.execute(
+        "DELETE FROM resumes WHERE id_audio = %s AND type_resume = 'general'",
+        (audio_id,)
+    )
+    cur.execute(
+        """INSERT INTO resumes (id_audio, summary_text, type_resume) 
+            VALUES (%s, %s, 'general')""",
+        (audio_id, summary)
+    )
+
+def save_resumes(cur, audio_id: int, summary: str, speaker_summaries: dict, replace: bool = False):
+    """
+    Enregistrer le résumé général et les résumés par speaker.
+    replace=True supprime d'abord les résumés existants (régénération).
+    """
+    if replace:
+        cur.execute("DELETE FROM resumes WHERE id_audio = %s", (audio_id,))
+    
+    cur.execute(
+        """INSERT INTO resumes (id_audio, summary_text, type_resume) 
+            VALUES (%s, %s, 'general')""",
+        (audio_id, summary)
+    )
+    for speaker, speaker_summary in (speaker_summaries or {}).items():
+        cur.execute(
+            """INSERT INTO resumes (id_audio, summary_text, type_resume, speaker) 
+                VALUES (%s, %s, 'par_speaker', %s)""",
+            (audio_id, speaker_summary, speaker)
+        )
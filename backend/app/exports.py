@@ -0,0 +1,125 @@
+# backend/app/exports.py
+import json
+import math
+
+# Formats d'export des transcriptions (sous-titres et JSON)
+EXPORT_FORMATS = {
+    "srt": ("application/x-subrip", "srt"),
+    "vtt": ("text/vtt", "vtt"),
+    "json": ("application/json", "json"),
+}
+
+
+# ============ DÉCOUPAGE DES SOUS-TITRES ============
+
+def split_cue(cue: dict, max_duration: float):
+    """
+    Découpe un sous-titre trop long en ceil(durée / max_duration) tranches de
+    temps égales, donc chacune <= max_duration.
+
+    Chaque mot occupe durée / nb_mots secondes (temps réparti proportionnellement
+    au nombre de mots) et va dans la tranche qui contient son milieu. Quand il y a
+    moins de mots que de tranches, les tranches sans mot ne sont pas émises : le
+    sous-titre laisse un blanc plutôt que de dépasser max_duration.
+    Un segment sans texte est rendu tel quel.
+    """
+    duration = cue["end"] - cue["start"]
+    words = cue["text"].split()
+    if duration <= max_duration or not words:
+        yield cue
+        return
+
+    parts = math.ceil(duration / max_duration)
+    slice_len = duration / parts
+    step = duration / len(words)
+
+    chunks = [[] for _ in range(parts)]
+    for k, word in enumerate(words):
+        chunks[min(int((k + 0.5) * step / slice_len), parts - 1)].append(word)
+
+    for j, chunk in enumerate(chunks):
+        if not chunk:
+            continue
+        yield {
+            "start": cue["start"] + j * slice_len,
+            "end": cue["start"] + (j + 1) * slice_len if j < parts - 1 else cue["end"],
+            "speaker": cue["speaker"],
+            "text": " ".join(chunk)
+        }
+
+
+def reshape_cues(cues, max_duration: float = None, merge: bool = False, max_gap: float = 1.0):
+    """
+    Fusionne et/ou découpe les sous-titres au fil de l'eau (générateur).
+
+    - merge : regroupe les segments consécutifs d'un même speaker séparés de
+      moins de max_gap secondes, sans dépasser max_duration
+    - max_duration : découpe les segments plus longs
+    """
+    pending = None
+    for cue in cues:
+        if merge and pending is not None:
+            same_speaker = cue["speaker"] == pending["speaker"]
+            close = cue["start"] - pending["end"] <= max_gap
+            fits = max_duration is None or cue["end"] - pending["start"] <= max_duration
+            if same_speaker and close and fits:
+                pending["end"] = cue["end"]
+                pending["text"] = f"{pending['text']} {cue['text']}"
+                continue
+        if pending is not None:
+            yield from (split_cue(pending, max_duration) if max_duration else [pending])
+        pending = dict(cue)
+    if pending is not None:
+        yield from (split_cue(pending, max_duration) if max_duration else [pending])
+
+
+# ============ FORMATS ============
+
+def format_timestamp(seconds: float, separator: str = ",") -> str:
+    """123.456 → 00:02:03,456 (SRT) ou 00:02:03.456 (WebVTT)"""
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def srt_stream(cues, speakers: bool = True):
+    """Sous-titres SRT, un bloc par segment"""
+    for i, cue in enumerate(cues, start=1):
+        text = f"[{cue['speaker']}] {cue['text']}" if speakers and cue["speaker"] else cue["text"]
+        yield (
+            f"{i}\n"
+            f"{format_timestamp(cue['start'])} --> {format_timestamp(cue['end'])}\n"
+            f"{text}\n\n"
+        )
+
+
+def vtt_stream(cues, speakers: bool = True):
+    """Sous-titres WebVTT (speaker dans une balise de voix <v>)"""
+    yield "WEBVTT\n\n"
+    for i, cue in enumerate(cues, start=1):
+        text = f"<v {cue['speaker']}>{cue['text']}" if speakers and cue["speaker"] else cue["text"]
+        yield (
+            f"{i}\n"
+            f"{format_timestamp(cue['start'], '.')} --> {format_timestamp(cue['end'], '.')}\n"
+            f"{text}\n\n"
+        )
+
+
+def json_stream(cues, speakers: bool = True):
+    """Tableau JSON de segments, écrit élément par élément"""
+    yield "["
+    for i, cue in enumerate(cues):
+        item = {"start": cue["start"], "end": cue["end"], "text": cue["text"]}
+        if speakers:
+            item["speaker"] = cue["speaker"]
+        yield ("," if i else "") + "\n" + json.dumps(item, ensure_ascii=False)
+    yield "\n]\n"
+
+
+FORMATTERS = {
+    "srt": srt_stream,
+    "vtt": vtt_stream,
+    "json": json_stream,
+}
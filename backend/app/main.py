@@ -1,23 +1,45 @@
 # backend/app/main_simple.py
-from fastapi import FastAPI, HTTPException, UploadFile, File, Depends, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Depends, Form, Query, Request, Header
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel, EmailStr
-import bcrypt
+from pydantic import BaseModel, EmailStr, Field
+from typing import Dict, List, Optional
 from jose import jwt
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import Json
 import os
+import json
 import shutil
-import re
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 
-# Import du pipeline IA
+# Import des modules de l'application et du pipeline IA
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
-from IA.pipeline_service import TranscriptionPipeline
+from app.passwords import (
+    hash_password_async, verify_password_async, PasswordHasherBusy
+)
+from app.exports import EXPORT_FORMATS, FORMATTERS, reshape_cues
+from app.regenerate import regenerate_audio, rebuild_documents, RegenerationJobs
+from app.processing import probe_duration, process_audio
+from app.segment_store import rename_speaker, read_segments
+from app.storage import StorageQuotaExceeded, check_storage_quota
+from app.chunked_upload import (
+    UploadError, init_upload, write_chunk, upload_status, complete_upload
+)
+from app.scheduler import (
+    JOB_EXECUTION, JobScheduler, QuotaExceeded, check_quota, db_queue_position, lock_user
+)
+from app.database import (
+    DATABASE_URL, connect, get_db, iter_transcription_rows, save_general_resume
+)
+from IA.cleaning import clean_text
+from IA.compaction import expand_segments
+from IA.resume import stream_compte_rendu
+from IA.profiling import PROFILE_DIRNAME, FOLDED_FILENAME, REPORT_FILENAME
+from IA.speaker_index import SpeakerIndex, load_meeting_embeddings, save_meeting_embeddings
 
 # ============ CHARGEMENT VARIABLES D'ENVIRONNEMENT ============
 load_dotenv()
@@ -41,22 +63,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Configuration DB depuis .env
-DATABASE_URL = os.getenv("DATABASE_URL")
-if not DATABASE_URL:
-    db_user = os.getenv("DB_USER", "postgres")
-    db_password = os.getenv("DB_PASSWORD")
-    db_host = os.getenv("DB_HOST", "localhost")
-    db_port = os.getenv("DB_PORT", "5432")
-    db_name = os.getenv("DB_NAME", "transcription_db")
-    
-    if not db_password:
-        raise ValueError("❌ DB_PASSWORD ou DATABASE_URL manquant dans .env")
-    
-    DATABASE_URL = f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-
-print(f"✅ Connexion DB configurée")
-
 # JWT depuis .env
 SECRET_KEY = os.getenv("SECRET_KEY")
 if not SECRET_KEY:
@@ -67,13 +73,31 @@ print(f"✅ Secret JWT configuré")
 # Dossiers
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
+AUDIO_EXTENSIONS = [".mp3", ".wav", ".m4a", ".ogg", ".flac"]
 
-# ============ CONNEXION DB ============
+# Ordonnanceur des traitements (plus court d'abord, limite par utilisateur).
+# En mode worker, l'API ne traite rien : les processus app.worker réclament les jobs en base.
+scheduler = JobScheduler(run_job=process_audio)
+# Lots de régénération (POST /regenerate), exécutés hors de la requête HTTP
+regeneration_jobs = RegenerationJobs()
 
-def get_db():
-    conn = psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
+@app.on_event("startup")
+def start_scheduler():
+    """Démarrer les workers et reprendre les fichiers restés en file (redémarrage)"""
+    if JOB_EXECUTION != "local":
+        print(f"✅ Traitements délégués aux workers (JOB_EXECUTION={JOB_EXECUTION})")
+        return
+    scheduler.start()
+    conn = connect()
     try:
-        yield conn
+        cur = conn.cursor()
+        cur.execute(
+            """SELECT id_audio, id_user, duration FROM fichiers_audio 
+            WHERE status IN ('pending', 'processing')"""
+        )
+        for row in cur.fetchall():
+            scheduler.submit(row['id_audio'], row['id_user'], row['duration'] or 0.0)
+        cur.close()
     finally:
         conn.close()
 
@@ -88,21 +112,28 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
-# ============ HELPERS ============
+class SpeakerNames(BaseModel):
+    speakers: Dict[str, str]  # {"SPEAKER_00": "Julien", ...}
+
+class RegenerateRequest(BaseModel):
+    ids: List[int]
+
+class ChunkedUploadInit(BaseModel):
+    filename: str
+    size: int
+    chunk_size: Optional[int] = None
+    sha256: Optional[str] = None  # SHA-256 du fichier complet, vérifié à la fin
+    duration: Optional[float] = Field(None, ge=0)  # durée annoncée (s), pour refuser tôt un quota dépassé
+    title: Optional[str] = None
+    num_speakers: Optional[int] = Field(None, ge=1)
+    min_speakers: Optional[int] = Field(None, ge=1)
+    max_speakers: Optional[int] = Field(None, ge=1)
+    profile: bool = False
 
-def hash_password(password: str) -> str:
-    """Hasher un mot de passe avec bcrypt"""
-    # Encoder en bytes et hasher
-    password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    return hashed.decode('utf-8')
+class ChunkedUploadComplete(BaseModel):
+    chunks_sha256: Optional[str] = None  # SHA-256 de la liste des SHA-256 des morceaux envoyés
 
-def verify_password(plain: str, hashed: str) -> bool:
-    """Vérifier un mot de passe"""
-    password_bytes = plain.encode('utf-8')
-    hashed_bytes = hashed.encode('utf-8')
-    return bcrypt.checkpw(password_bytes, hashed_bytes)
+# ============ HELPERS ============
 
 def create_token(email: str) -> str:
     """Créer un token JWT"""
@@ -127,35 +158,6 @@ def get_current_user(credentials: HTTPAuthorizationCredentials, conn):
     except Exception as e:
         raise HTTPException(401, f"Token invalide: {str(e)}")
 
-def extract_segments_from_raw(raw_transcription: str):
-    """Extraire les segments avec timestamps depuis la transcription brute"""
-    lines = raw_transcription.split('\n')
-    segments = []
-    
-    for line in lines:
-        # Pattern: [MM:SS.S - MM:SS.S] [SPEAKER] texte
-        pattern = r'\[(\d{2}:\d{2}\.\d)\s*-\s*(\d{2}:\d{2}\.\d)\]\s*\[([^\]]+)\]\s*(.*)'
-        match = re.match(pattern, line)
-        
-        if match:
-            start_str, end_str, speaker, text = match.groups()
-            
-            # Convertir MM:SS.S en secondes
-            def time_to_seconds(time_str):
-                parts = time_str.split(':')
-                minutes = int(parts[0])
-                seconds = float(parts[1])
-                return minutes * 60 + seconds
-            
-            segments.append({
-                'start_time': time_to_seconds(start_str),
-                'end_time': time_to_seconds(end_str),
-                'speaker': speaker,
-                'text': text.strip()
-            })
-    
-    return segments
-
 # ============ ENDPOINTS ============
 
 @app.get("/")
@@ -168,8 +170,18 @@ def home():
             "register": "POST /register",
             "login": "POST /login",
             "upload": "POST /upload (Auth required)",
+            "upload_morceaux": "POST /uploads/init, PUT /uploads/{id}/chunks/{n}, GET /uploads/{id}, POST /uploads/{id}/complete (Auth required)",
+            "statut": "GET /fichiers/{id}/status, GET /queue (Auth required)",
             "fichiers": "GET /fichiers (Auth required)",
-            "compte_rendu": "GET /fichiers/{id}/compte-rendu (Auth required)"
+            "compte_rendu": "GET /fichiers/{id}/compte-rendu (Auth required)",
+            "compte_rendu_streaming": "POST /fichiers/{id}/compte-rendu/stream (SSE, Auth required)",
+            "statistiques": "GET /fichiers/{id}/stats (Auth required)",
+            "export": "GET /fichiers/{id}/export/{srt|vtt|json} (Auth required)",
+            "segments": "GET /fichiers/{id}/segments?offset=&limit=, GET /fichiers/{id}/segments/index (Auth required)",
+            "profil": "GET /fichiers/{id}/profile?format=folded|json (Auth required)",
+            "regenerer": "POST /fichiers/{id}/regenerate, POST /regenerate + GET /regenerate/{id_job} (Auth required)",
+            "nommer_participants": "POST /fichiers/{id}/speakers (Auth required)",
+            "participants": "GET /participants (Auth required)"
         },
         "docs": "/docs"
     }
@@ -190,26 +202,49 @@ def health_check():
         "env_loaded": "✅" if SECRET_KEY else "❌"
     }
 
-@app.post("/register")
-def register(user: UserRegister, conn=Depends(get_db)):
-    """Créer un compte utilisateur"""
+def fetch_user_by_email(conn, email: str):
+    """Récupérer un utilisateur par email (ou None)"""
+    cur = conn.cursor()
+    cur.execute("SELECT * FROM utilisateurs WHERE email = %s", (email,))
+    user = cur.fetchone()
+    cur.close()
+    return user
+
+def insert_user(conn, name: str, email: str, hashed: str) -> int:
+    """Créer un utilisateur et retourner son id"""
     cur = conn.cursor()
-    
-    # Vérifier si email existe
-    cur.execute("SELECT * FROM utilisateurs WHERE email = %s", (user.email,))
-    if cur.fetchone():
-        cur.close()
-        raise HTTPException(400, "Email déjà utilisé")
-    
-    # Créer utilisateur
-    hashed = hash_password(user.password)
     cur.execute(
         "INSERT INTO utilisateurs (name, email, password) VALUES (%s, %s, %s) RETURNING id_user",
-        (user.name, user.email, hashed)
+        (name, email, hashed)
     )
     user_id = cur.fetchone()['id_user']
     conn.commit()
     cur.close()
+    return user_id
+
+def update_password_hash(conn, user_id: int, hashed: str):
+    """Remplacer le hash d'un utilisateur (changement de coût bcrypt)"""
+    cur = conn.cursor()
+    cur.execute("UPDATE utilisateurs SET password = %s WHERE id_user = %s", (hashed, user_id))
+    conn.commit()
+    cur.close()
+
+def hasher_busy():
+    return HTTPException(503, "Serveur surchargé, réessayez dans quelques secondes", headers={"Retry-After": "1"})
+
+@app.post("/register")
+async def register(user: UserRegister, conn=Depends(get_db)):
+    """Créer un compte utilisateur"""
+    # Vérifier si email existe
+    if await run_in_threadpool(fetch_user_by_email, conn, user.email):
+        raise HTTPException(400, "Email déjà utilisé")
+    
+    # Créer utilisateur (hachage dans l'executor bcrypt dédié)
+    try:
+        hashed = await hash_password_async(user.password)
+    except PasswordHasherBusy:
+        raise hasher_busy()
+    user_id = await run_in_threadpool(insert_user, conn, user.name, user.email, hashed)
     
     return {
         "id_user": user_id,
@@ -219,16 +254,25 @@ def register(user: UserRegister, conn=Depends(get_db)):
     }
 
 @app.post("/login")
-def login(credentials: UserLogin, conn=Depends(get_db)):
+async def login(credentials: UserLogin, conn=Depends(get_db)):
     """Se connecter et obtenir un token JWT"""
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM utilisateurs WHERE email = %s", (credentials.email,))
-    user = cur.fetchone()
-    cur.close()
+    user = await run_in_threadpool(fetch_user_by_email, conn, credentials.email)
+    
+    if not user:
+        raise HTTPException(401, "Email ou mot de passe incorrect")
     
-    if not user or not verify_password(credentials.password, user['password']):
+    try:
+        valid, new_hash = await verify_password_async(credentials.password, user['password'])
+    except PasswordHasherBusy:
+        raise hasher_busy()
+    
+    if not valid:
         raise HTTPException(401, "Email ou mot de passe incorrect")
     
+    # Le coût bcrypt a changé : on met à jour le hash de façon transparente
+    if new_hash:
+        await run_in_threadpool(update_password_hash, conn, user['id_user'], new_hash)
+    
     token = create_token(credentials.email)
     
     return {
@@ -245,16 +289,25 @@ def login(credentials: UserLogin, conn=Depends(get_db)):
 def upload(
     file: UploadFile = File(...),
     title: str = Form(None),
+    num_speakers: int = Form(None, ge=1, description="Nombre exact de participants, si connu"),
+    min_speakers: int = Form(None, ge=1, description="Nombre minimum de participants"),
+    max_speakers: int = Form(None, ge=1, description="Nombre maximum de participants"),
+    profile: bool = Form(False, description="Enregistrer un profil d'exécution (GET /fichiers/{id}/profile)"),
     credentials: HTTPAuthorizationCredentials = Depends(security),
     conn = Depends(get_db)
 ):
     """
-    Upload un fichier audio de réunion et génère le compte-rendu complet.
+    Upload un fichier audio de réunion et le place dans la file de traitement.
     
-    ⏳ Traitement : 5-15 minutes selon la taille du fichier
+    ⏳ Les fichiers les plus courts passent en premier ; chaque utilisateur a un
+    nombre limité de traitements simultanés et un quota de minutes par jour.
+    
+    Indiquer le nombre de participants (num_speakers, ou min/max_speakers)
+    accélère et fiabilise la diarisation.
     
     Retourne :
-    compte rendu bien structuré avec trasncription
+    id du fichier, position dans la file et ETA.
+    Suivi : GET /fichiers/{id}/status, puis GET /fichiers/{id}/compte-rendu
     
     """
     
@@ -263,9 +316,12 @@ def upload(
     
     # Vérifier extension
     ext = os.path.splitext(file.filename)[1].lower()
-    if ext not in [".mp3", ".wav", ".m4a", ".ogg", ".flac"]:
+    if ext not in AUDIO_EXTENSIONS:
         raise HTTPException(400, f"Format non supporté. Utilisez: .mp3, .wav, .m4a, .ogg, .flac")
     
+    if min_speakers and max_speakers and min_speakers > max_speakers:
+        raise HTTPException(400, "min_speakers doit être inférieur ou égal à max_speakers")
+    
     # Sauvegarder fichier
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"{timestamp}_{file.filename}"
@@ -274,167 +330,236 @@ def upload(
     with open(audio_path, "wb") as f:
         shutil.copyfileobj(file.file, f)
     
-    cur = conn.cursor()
+    return enqueue_audio(conn, user, audio_path, title or file.filename, {
+        "num_speakers": num_speakers,
+        "min_speakers": min_speakers,
+        "max_speakers": max_speakers,
+        "profile": profile
+    })
+
+def enqueue_audio(conn, user, audio_path: str, title: str, options: dict):
+    """Mesurer la durée, vérifier les quotas, créer l'entrée 'pending' et la soumettre"""
+    try:
+        duration = probe_duration(audio_path)
+    except Exception as e:
+        os.remove(audio_path)
+        raise HTTPException(400, f"Fichier audio illisible : {str(e)}")
     
+    size = os.path.getsize(audio_path)
+    cur = conn.cursor()
     try:
-        # 1️⃣ Créer l'entrée Fichier_Audio
-        cur.execute(
+        # Quotas vérifiés et fichier inséré dans la même transaction, utilisateur verrouillé
+        lock_user(cur, user['id_user'])
+        check_quota(cur, user['id_user'], duration)
+        check_storage_quota(cur, user['id_user'], size)
+    except QuotaExceeded as e:
+        conn.rollback()
+        cur.close()
+        os.remove(audio_path)
+        raise HTTPException(429, str(e))
+    except StorageQuotaExceeded as e:
+        conn.rollback()
+        cur.close()
+        os.remove(audio_path)
+        raise HTTPException(413, str(e))
+    
+    cur.execute(
         """INSERT INTO fichiers_audio 
-            (id_user, title, status, file_path) 
-            VALUES (%s, %s, 'processing', %s) 
+            (id_user, title, status, file_path, duration, options, storage_bytes) 
+            VALUES (%s, %s, 'pending', %s, %s, %s, %s) 
             RETURNING id_audio""",
-        (user['id_user'], title or file.filename, audio_path)
-        )
-        audio_id = cur.fetchone()['id_audio']
-        conn.commit()
-    
-        print(f"🚀 Démarrage du pipeline pour fichier {audio_id}...")
-        print(f"📁 Fichier : {file.filename}")
-
-        # Dossier de sortie unique par audio_id
-        output_dir = os.path.join("outputs", f"audio_{audio_id}")
-
-        # Supprimer l'ancien dossier s'il existe
-        if os.path.exists(output_dir):
-            print(f"🗑️ Suppression de l'ancien dossier {output_dir}...")
-            shutil.rmtree(output_dir)
-
-        # Créer un nouveau dossier propre
-        os.makedirs(output_dir, exist_ok=True)
-        print(f"📁 Dossier de sortie créé : {output_dir}")
-
-        # 2️⃣ Exécuter le pipeline IA avec output_dir spécifique
-        pipeline = TranscriptionPipeline(
-            audio_file=audio_path,
-            output_dir=output_dir
-            )
-        results = pipeline.run(save_intermediary_files=False)
-    
-        # DEBUG: Voir le format exact
-        print("="*60)
-        print("📄 FORMAT DE LA TRANSCRIPTION BRUTE (5 premières lignes):")
-        print("="*60)
-        for i, line in enumerate(results["raw_transcription"].split('\n')[:5]):
-            print(f"Ligne {i}: {repr(line)}")
-            print("="*60)
-    
-        print(f"✅ Pipeline terminé pour {audio_id}")
-    
-        # 3️⃣ Extraire et sauvegarder les segments
-        print(f"📝 Extraction des segments...")
-        segments = extract_segments_from_raw(results["raw_transcription"])
-        print(f"📊 Nombre de segments extraits : {len(segments)}")
-
-        if len(segments) == 0:
-            print("⚠️ ATTENTION : Aucun segment extrait !")
-            print(f"📄 Transcription brute (100 premiers caractères) : {results['raw_transcription'][:100]}")
-    
-        for seq, segment in enumerate(segments):
-            print(f"💾 Insertion segment {seq}: {segment['speaker']} - {segment['text'][:30]}...")
-            cur.execute(
-            """INSERT INTO transcriptions 
-                (id_audio, text_brut, start_time, end_time, speaker, sequence_number) 
-                VALUES (%s, %s, %s, %s, %s, %s)""",
-            (audio_id, segment['text'], segment['start_time'], 
-            segment['end_time'], segment['speaker'], seq)
-            )
-    
-        print(f"✅ {len(segments)} segments insérés")
-    
-        # 4️⃣ Sauvegarder le résumé GÉNÉRAL
-        print(f"💾 Insertion résumé général...")
-        cur.execute(
-        """INSERT INTO resumes (id_audio, summary_text, type_resume) 
-            VALUES (%s, %s, 'general')""",
-        (audio_id, results["summary"])
-        )
-        print(f"✅ Résumé général inséré")
-    
-        # 5️⃣ Sauvegarder les résumés PAR SPEAKER
-        print(f"💾 Insertion résumés par speaker...")
-        print(f"📊 speaker_summaries : {results.get('speaker_summaries')}")
-
-        if results.get("speaker_summaries"):
-            for speaker, summary in results["speaker_summaries"].items():
-                print(f"💾 Insertion résumé pour {speaker}...")
-                cur.execute(
-                """INSERT INTO resumes (id_audio, summary_text, type_resume, speaker) 
-                    VALUES (%s, %s, 'par_speaker', %s)""",
-                (audio_id, summary, speaker)
-                )   
-            print(f"✅ {len(results['speaker_summaries'])} résumés par speaker insérés")
-        else:
-            print("⚠️ Aucun résumé par speaker trouvé")
+        (user['id_user'], title, audio_path, duration, Json(options), size)
+    )
+    audio_id = cur.fetchone()['id_audio']
+    conn.commit()
+    
+    if JOB_EXECUTION == "local":
+        scheduler.submit(audio_id, user['id_user'], duration)
+    estimate = job_estimate(cur, audio_id) or {}
+    cur.close()
+    print(f"📥 Fichier {audio_id} en file ({duration / 60:.1f} min) : position {estimate.get('position')}")
+    
+    return {
+        "message": "📥 Fichier reçu, traitement en file d'attente",
+        "id_audio": audio_id,
+        "title": title,
+        "duree_minutes": round(duration / 60, 2),
+        "status": "pending",
+        "position": estimate.get("position"),
+        "eta_secondes": estimate.get("eta_seconds"),
+        "suivi": f"/fichiers/{audio_id}/status"
+    }
 
-        
-        # 6️⃣ Calculer durée et nombre de speakers
-        duration = segments[-1]['end_time'] if segments else 0
-        speakers_set = set(seg['speaker'] for seg in segments)
-        num_speakers = len(speakers_set)
-        
-        # 7️⃣ Mettre à jour le fichier audio
-        cur.execute(
-            """UPDATE fichiers_audio 
-            SET status = 'completed', 
-                duration = %s,
-                num_speakers = %s
-            WHERE id_audio = %s""",
-            (duration, num_speakers, audio_id)
-        )
-        
-        conn.commit()
-        
-        print(f"✅ Traitement terminé : {audio_id}")
-        print(f"📊 Durée : {duration:.1f}s | Speakers : {num_speakers} | Segments : {len(segments)}")
-        
-        # 8️⃣ Récupérer et formater le compte-rendu complet
-        cur.execute(
-            """SELECT summary_text, type_resume, speaker 
-            FROM resumes 
-            WHERE id_audio = %s""",
-            (audio_id,)
-        )
-        resumes = cur.fetchall()
-        
-        resume_general = next((r['summary_text'] for r in resumes if r['type_resume'] == 'general'), "")
-        resumes_speakers = {r['speaker']: r['summary_text'] for r in resumes if r['type_resume'] == 'par_speaker'}
-        
+def job_estimate(cur, audio_id: int):
+    """Position (et ETA en mode local) d'un fichier en attente ou en cours"""
+    if JOB_EXECUTION == "local":
+        return scheduler.estimate(audio_id)
+    position = db_queue_position(cur, audio_id)
+    return {"position": position, "eta_seconds": None} if position else None
+
+# ============ UPLOAD PAR MORCEAUX (REPRENABLE) ============
+
+@app.post("/uploads/init")
+def chunked_upload_init(
+    body: ChunkedUploadInit,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    conn = Depends(get_db)
+):
+    """
+    Démarrer un upload par morceaux.
+    Le client envoie ensuite chaque morceau (PUT /uploads/{id}/chunks/{n}, en parallèle)
+    puis appelle POST /uploads/{id}/complete. Après une coupure, GET /uploads/{id}
+    indique les morceaux manquants.
+    """
+    user = get_current_user(credentials, conn)
+    
+    ext = os.path.splitext(body.filename)[1].lower()
+    if ext not in AUDIO_EXTENSIONS:
+        raise HTTPException(400, f"Format non supporté. Utilisez: {', '.join(AUDIO_EXTENSIONS)}")
+    if body.min_speakers and body.max_speakers and body.min_speakers > body.max_speakers:
+        raise HTTPException(400, "min_speakers doit être inférieur ou égal à max_speakers")
+    
+    # Quotas vérifiés dès l'annonce de la taille (et de la durée), avant l'envoi des morceaux ;
+    # la durée réelle (ffprobe) est revérifiée à /complete
+    cur = conn.cursor()
+    try:
+        check_quota(cur, user['id_user'], body.duration or 0)
+        check_storage_quota(cur, user['id_user'], body.size)
+    except QuotaExceeded as e:
+        raise HTTPException(429, str(e))
+    except StorageQuotaExceeded as e:
+        raise HTTPException(413, str(e))
+    finally:
         cur.close()
-        
-        # 9️⃣ Retourner le compte-rendu
-        return {
-            "message": "✅ Compte-rendu généré avec succès !",
-            "id_audio": audio_id,
-            "title": title or file.filename,
-            "duree_minutes": round(duration / 60, 2),
-            "nombre_participants": num_speakers,
-            "participants": list(speakers_set),
-            
-            "resume_general": resume_general,
-            "resumes_par_participant": resumes_speakers,
-            
-            "transcription_complete": {
-                "nombre_segments": len(segments),
-                "segments": [
-                    {
-                        "temps": f"{int(s['start_time']//60):02d}:{int(s['start_time']%60):02d} - {int(s['end_time']//60):02d}:{int(s['end_time']%60):02d}",
-                        "participant": s['speaker'],
-                        "texte": s['text']
-                    }
-                    for s in segments[:10]  # Premiers 10 segments
-                ] + ([{"message": f"... et {len(segments)-10} segments supplémentaires"}] if len(segments) > 10 else [])
+    
+    try:
+        meta = init_upload(
+            user['id_user'], body.filename, body.size,
+            chunk_size=body.chunk_size, sha256=body.sha256, title=body.title,
+            options={
+                "num_speakers": body.num_speakers,
+                "min_speakers": body.min_speakers,
+                "max_speakers": body.max_speakers,
+                "profile": body.profile
             }
-        }
-        
-    except Exception as e:
-        if 'audio_id' in locals():
-            cur.execute(
-                "UPDATE fichiers_audio SET status = 'failed' WHERE id_audio = %s",
-                (audio_id,)
-            )
-            conn.commit()
+        )
+    except UploadError as e:
+        raise HTTPException(e.status_code, str(e))
+    
+    return {
+        "upload_id": meta["upload_id"],
+        "chunk_size": meta["chunk_size"],
+        "total_chunks": meta["total_chunks"],
+        "received": []
+    }
+
+@app.put("/uploads/{upload_id}/chunks/{index}")
+async def chunked_upload_chunk(
+    upload_id: str,
+    index: int,
+    request: Request,
+    x_chunk_sha256: str = Header(None, description="SHA-256 hexadécimal du morceau"),
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    conn = Depends(get_db)
+):
+    """Envoyer le morceau `index` (corps brut, application/octet-stream)"""
+    user = await run_in_threadpool(get_current_user, credentials, conn)
+    data = await request.body()
+    try:
+        return await run_in_threadpool(write_chunk, upload_id, user['id_user'], index, data, x_chunk_sha256)
+    except UploadError as e:
+        raise HTTPException(e.status_code, str(e))
+
+@app.get("/uploads/{upload_id}")
+def chunked_upload_status(
+    upload_id: str,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    conn = Depends(get_db)
+):
+    """Morceaux reçus et manquants (pour reprendre après une coupure)"""
+    user = get_current_user(credentials, conn)
+    try:
+        return upload_status(upload_id, user['id_user'])
+    except UploadError as e:
+        raise HTTPException(e.status_code, str(e))
+
+@app.post("/uploads/{upload_id}/complete")
+def chunked_upload_complete(
+    upload_id: str,
+    body: Optional[ChunkedUploadComplete] = None,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    conn = Depends(get_db)
+):
+    """Assembler le fichier, vérifier ses checksums et le placer en file de traitement"""
+    user = get_current_user(credentials, conn)
+    try:
+        result = complete_upload(
+            upload_id, user['id_user'], UPLOAD_DIR,
+            chunks_sha256=body.chunks_sha256 if body else None
+        )
+    except UploadError as e:
+        raise HTTPException(e.status_code, str(e))
+    
+    meta = result["meta"]
+    response = enqueue_audio(conn, user, result["path"], meta["title"] or meta["filename"], meta["options"])
+    return {**response, "sha256": result["sha256"], "chunks_sha256": result["chunks_sha256"]}
+
+@app.get("/fichiers/{audio_id}/status")
+def get_status(
+    audio_id: int,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    conn = Depends(get_db)
+):
+    """Statut du traitement : position dans la file et ETA tant qu'il n'est pas terminé"""
+    user = get_current_user(credentials, conn)
+    
+    cur = conn.cursor()
+    cur.execute(
+        """SELECT id_audio, title, status, duration FROM fichiers_audio 
+        WHERE id_audio = %s AND id_user = %s""",
+        (audio_id, user['id_user'])
+    )
+    fichier = cur.fetchone()
+    
+    if not fichier:
         cur.close()
-        raise HTTPException(500, f"❌ Erreur: {str(e)}")
+        raise HTTPException(404, "Fichier non trouvé")
+    
+    estimate = job_estimate(cur, audio_id) if fichier['status'] in ('pending', 'processing') else None
+    cur.close()
+    return {
+        "id_audio": audio_id,
+        "title": fichier['title'],
+        "status": fichier['status'],
+        "duree_minutes": round(fichier['duration'] / 60, 2) if fichier['duration'] else None,
+        "position": estimate["position"] if estimate else None,
+        "eta_secondes": estimate["eta_seconds"] if estimate else None
+    }
+
+@app.get("/queue")
+def get_queue(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    conn = Depends(get_db)
+):
+    """État de la file de traitement et fichiers de l'utilisateur en attente"""
+    user = get_current_user(credentials, conn)
+    
+    cur = conn.cursor()
+    cur.execute(
+        """SELECT id_audio, title, status FROM fichiers_audio 
+        WHERE id_user = %s AND status IN ('pending', 'processing')
+        ORDER BY date_upload""",
+        (user['id_user'],)
+    )
+    fichiers = cur.fetchall()
+    mes_fichiers = [{**dict(f), **(job_estimate(cur, f['id_audio']) or {})} for f in fichiers]
+    cur.close()
+    
+    return {
+        "execution": JOB_EXECUTION,
+        **(scheduler.snapshot() if JOB_EXECUTION == "local" else {}),
+        "mes_fichiers": mes_fichiers
+    }
 
 @app.get("/fichiers/{audio_id}/pdf")
 def download_pdf(
@@ -463,6 +588,8 @@ def download_pdf(
     pdf_path = os.path.join("outputs", f"audio_{audio_id}", "transcription_finale.pdf")
     
     if not os.path.exists(pdf_path):
+        if fichier.get('outputs_purged_at'):
+            raise HTTPException(404, f"PDF expiré. Régénérez-le : POST /fichiers/{audio_id}/regenerate")
         raise HTTPException(404, "PDF non disponible. Le traitement est peut-être en cours.")
     
     # Retourner le fichier
@@ -482,7 +609,7 @@ def list_fichiers(
     
     cur = conn.cursor()
     cur.execute(
-        """SELECT id_audio, title, status, date_upload, duration, num_speakers
+        """SELECT id_audio, title, status, date_upload, duration, num_speakers, skipped_seconds
         FROM fichiers_audio
         WHERE id_user = %s 
         ORDER BY date_upload DESC""",
@@ -535,7 +662,7 @@ def get_compte_rendu(
     # Récupérer la transcription
     cur.execute(
         """SELECT text_brut, start_time, end_time, speaker, sequence_number
-        FROM transcriptions 
+        FROM transcription_segments 
         WHERE id_audio = %s 
         ORDER BY sequence_number""",
         (audio_id,)
@@ -552,6 +679,7 @@ def get_compte_rendu(
         "titre": fichier['title'],
         "date": str(fichier['date_upload']),
         "duree_minutes": round(fichier['duration'] / 60, 2) if fichier['duration'] else None,
+        "silence_ignore_secondes": fichier.get('skipped_seconds'),
         "nombre_participants": fichier['num_speakers'],
         
         "resume_general": resume_general,
@@ -565,4 +693,421 @@ def get_compte_rendu(
             }
             for s in segments
         ]
-    }
\ No newline at end of file
+    }
+
+def sse_event(event: str, data) -> str:
+    """Événement Server-Sent Events (data en JSON)"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/fichiers/{audio_id}/compte-rendu/stream")
+def stream_compte_rendu_endpoint(
+    audio_id: int,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    conn = Depends(get_db)
+):
+    """
+    Régénérer le compte-rendu en streaming (text/event-stream).
+    
+    Événements :
+    - delta   : fragment de texte, dès qu'il est produit par le LLM
+    - section : {"titre", "contenu"} dès qu'une section est complète
+    - done    : {"compte_rendu_complet", "resume_court"}, après enregistrement dans resumes
+                et réécriture du PDF/Word (outputs/audio_{id}/transcription_finale)
+    - error   : {"detail"} ; le résumé précédent est conservé
+    """
+    user = get_current_user(credentials, conn)
+    
+    cur = conn.cursor()
+    fichier = get_user_fichier(cur, audio_id, user['id_user'])
+    if fichier['status'] != 'completed':
+        cur.close()
+        raise HTTPException(409, f"Traitement non terminé (statut : {fichier['status']})")
+    cur.execute(
+        """SELECT speaker, summary_text FROM resumes 
+        WHERE id_audio = %s AND type_resume = 'par_speaker'""",
+        (audio_id,)
+    )
+    speaker_summaries = {r['speaker']: r['summary_text'] for r in cur.fetchall()}
+    cur.close()
+    
+    def events():
+        # Même texte que le pipeline : segments stockés, nettoyés un par un
+        cleaned_text = " ".join(
+            clean_text(seg['text']) for seg in iter_transcription_rows(audio_id) if seg['text'].strip()
+        )
+        try:
+            for event, data in stream_compte_rendu(cleaned_text, speaker_summaries):
+                if event == "done":
+                    # Connexion dédiée : celle de la requête n'est plus garantie pendant le streaming
+                    db = connect()
+                    try:
+                        db_cur = db.cursor()
+                        save_general_resume(db_cur, audio_id, data["compte_rendu_complet"])
+                        db.commit()
+                        db_cur.close()
+                    finally:
+                        db.close()
+                    # Avant "done" : le client peut fermer le flux dès sa réception
+                    try:
+                        rebuild_documents(audio_id, fichier['file_path'], data["compte_rendu_complet"])
+                    except Exception as e:
+                        print(f"⚠️ Erreur réécriture PDF/Word {audio_id}: {e}")
+                yield sse_event(event, data)
+        except Exception as e:
+            print(f"⚠️ Erreur streaming compte-rendu {audio_id}: {e}")
+            yield sse_event("error", {"detail": str(e)})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/fichiers/{audio_id}/speakers")
+def name_speakers(
+    audio_id: int,
+    body: SpeakerNames,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    conn = Depends(get_db)
+):
+    """
+    Nommer les participants d'une réunion : {"speakers": {"SPEAKER_00": "Julien"}}.
+
+    Les empreintes vocales sont ajoutées à l'index de l'utilisateur : ces
+    participants seront reconnus automatiquement dans les prochaines réunions.
+    """
+    user = get_current_user(credentials, conn)
+    
+    cur = conn.cursor()
+    cur.execute(
+        """SELECT * FROM fichiers_audio 
+        WHERE id_audio = %s AND id_user = %s""",
+        (audio_id, user['id_user'])
+    )
+    fichier = cur.fetchone()
+    
+    if not fichier:
+        cur.close()
+        raise HTTPException(404, "Fichier non trouvé")
+    
+    output_dir = os.path.join("outputs", f"audio_{audio_id}")
+    embeddings = load_meeting_embeddings(output_dir)
+    
+    unknown = [label for label in body.speakers if label not in embeddings]
+    if unknown:
+        cur.close()
+        raise HTTPException(400, f"Speakers inconnus pour ce fichier : {', '.join(unknown)}")
+    
+    for name in body.speakers.values():
+        if not name.strip() or len(name) > 50:
+            cur.close()
+            raise HTTPException(400, "Le nom d'un participant doit faire entre 1 et 50 caractères")
+    
+    index = SpeakerIndex.load(user['id_user'])
+    for label, name in body.speakers.items():
+        name = name.strip()
+        index.add(name, embeddings[label])
+        rename_speaker(cur, audio_id, label, name)
+        cur.execute(
+            "UPDATE resumes SET speaker = %s WHERE id_audio = %s AND speaker = %s",
+            (name, audio_id, label)
+        )
+    
+    index.save()
+    conn.commit()
+    cur.close()
+    
+    # Renommer aussi les empreintes de la réunion
+    renamed = {body.speakers.get(label, label).strip(): emb for label, emb in embeddings.items()}
+    save_meeting_embeddings(renamed, output_dir)
+    
+    return {
+        "message": "✅ Participants enregistrés",
+        "id_audio": audio_id,
+        "participants": {label: name.strip() for label, name in body.speakers.items()}
+    }
+
+@app.get("/participants")
+def list_participants(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    conn = Depends(get_db)
+):
+    """Liste les participants dont l'empreinte vocale est connue"""
+    user = get_current_user(credentials, conn)
+    index = SpeakerIndex.load(user['id_user'])
+    
+    return {
+        "participants": index.participants,
+        "nombre_empreintes": len(index)
+    }
+
+@app.get("/fichiers/{audio_id}/stats")
+def get_stats(
+    audio_id: int,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    conn = Depends(get_db)
+):
+    """
+    Statistiques d'une réunion (calculées à l'ingestion) :
+    temps de parole, tours de parole, interruptions et mots par minute par participant.
+    """
+    user = get_current_user(credentials, conn)
+    
+    cur = conn.cursor()
+    cur.execute(
+        """SELECT s.* 
+        FROM meeting_stats s
+        JOIN fichiers_audio f ON f.id_audio = s.id_audio
+        WHERE s.id_audio = %s AND f.id_user = %s""",
+        (audio_id, user['id_user'])
+    )
+    stats = cur.fetchone()
+    cur.close()
+    
+    if not stats:
+        raise HTTPException(404, "Statistiques non disponibles pour ce fichier")
+    
+    return {
+        "id_audio": audio_id,
+        "duree_minutes": round(stats['duration'] / 60, 2),
+        "nombre_participants": stats['num_speakers'],
+        "nombre_segments": stats['num_segments'],
+        "tours_de_parole": stats['num_turns'],
+        "interruptions": stats['num_interruptions'],
+        "mots_par_minute": stats['words_per_minute'],
+        "participants": stats['speaker_stats'],
+        "date_calcul": str(stats['computed_at'])
+    }
+
+@app.get("/fichiers/{audio_id}/export/{export_format}")
+def export_transcription(
+    audio_id: int,
+    export_format: str,
+    speakers: bool = Query(True, description="Préfixer chaque sous-titre par le participant"),
+    max_duration: float = Query(None, gt=0, description="Durée maximale d'un sous-titre (secondes)"),
+    merge: bool = Query(False, description="Fusionner les segments consécutifs d'un même participant"),
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    conn = Depends(get_db)
+):
+    """
+    Exporter la transcription en SRT, WebVTT ou JSON.
+
+    Les sous-titres sont envoyés au fil de la lecture des segments stockés :
+    le document complet n'est jamais construit en mémoire.
+    """
+    user = get_current_user(credentials, conn)
+    
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(400, f"Format non supporté. Utilisez: {', '.join(EXPORT_FORMATS)}")
+    
+    cur = conn.cursor()
+    cur.execute(
+        """SELECT * FROM fichiers_audio 
+        WHERE id_audio = %s AND id_user = %s""",
+        (audio_id, user['id_user'])
+    )
+    fichier = cur.fetchone()
+    cur.close()
+    
+    if not fichier:
+        raise HTTPException(404, "Fichier non trouvé")
+    
+    media_type, extension = EXPORT_FORMATS[export_format]
+    # Segments compactés redécoupés en segments d'origine : sous-titres courts et précis
+    cues = reshape_cues(expand_segments(iter_transcription_rows(audio_id)), max_duration=max_duration, merge=merge)
+    
+    return StreamingResponse(
+        FORMATTERS[export_format](cues, speakers=speakers),
+        media_type=f"{media_type}; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="audio_{audio_id}.{extension}"'}
+    )
+
+def get_user_fichier(cur, audio_id: int, user_id: int):
+    """Fichier de l'utilisateur, ou 404"""
+    cur.execute(
+        """SELECT * FROM fichiers_audio 
+        WHERE id_audio = %s AND id_user = %s""",
+        (audio_id, user_id)
+    )
+    fichier = cur.fetchone()
+    if not fichier:
+        cur.close()
+        raise HTTPException(404, "Fichier non trouvé")
+    return fichier
+
+@app.get("/fichiers/{audio_id}/segments")
+def list_segments(
+    audio_id: int,
+    offset: int = Query(0, ge=0, description="Numéro du premier segment"),
+    limit: int = Query(200, ge=1, le=1000, description="Nombre de segments"),
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    conn = Depends(get_db)
+):
+    """
+    Page de segments de la transcription (pour l'affichage virtualisé).
+    Format rows : lecture par l'index (id_audio, sequence_number) ; format blocks :
+    seuls les blocs qui recoupent la page sont dépaquetés (voir read_segments).
+    offsets : [début, fin, position dans le texte] des segments d'origine d'un tour compacté.
+    """
+    user = get_current_user(credentials, conn)
+    
+    cur = conn.cursor()
+    fichier = get_user_fichier(cur, audio_id, user['id_user'])
+    segments = read_segments(cur, audio_id, offset, limit, fichier.get('segment_storage'))
+    cur.close()
+    
+    return {
+        "offset": offset,
+        "segments": segments
+    }
+
+@app.get("/fichiers/{audio_id}/segments/index")
+def segments_index(
+    audio_id: int,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    conn = Depends(get_db)
+):
+    """
+    Index compact de la transcription, en colonnes : début de chaque segment et
+    code de son participant. Permet au client de se positionner sur un instant
+    (recherche dichotomique) ou sur les interventions d'un participant sans
+    charger le texte.
+    """
+    user = get_current_user(credentials, conn)
+    
+    cur = conn.cursor()
+    get_user_fichier(cur, audio_id, user['id_user'])
+    cur.execute(
+        """SELECT start_time, speaker
+        FROM transcription_segments 
+        WHERE id_audio = %s 
+        ORDER BY sequence_number""",
+        (audio_id,)
+    )
+    speakers = []
+    codes = {}
+    starts = []
+    speaker_codes = []
+    for row in cur:
+        if row['speaker'] not in codes:
+            codes[row['speaker']] = len(speakers)
+            speakers.append(row['speaker'])
+        starts.append(round(row['start_time'], 2))
+        speaker_codes.append(codes[row['speaker']])
+    cur.close()
+    
+    return {
+        "count": len(starts),
+        "speakers": speakers,
+        "starts": starts,
+        "speaker_codes": speaker_codes
+    }
+
+@app.get("/fichiers/{audio_id}/profile")
+def get_profile(
+    audio_id: int,
+    profile_format: str = Query("folded", alias="format", description="folded (flamegraph) ou json (étapes + opérateurs torch)"),
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    conn = Depends(get_db)
+):
+    """
+    Profil d'exécution d'un traitement lancé avec profile=true.
+    Le format folded s'ouvre dans speedscope ou flamegraph.pl.
+    """
+    user = get_current_user(credentials, conn)
+    
+    if profile_format not in ("folded", "json"):
+        raise HTTPException(400, "Format non supporté. Utilisez: folded, json")
+    
+    cur = conn.cursor()
+    get_user_fichier(cur, audio_id, user['id_user'])
+    cur.close()
+    
+    filename = FOLDED_FILENAME if profile_format == "folded" else REPORT_FILENAME
+    path = os.path.join("outputs", f"audio_{audio_id}", PROFILE_DIRNAME, filename)
+    if not os.path.exists(path):
+        raise HTTPException(404, "Aucun profil pour ce fichier (upload avec profile=true)")
+    
+    return FileResponse(
+        path,
+        media_type="text/plain; charset=utf-8" if profile_format == "folded" else "application/json",
+        filename=f"audio_{audio_id}_{filename}"
+    )
+
+@app.post("/fichiers/{audio_id}/regenerate")
+def regenerate(
+    audio_id: int,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    conn = Depends(get_db)
+):
+    """
+    Régénérer texte nettoyé, résumés et documents à partir de la transcription
+    stockée (sans refaire la diarisation ni la transcription).
+    """
+    user = get_current_user(credentials, conn)
+    
+    cur = conn.cursor()
+    cur.execute(
+        """SELECT * FROM fichiers_audio 
+        WHERE id_audio = %s AND id_user = %s AND status = 'completed'""",
+        (audio_id, user['id_user'])
+    )
+    fichier = cur.fetchone()
+    cur.close()
+    
+    if not fichier:
+        raise HTTPException(404, "Fichier non trouvé ou traitement non terminé")
+    
+    try:
+        result = regenerate_audio(audio_id)
+    except Exception as e:
+        raise HTTPException(500, f"❌ Erreur: {str(e)}")
+    
+    return {"message": "✅ Compte-rendu régénéré", **result}
+
+@app.post("/regenerate", status_code=202)
+def regenerate_batch(
+    body: RegenerateRequest,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    conn = Depends(get_db)
+):
+    """
+    Régénérer plusieurs fichiers en parallèle (uniquement ceux de l'utilisateur).
+    Le lot tourne en arrière-plan : réponse 202 avec l'identifiant à suivre
+    sur GET /regenerate/{id_job}.
+    """
+    user = get_current_user(credentials, conn)
+    
+    cur = conn.cursor()
+    cur.execute(
+        """SELECT id_audio FROM fichiers_audio 
+        WHERE id_audio = ANY(%s) AND id_user = %s AND status = 'completed'""",
+        (body.ids, user['id_user'])
+    )
+    audio_ids = [row['id_audio'] for row in cur.fetchall()]
+    cur.close()
+    
+    if not audio_ids:
+        raise HTTPException(404, "Aucun fichier à régénérer")
+    
+    job_id = regeneration_jobs.submit(user['id_user'], audio_ids)
+    return {
+        "message": f"⏳ Régénération de {len(audio_ids)} fichiers lancée",
+        "id_job": job_id,
+        "suivi": f"/regenerate/{job_id}",
+        "ignores": sorted(set(body.ids) - set(audio_ids))
+    }
+
+@app.get("/regenerate/{job_id}")
+def regenerate_batch_status(
+    job_id: str,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    conn = Depends(get_db)
+):
+    """Avancement d'un lot POST /regenerate"""
+    user = get_current_user(credentials, conn)
+    
+    job = regeneration_jobs.get(job_id, user['id_user'])
+    if not job:
+        raise HTTPException(404, "Lot de régénération introuvable")
+    return job
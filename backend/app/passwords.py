@@ -0,0 +1,89 @@
+# backend/app/passwords.py
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ============ CONFIGURATION ============
+
+# Coût bcrypt (2^rounds itérations). Les hashs existants sont mis à jour à la connexion.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Threads dédiés au hachage : bcrypt libère le GIL, les threads suffisent
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", str(os.cpu_count() or 2)))
+# Nombre maximum de hachages en attente avant de refuser (503)
+PASSWORD_QUEUE_LIMIT = int(os.getenv("PASSWORD_QUEUE_LIMIT", "64"))
+
+# Executor séparé du threadpool FastAPI : un pic de connexions ne bloque plus
+# les endpoints qui attendent la base de données
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_WORKERS, thread_name_prefix="bcrypt")
+_slots = threading.BoundedSemaphore(PASSWORD_WORKERS + PASSWORD_QUEUE_LIMIT)
+
+
+class PasswordHasherBusy(Exception):
+    """File d'attente du hachage pleine"""
+
+
+# ============ FONCTIONS SYNCHRONES ============
+
+def hash_password(password: str, rounds: int = None) -> str:
+    """Hasher un mot de passe avec bcrypt"""
+    # Encoder en bytes et hasher
+    password_bytes = password.encode('utf-8')
+    salt = bcrypt.gensalt(rounds=rounds or BCRYPT_ROUNDS)
+    hashed = bcrypt.hashpw(password_bytes, salt)
+    return hashed.decode('utf-8')
+
+def verify_password(plain: str, hashed: str) -> bool:
+    """Vérifier un mot de passe"""
+    password_bytes = plain.encode('utf-8')
+    hashed_bytes = hashed.encode('utf-8')
+    return bcrypt.checkpw(password_bytes, hashed_bytes)
+
+def hash_rounds(hashed: str) -> int:
+    """Coût d'un hash bcrypt ($2b$12$... → 12)"""
+    try:
+        return int(hashed.split("$")[2])
+    except (IndexError, ValueError):
+        return 0
+
+def needs_rehash(hashed: str) -> bool:
+    """True si le hash a été créé avec un autre coût que BCRYPT_ROUNDS"""
+    return hash_rounds(hashed) != BCRYPT_ROUNDS
+
+def _verify_and_rehash(plain: str, hashed: str) -> tuple:
+    if not verify_password(plain, hashed):
+        return False, None
+    if needs_rehash(hashed):
+        return True, hash_password(plain)
+    return True, None
+
+
+# ============ FONCTIONS ASYNCHRONES (executor dédié) ============
+
+def _submit(fn, *args):
+    if not _slots.acquire(blocking=False):
+        raise PasswordHasherBusy("File d'attente du hachage pleine")
+    try:
+        future = _executor.submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+async def hash_password_async(password: str) -> str:
+    """Hasher un mot de passe dans l'executor dédié"""
+    return await asyncio.wrap_future(_submit(hash_password, password))
+
+async def verify_password_async(plain: str, hashed: str) -> tuple:
+    """
+    Vérifier un mot de passe dans l'executor dédié.
+
+    Retourne (valide, nouveau_hash) : nouveau_hash est renseigné si le hash
+    stocké doit être remplacé (coût BCRYPT_ROUNDS modifié).
+    """
+    return await asyncio.wrap_future(_submit(_verify_and_rehash, plain, hashed))
@@ -0,0 +1,182 @@
+# backend/app/processing.py
+"""
+Traitement complet d'un fichier audio déjà enregistré dans fichiers_audio :
+pipeline IA, insertion des segments, résumés, statistiques et statut final.
+
+Utilisé par l'ordonnanceur (app/scheduler.py) et les workers (app/worker.py) ;
+ouvre sa propre connexion, indépendante de la requête HTTP qui a créé le job.
+"""
+import os
+import sys
+import shutil
+import subprocess
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from IA.pipeline_service import TranscriptionPipeline
+from IA.profiling import JobProfiler
+from app.database import connect, save_meeting_stats, save_resumes
+from app.segment_store import write_segments
+from app.storage import AUDIO_ARCHIVE_AFTER_PROCESSING, archive_audio
+
+
+def probe_duration(audio_path: str) -> float:
+    """Durée de l'audio en secondes (ffprobe), sans le décoder"""
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+         "-of", "default=noprint_wrappers=1:nokey=1", audio_path],
+        capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip())
+
+
+def output_dir_for(audio_id: int) -> str:
+    return os.path.join("outputs", f"audio_{audio_id}")
+
+
+class LeaseLost(Exception):
+    """Le job a été réclamé par un autre worker (bail expiré) : ses résultats ne sont pas écrits"""
+
+
+def owner_clause(worker_id: str = None) -> tuple:
+    """Condition SQL « le job appartient encore à ce worker » (vide hors mode worker)"""
+    return (" AND worker_id = %s", (worker_id,)) if worker_id else ("", ())
+
+
+def fence(cur, audio_id: int, worker_id: str = None):
+    """
+    Vérifie que le job appartient encore au worker et verrouille sa ligne jusqu'au
+    commit : aucun autre worker ne peut le réclamer pendant l'écriture des résultats.
+    Lève LeaseLost sinon.
+    """
+    if not worker_id:
+        return
+    cur.execute(
+        """SELECT id_audio FROM fichiers_audio
+        WHERE id_audio = %s AND worker_id = %s AND status = 'processing'
+        FOR UPDATE""",
+        (audio_id, worker_id)
+    )
+    if cur.fetchone() is None:
+        raise LeaseLost(f"Job {audio_id} repris par un autre worker que {worker_id}")
+
+
+def process_audio(audio_id: int, profile: bool = None, worker_id: str = None) -> dict:
+    """
+    Exécute le pipeline pour un fichier et enregistre tous les résultats.
+    Les indications de participants et le profilage (options.profile) sont lus
+    dans fichiers_audio.options ; profile=True force le profilage.
+    worker_id (mode worker) : chaque écriture vérifie que le job appartient encore
+    au worker ; sinon LeaseLost, rien n'est écrit, et le statut reste à release_job.
+    Retourne {"id_audio", "duration", "num_speakers", "num_segments"}.
+    """
+    owned, owned_params = owner_clause(worker_id)
+    conn = connect()
+    cur = conn.cursor()
+    profiler = None
+    try:
+        cur.execute("SELECT * FROM fichiers_audio WHERE id_audio = %s", (audio_id,))
+        fichier = cur.fetchone()
+        if not fichier:
+            raise ValueError(f"Fichier {audio_id} introuvable")
+        options = fichier.get('options') or {}
+
+        cur.execute(
+            "UPDATE fichiers_audio SET status = 'processing' WHERE id_audio = %s" + owned,
+            (audio_id, *owned_params)
+        )
+        if cur.rowcount == 0:
+            raise LeaseLost(f"Job {audio_id} repris par un autre worker que {worker_id}")
+        conn.commit()
+
+        print(f"🚀 Démarrage du pipeline pour fichier {audio_id}...")
+        print(f"📁 Fichier : {fichier['file_path']}")
+
+        # Dossier de sortie unique par audio_id, recréé à chaque traitement
+        output_dir = output_dir_for(audio_id)
+        if os.path.exists(output_dir):
+            print(f"🗑️ Suppression de l'ancien dossier {output_dir}...")
+            shutil.rmtree(output_dir)
+        os.makedirs(output_dir, exist_ok=True)
+
+        if profile or (profile is None and options.get('profile')):
+            profiler = JobProfiler(output_dir).start()
+
+        pipeline = TranscriptionPipeline(
+            audio_file=fichier['file_path'],
+            output_dir=output_dir,
+            user_id=fichier['id_user'],
+            num_speakers=options.get('num_speakers'),
+            min_speakers=options.get('min_speakers'),
+            max_speakers=options.get('max_speakers'),
+            profiler=profiler
+        )
+        results = pipeline.run(save_intermediary_files=False)
+
+        print(f"✅ Pipeline terminé pour {audio_id}")
+
+        # Résultats écrits en une transaction, ligne du job verrouillée (mode worker)
+        fence(cur, audio_id, worker_id)
+
+        # Segments (timestamps exacts du pipeline, lus un par un), format SEGMENT_STORAGE
+        num_segments = write_segments(cur, audio_id, pipeline.iter_segments())
+
+        if num_segments == 0:
+            print("⚠️ ATTENTION : Aucun segment extrait !")
+        print(f"✅ {num_segments} segments insérés")
+
+        save_resumes(cur, audio_id, results["summary"], results.get("speaker_summaries"), replace=True)
+        print(f"✅ Résumé général + {len(results.get('speaker_summaries') or {})} résumés par speaker insérés")
+
+        stats = results["stats"]
+        save_meeting_stats(cur, audio_id, stats)
+
+        cur.execute(
+            """UPDATE fichiers_audio
+            SET status = 'completed',
+                lease_expires_at = NULL,
+                duration = %s,
+                num_speakers = %s,
+                skipped_seconds = %s
+            WHERE id_audio = %s""" + owned,
+            (stats["duration"], stats["num_speakers"], results["skipped_seconds"], audio_id, *owned_params)
+        )
+        if cur.rowcount == 0:
+            raise LeaseLost(f"Job {audio_id} repris par un autre worker que {worker_id}")
+        conn.commit()
+
+        print(f"✅ Traitement terminé : {audio_id}")
+        print(f"📊 Durée : {stats['duration']:.1f}s | Speakers : {stats['num_speakers']} | Segments : {num_segments}")
+        print(f"⏩ Silence ignoré : {results['skipped_seconds']:.1f}s")
+
+        # Original → Opus : un échec d'archivage ne fait pas échouer le traitement
+        if AUDIO_ARCHIVE_AFTER_PROCESSING:
+            try:
+                reclaimed = archive_audio(cur, audio_id)
+                conn.commit()
+                print(f"🗜️ Audio archivé en Opus ({reclaimed / 1024 / 1024:.1f} Mo libérés)")
+            except Exception as e:
+                conn.rollback()
+                print(f"⚠️ Archivage de {audio_id} échoué : {e}")
+
+        return {
+            "id_audio": audio_id,
+            "duration": stats["duration"],
+            "num_speakers": stats["num_speakers"],
+            "num_segments": num_segments
+        }
+    except Exception:
+        conn.rollback()
+        # Mode worker : release_job remet le job en file ou le passe en 'failed'
+        # (sous la même condition de propriété) ; pas de 'failed' intermédiaire ici
+        if not worker_id:
+            cur.execute(
+                "UPDATE fichiers_audio SET status = 'failed' WHERE id_audio = %s",
+                (audio_id,)
+            )
+            conn.commit()
+        raise
+    finally:
+        if profiler:
+            profiler.stop()
+        cur.close()
+        conn.close()
@@ -0,0 +1,229 @@
+# backend/app/regenerate.py
+"""
+Régénération des résultats dérivés (texte nettoyé, résumés, PDF/Word) à partir
+des segments déjà stockés (vue transcription_segments), sans re-transcrire.
+
+Usage (depuis backend/) :
+    python -m app.regenerate --ids 12 13 14
+    python -m app.regenerate --all --workers 8 --batch-size 50
+    python -m app.regenerate --user 3
+"""
+import os
+import sys
+import time
+import uuid
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from IA.pipeline_service import TranscriptionPipeline
+from IA.profiling import JobProfiler
+from app.database import connect, iter_transcription_rows, save_resumes
+
+REGENERATE_WORKERS = int(os.getenv("REGENERATE_WORKERS", "4"))
+REGENERATE_BATCH_SIZE = int(os.getenv("REGENERATE_BATCH_SIZE", "50"))
+# Lots POST /regenerate exécutés en même temps par l'API (les suivants attendent)
+REGENERATE_CONCURRENT_BATCHES = int(os.getenv("REGENERATE_CONCURRENT_BATCHES", "1"))
+# Durée de conservation du suivi d'un lot terminé
+REGENERATE_JOB_TTL_SECONDS = int(os.getenv("REGENERATE_JOB_TTL_SECONDS", "3600"))
+
+
+def regenerate_audio(audio_id: int, streaming: bool = None, profile: bool = False) -> dict:
+    """
+    Régénère les résultats d'un fichier audio déjà transcrit.
+    Les résumés en base sont remplacés et les documents réécrits dans outputs/audio_{id}.
+    profile=True écrit un profil dans outputs/audio_{id}/profile.
+    """
+    t0 = time.perf_counter()
+    conn = connect()
+    profiler = None
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT * FROM fichiers_audio WHERE id_audio = %s", (audio_id,))
+        fichier = cur.fetchone()
+        if not fichier:
+            raise ValueError(f"Fichier {audio_id} introuvable")
+
+        output_dir = os.path.join("outputs", f"audio_{audio_id}")
+        if profile:
+            profiler = JobProfiler(output_dir).start()
+        pipeline = TranscriptionPipeline(
+            audio_file=fichier['file_path'],
+            output_dir=output_dir,
+            streaming=streaming,
+            profiler=profiler
+        )
+        results = pipeline.regenerate(iter_transcription_rows(audio_id))
+
+        save_resumes(cur, audio_id, results["summary"], results["speaker_summaries"], replace=True)
+        conn.commit()
+        cur.close()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if profiler:
+            profiler.stop()
+        conn.close()
+
+    return {
+        "id_audio": audio_id,
+        "nombre_participants": results["num_speakers"],
+        "secondes": round(time.perf_counter() - t0, 1)
+    }
+
+
+def rebuild_documents(audio_id: int, audio_file: str, summary: str) -> dict:
+    """
+    Réécrit le PDF/Word de outputs/audio_{id} avec un compte-rendu déjà enregistré
+    (POST /fichiers/{id}/compte-rendu/stream), sans relancer les résumés.
+    """
+    pipeline = TranscriptionPipeline(
+        audio_file=audio_file,
+        output_dir=os.path.join("outputs", f"audio_{audio_id}")
+    )
+    return pipeline.rebuild_documents(iter_transcription_rows(audio_id), summary)
+
+
+def regenerate_many(audio_ids: list, workers: int = None, batch_size: int = None,
+                    profile: bool = False, report: dict = None) -> dict:
+    """
+    Régénère plusieurs fichiers en parallèle, par lots.
+    Retourne {"ok": [...], "erreurs": {id: message}} ; si report est fourni,
+    il est rempli au fil de l'eau (suivi d'un lot en arrière-plan).
+    """
+    workers = workers or REGENERATE_WORKERS
+    batch_size = batch_size or REGENERATE_BATCH_SIZE
+    if report is None:
+        report = {}
+    report.setdefault("ok", [])
+    report.setdefault("erreurs", {})
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for i in range(0, len(audio_ids), batch_size):
+            batch = audio_ids[i:i + batch_size]
+            futures = {audio_id: executor.submit(regenerate_audio, audio_id, profile=profile) for audio_id in batch}
+            for audio_id, future in futures.items():
+                try:
+                    report["ok"].append(future.result())
+                except Exception as e:
+                    print(f"⚠️ Erreur régénération {audio_id}: {e}")
+                    report["erreurs"][audio_id] = str(e)
+            print(f"📦 Lot {i // batch_size + 1} : {min(i + batch_size, len(audio_ids))}/{len(audio_ids)} fichiers traités")
+
+    return report
+
+
+# ============ LOTS EN ARRIÈRE-PLAN (POST /regenerate) ============
+
+class RegenerationJobs:
+    """
+    Lots de régénération lancés hors de la requête HTTP.
+    submit() rend tout de suite un identifiant ; get() donne l'avancement.
+    Le suivi est en mémoire : il est propre au processus de l'API qui a reçu le lot.
+    """
+
+    def __init__(self, concurrent_batches: int = None, ttl_seconds: int = None):
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrent_batches or REGENERATE_CONCURRENT_BATCHES,
+            thread_name_prefix="regenerate"
+        )
+        self.ttl_seconds = ttl_seconds or REGENERATE_JOB_TTL_SECONDS
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, user_id: int, audio_ids: list) -> str:
+        job_id = uuid.uuid4().hex
+        job = {
+            "id_job": job_id,
+            "id_user": user_id,
+            "status": "pending",
+            "total": len(audio_ids),
+            "ok": [],
+            "erreurs": {},
+            "created_at": time.time(),
+            "finished_at": None
+        }
+        with self._lock:
+            self._prune()
+            self._jobs[job_id] = job
+        self._executor.submit(self._run, job, audio_ids)
+        return job_id
+
+    def _run(self, job: dict, audio_ids: list):
+        job["status"] = "running"
+        try:
+            regenerate_many(audio_ids, report=job)
+            job["status"] = "completed"
+        except Exception as e:
+            print(f"❌ Erreur lot de régénération {job['id_job']}: {e}")
+            job["status"] = "failed"
+        finally:
+            job["finished_at"] = time.time()
+
+    def get(self, job_id: str, user_id: int):
+        """Avancement d'un lot de l'utilisateur, ou None"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job["id_user"] != user_id:
+            return None
+        return {
+            "id_job": job["id_job"],
+            "status": job["status"],
+            "total": job["total"],
+            "traites": len(job["ok"]) + len(job["erreurs"]),
+            "regeneres": list(job["ok"]),
+            "erreurs": dict(job["erreurs"])
+        }
+
+    def _prune(self):
+        """Oublie les lots terminés depuis plus de ttl_seconds (verrou tenu)"""
+        limit = time.time() - self.ttl_seconds
+        for job_id in [j for j, job in self._jobs.items() if job["finished_at"] and job["finished_at"] < limit]:
+            del self._jobs[job_id]
+
+
+def select_audio_ids(all_files: bool = False, user_id: int = None) -> list:
+    """Fichiers terminés à régénérer (tous, ou ceux d'un utilisateur)"""
+    conn = connect()
+    try:
+        cur = conn.cursor()
+        query = "SELECT id_audio FROM fichiers_audio WHERE status = 'completed'"
+        params = ()
+        if user_id is not None:
+            query += " AND id_user = %s"
+            params = (user_id,)
+        elif not all_files:
+            return []
+        cur.execute(query + " ORDER BY id_audio", params)
+        ids = [row['id_audio'] for row in cur.fetchall()]
+        cur.close()
+        return ids
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Régénère résumés et documents sans re-transcrire")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--ids", type=int, nargs="+", help="id_audio à régénérer")
+    group.add_argument("--all", action="store_true", help="Tous les fichiers terminés")
+    group.add_argument("--user", type=int, help="Tous les fichiers terminés d'un utilisateur")
+    parser.add_argument("--workers", type=int, default=REGENERATE_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=REGENERATE_BATCH_SIZE)
+    parser.add_argument("--profile", action="store_true", help="Profil par fichier dans outputs/audio_{id}/profile")
+    args = parser.parse_args()
+
+    audio_ids = args.ids or select_audio_ids(all_files=args.all, user_id=args.user)
+    print(f"🔁 {len(audio_ids)} fichiers à régénérer ({args.workers} workers)")
+
+    t0 = time.perf_counter()
+    report = regenerate_many(audio_ids, workers=args.workers, batch_size=args.batch_size,
+                             profile=args.profile)
+    print(f"\n✅ {len(report['ok'])} régénérés, ❌ {len(report['erreurs'])} erreurs en {time.perf_counter() - t0:.1f}s")
+    sys.exit(1 if report["erreurs"] else 0)
+
+
+if __name__ == "__main__":
+    main()
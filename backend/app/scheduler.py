@@ -0,0 +1,210 @@
+# backend/app/scheduler.py
+"""
+Ordonnanceur des traitements audio (JOB_EXECUTION=local, dans le processus de l'API).
+Avec JOB_EXECUTION=worker, les jobs sont réclamés dans Postgres par app/worker.py,
+selon le même ordre et la même limite par utilisateur.
+
+- Plus court d'abord : les jobs sont triés par coût estimé (durée de l'audio
+  mesurée avant traitement), ce qui minimise le temps moyen de complétion.
+- Équité : un utilisateur ne peut pas occuper plus de SCHEDULER_USER_MAX_JOBS
+  workers à la fois ; ses autres jobs attendent sans bloquer ceux des autres.
+- Position dans la file et ETA estimés en simulant la suite de l'ordonnancement.
+"""
+import os
+import time
+import heapq
+import itertools
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ============ CONFIGURATION ============
+
+# "local" : threads de l'API | "worker" : processus app.worker séparés (file Postgres)
+JOB_EXECUTION = os.getenv("JOB_EXECUTION", "local")
+
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", "2"))
+SCHEDULER_USER_MAX_JOBS = int(os.getenv("SCHEDULER_USER_MAX_JOBS", "1"))
+# Secondes de traitement par seconde d'audio (pour l'ETA), ajusté au fil des jobs terminés
+PROCESSING_SPEED_FACTOR = float(os.getenv("PROCESSING_SPEED_FACTOR", "0.5"))
+# Minutes d'audio autorisées par utilisateur sur 24h glissantes (0 = illimité)
+USER_DAILY_AUDIO_MINUTES = float(os.getenv("USER_DAILY_AUDIO_MINUTES", "600"))
+
+
+class QuotaExceeded(Exception):
+    """Quota de minutes d'audio dépassé"""
+
+
+def lock_user(cur, user_id: int):
+    """
+    Verrouille la ligne de l'utilisateur jusqu'à la fin de la transaction : deux
+    envois simultanés du même utilisateur passent l'un après l'autre entre la
+    vérification des quotas et l'INSERT, au lieu de les passer tous les deux.
+    """
+    cur.execute("SELECT id_user FROM utilisateurs WHERE id_user = %s FOR UPDATE", (user_id,))
+
+
+def check_quota(cur, user_id: int, duration: float):
+    """
+    Lève QuotaExceeded si l'audio ferait dépasser le quota journalier.
+    À appeler après lock_user(), dans la transaction qui insère le fichier.
+    """
+    if USER_DAILY_AUDIO_MINUTES <= 0:
+        return
+    cur.execute(
+        """SELECT COALESCE(SUM(duration), 0) AS used
+        FROM fichiers_audio
+        WHERE id_user = %s
+            AND status <> 'failed'
+            AND date_upload > CURRENT_TIMESTAMP - INTERVAL '1 day'""",
+        (user_id,)
+    )
+    used_minutes = cur.fetchone()['used'] / 60
+    if used_minutes + duration / 60 > USER_DAILY_AUDIO_MINUTES:
+        raise QuotaExceeded(
+            f"Quota journalier dépassé : {used_minutes:.0f} min utilisées, "
+            f"{duration / 60:.0f} min demandées, limite {USER_DAILY_AUDIO_MINUTES:.0f} min"
+        )
+
+
+def db_queue_position(cur, audio_id: int):
+    """Position d'un fichier 'pending' dans la file Postgres (mode worker), ou None"""
+    cur.execute(
+        """SELECT COUNT(*) + 1 AS position
+        FROM fichiers_audio f, fichiers_audio me
+        WHERE me.id_audio = %s AND me.status = 'pending'
+            AND f.status = 'pending'
+            AND (COALESCE(f.duration, 'Infinity'), f.date_upload)
+                < (COALESCE(me.duration, 'Infinity'), me.date_upload)""",
+        (audio_id,)
+    )
+    row = cur.fetchone()
+    return row['position'] if row else None
+
+
+class Job:
+    def __init__(self, audio_id: int, user_id: int, duration: float):
+        self.audio_id = audio_id
+        self.user_id = user_id
+        self.duration = duration
+        self.started_at = None
+
+
+class JobScheduler:
+    """
+    File de priorité partagée par un pool de threads workers.
+    run_job(audio_id) exécute le traitement ; ses exceptions sont journalisées.
+    """
+
+    def __init__(self, run_job, workers: int = None, user_max_jobs: int = None,
+                 speed_factor: float = None):
+        self.run_job = run_job
+        self.workers = workers or SCHEDULER_WORKERS
+        self.user_max_jobs = user_max_jobs or SCHEDULER_USER_MAX_JOBS
+        self.speed_factor = speed_factor or PROCESSING_SPEED_FACTOR
+        self._queue = []                  # (durée, ordre d'arrivée, job)
+        self._running = {}                # audio_id -> job
+        self._user_running = {}           # user_id -> nombre de jobs en cours
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+
+    def start(self):
+        with self._cond:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"scheduler-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        print(f"✅ Ordonnanceur démarré ({self.workers} workers, {self.user_max_jobs} job(s) max par utilisateur)")
+
+    def submit(self, audio_id: int, user_id: int, duration: float):
+        with self._cond:
+            heapq.heappush(self._queue, (duration, next(self._counter), Job(audio_id, user_id, duration)))
+            self._cond.notify()
+
+    def _pop_eligible(self):
+        """Job le plus court dont l'utilisateur n'a pas atteint sa limite (verrou tenu)"""
+        skipped = []
+        job = None
+        while self._queue:
+            entry = heapq.heappop(self._queue)
+            if self._user_running.get(entry[2].user_id, 0) < self.user_max_jobs:
+                job = entry[2]
+                break
+            skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(self._queue, entry)
+        return job
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job = self._pop_eligible()
+                while job is None:
+                    self._cond.wait()
+                    job = self._pop_eligible()
+                job.started_at = time.monotonic()
+                self._running[job.audio_id] = job
+                self._user_running[job.user_id] = self._user_running.get(job.user_id, 0) + 1
+
+            try:
+                self.run_job(job.audio_id)
+                elapsed = time.monotonic() - job.started_at
+                if job.duration > 0:
+                    # Moyenne glissante du rapport temps de traitement / durée audio
+                    with self._cond:
+                        self.speed_factor = 0.8 * self.speed_factor + 0.2 * (elapsed / job.duration)
+            except Exception as e:
+                print(f"❌ Erreur traitement {job.audio_id}: {e}")
+            finally:
+                with self._cond:
+                    del self._running[job.audio_id]
+                    self._user_running[job.user_id] -= 1
+                    self._cond.notify_all()
+
+    def estimate(self, audio_id: int):
+        """
+        Position et ETA d'un job : {"status": "queued"|"running", "position", "eta_seconds"},
+        ou None s'il n'est pas (ou plus) dans l'ordonnanceur.
+        """
+        with self._cond:
+            now = time.monotonic()
+            if audio_id in self._running:
+                job = self._running[audio_id]
+                remaining = job.duration * self.speed_factor - (now - job.started_at)
+                return {"status": "running", "position": 0, "eta_seconds": round(max(remaining, 0.0))}
+
+            # Simulation : workers libérés au fil des fins estimées, limite par utilisateur respectée
+            free_at = []
+            user_slots = {}
+            for job in self._running.values():
+                end = max(job.duration * self.speed_factor - (now - job.started_at), 0.0)
+                free_at.append(end)
+                user_slots.setdefault(job.user_id, []).append(end)
+            free_at.extend([0.0] * (self.workers - len(free_at)))
+            heapq.heapify(free_at)
+
+            for position, (_, _, job) in enumerate(sorted(self._queue), start=1):
+                start = heapq.heappop(free_at)
+                slots = user_slots.setdefault(job.user_id, [])
+                if len(slots) >= self.user_max_jobs:
+                    slots.sort()
+                    start = max(start, slots.pop(0))
+                end = start + job.duration * self.speed_factor
+                heapq.heappush(free_at, end)
+                slots.append(end)
+                if job.audio_id == audio_id:
+                    return {"status": "queued", "position": position, "eta_seconds": round(end)}
+        return None
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "workers": self.workers,
+                "en_cours": len(self._running),
+                "en_attente": len(self._queue),
+                "speed_factor": round(self.speed_factor, 3)
+            }
@@ -0,0 +1,221 @@
+# backend/app/segment_store.py
+"""
+Stockage des segments de transcription.
+
+- "rows"   : une ligne par segment dans transcriptions (historique)
+- "blocks" : segments regroupés par blocs de SEGMENT_BLOCK_SIZE dans
+             transcription_blocks, en colonnes (débuts, fins, codes speaker)
+             + texte concaténé avec ses offsets. Beaucoup moins de tuples et
+             d'entrées d'index par réunion.
+
+Les lecteurs passent par la vue transcription_segments, qui présente les deux
+formats avec les colonnes de transcriptions (text_brut, start_time, end_time,
+speaker, sequence_number, sub_offsets). Le format de chaque fichier est noté dans
+fichiers_audio.segment_storage : la pagination (read_segments) lit directement la
+bonne table.
+
+sub_offsets : timestamps des segments d'origine d'un segment compacté
+(IA/compaction.py), NULL sinon.
+"""
+import os
+from psycopg2.extras import Json, execute_values
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ============ CONFIGURATION ============
+
+SEGMENT_STORAGE = os.getenv("SEGMENT_STORAGE", "rows")
+SEGMENT_BLOCK_SIZE = int(os.getenv("SEGMENT_BLOCK_SIZE", "256"))
+
+STORAGE_MODES = ("rows", "blocks")
+
+
+def pack_block(segments: list) -> dict:
+    """Colonnes d'un bloc : starts, ends, speaker_dict + speaker_codes, text + text_offsets"""
+    speaker_dict = []
+    codes = {}
+    starts, ends, speaker_codes, offsets, texts = [], [], [], [0], []
+    sub_offsets = [seg.get('offsets') for seg in segments]
+    for seg in segments:
+        if seg['speaker'] not in codes:
+            codes[seg['speaker']] = len(speaker_dict)
+            speaker_dict.append(seg['speaker'])
+        starts.append(round(float(seg['start']), 3))
+        ends.append(round(float(seg['end']), 3))
+        speaker_codes.append(codes[seg['speaker']])
+        texts.append(seg['text'])
+        offsets.append(offsets[-1] + len(seg['text']))
+    return {
+        "starts": starts,
+        "ends": ends,
+        "speaker_dict": speaker_dict,
+        "speaker_codes": speaker_codes,
+        "text": "".join(texts),
+        "text_offsets": offsets,
+        # Colonne absente (NULL) si aucun segment du bloc n'est compacté
+        "sub_offsets": sub_offsets if any(sub_offsets) else None
+    }
+
+
+def unpack_block(block: dict) -> list:
+    """Inverse de pack_block (une ligne de transcription_blocks → segments)"""
+    text = block['text']
+    offsets = block['text_offsets']
+    sub_offsets = block.get('sub_offsets')
+    segments = []
+    for i in range(len(block['starts'])):
+        seg = {
+            "start": block['starts'][i],
+            "end": block['ends'][i],
+            "speaker": block['speaker_dict'][block['speaker_codes'][i]],
+            "text": text[offsets[i]:offsets[i + 1]]
+        }
+        if sub_offsets and sub_offsets[i]:
+            seg["offsets"] = sub_offsets[i]
+        segments.append(seg)
+    return segments
+
+
+def delete_segments(cur, audio_id: int):
+    cur.execute("DELETE FROM transcriptions WHERE id_audio = %s", (audio_id,))
+    cur.execute("DELETE FROM transcription_blocks WHERE id_audio = %s", (audio_id,))
+
+
+def _insert_rows(cur, audio_id: int, segments, first_sequence: int):
+    execute_values(
+        cur,
+        """INSERT INTO transcriptions
+            (id_audio, text_brut, start_time, end_time, speaker, sequence_number, sub_offsets)
+            VALUES %s""",
+        [
+            (audio_id, seg['text'], seg['start'], seg['end'], seg['speaker'], first_sequence + i,
+             Json(seg['offsets']) if seg.get('offsets') else None)
+            for i, seg in enumerate(segments)
+        ]
+    )
+
+
+def _insert_block(cur, audio_id: int, block_number: int, first_sequence: int, segments: list):
+    block = pack_block(segments)
+    cur.execute(
+        """INSERT INTO transcription_blocks
+            (id_audio, block_number, first_sequence, num_segments,
+             starts, ends, speaker_dict, speaker_codes, text, text_offsets, sub_offsets)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
+        (audio_id, block_number, first_sequence, len(segments),
+         Json(block["starts"]), Json(block["ends"]), Json(block["speaker_dict"]),
+         Json(block["speaker_codes"]), block["text"], Json(block["text_offsets"]),
+         Json(block["sub_offsets"]) if block["sub_offsets"] else None)
+    )
+
+
+def write_segments(cur, audio_id: int, segments, storage: str = None, block_size: int = None) -> int:
+    """
+    Remplace les segments d'un fichier (itérable de {"start", "end", "speaker", "text"},
+    avec "offsets" pour les segments compactés).
+    Les segments sont écrits par lots de block_size, sans tout garder en mémoire,
+    et le format est noté dans fichiers_audio.segment_storage.
+    Retourne le nombre de segments écrits.
+    """
+    storage = storage or SEGMENT_STORAGE
+    if storage not in STORAGE_MODES:
+        raise ValueError(f"❌ SEGMENT_STORAGE inconnu : {storage} (disponibles : {', '.join(STORAGE_MODES)})")
+    block_size = block_size or SEGMENT_BLOCK_SIZE
+
+    delete_segments(cur, audio_id)
+    cur.execute(
+        "UPDATE fichiers_audio SET segment_storage = %s WHERE id_audio = %s",
+        (storage, audio_id)
+    )
+
+    count = 0
+    batch = []
+
+    def flush():
+        if storage == "blocks":
+            _insert_block(cur, audio_id, count // block_size, count, batch)
+        else:
+            _insert_rows(cur, audio_id, batch, count)
+
+    for seg in segments:
+        batch.append(seg)
+        if len(batch) == block_size:
+            flush()
+            count += len(batch)
+            batch = []
+    if batch:
+        flush()
+        count += len(batch)
+    return count
+
+
+def read_segments(cur, audio_id: int, offset: int, limit: int, storage: str = None) -> list:
+    """
+    Segments [offset, offset + limit) dans l'ordre, en une requête sur la table du
+    format du fichier (fichiers_audio.segment_storage, SEGMENT_STORAGE par défaut) :
+    [{"seq", "start", "end", "speaker", "text", "offsets"}, ...]
+
+    En format blocks, seuls les blocs qui recoupent la page sont lus et dépaquetés
+    (la vue transcription_segments, filtrée sur un sequence_number calculé, les
+    dépaquetterait tous).
+    """
+    storage = storage or SEGMENT_STORAGE
+    if storage == "rows":
+        cur.execute(
+            """SELECT sequence_number, start_time, end_time, speaker, text_brut, sub_offsets
+            FROM transcriptions
+            WHERE id_audio = %s AND sequence_number >= %s
+            ORDER BY sequence_number
+            LIMIT %s""",
+            (audio_id, offset, limit)
+        )
+        return [
+            {
+                "seq": r['sequence_number'],
+                "start": r['start_time'],
+                "end": r['end_time'],
+                "speaker": r['speaker'],
+                "text": r['text_brut'],
+                "offsets": r['sub_offsets']
+            }
+            for r in cur.fetchall()
+        ]
+
+    cur.execute(
+        """SELECT first_sequence, starts, ends, speaker_dict, speaker_codes, text, text_offsets, sub_offsets
+        FROM transcription_blocks
+        WHERE id_audio = %s AND first_sequence + num_segments > %s AND first_sequence < %s
+        ORDER BY block_number""",
+        (audio_id, offset, offset + limit)
+    )
+    page = []
+    for block in cur.fetchall():
+        for seq, seg in enumerate(unpack_block(block), start=block['first_sequence']):
+            if offset <= seq < offset + limit:
+                page.append({
+                    "seq": seq,
+                    "start": seg['start'],
+                    "end": seg['end'],
+                    "speaker": seg['speaker'],
+                    "text": seg['text'],
+                    "offsets": seg.get('offsets')
+                })
+    return page
+
+
+def rename_speaker(cur, audio_id: int, old: str, new: str):
+    """Renomme un speaker dans les deux formats de stockage"""
+    cur.execute(
+        "UPDATE transcriptions SET speaker = %s WHERE id_audio = %s AND speaker = %s",
+        (new, audio_id, old)
+    )
+    cur.execute(
+        """UPDATE transcription_blocks
+        SET speaker_dict = (
+            SELECT jsonb_agg(CASE WHEN s = %s THEN to_jsonb(%s::text) ELSE to_jsonb(s) END ORDER BY o)
+            FROM jsonb_array_elements_text(speaker_dict) WITH ORDINALITY AS t(s, o)
+        )
+        WHERE id_audio = %s AND speaker_dict ? %s""",
+        (old, new, audio_id, old)
+    )
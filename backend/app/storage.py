@@ -0,0 +1,314 @@
+# backend/app/storage.py
+"""
+Cycle de vie du stockage audio.
+
+Paliers (fichiers_audio.storage_tier) :
+- 'original' : fichier tel qu'uploadé, jusqu'à la fin du traitement
+- 'archived' : transcodé en Opus mono (AUDIO_ARCHIVE_BITRATE, ≈10 Mo/h à 24 kb/s),
+               l'original est supprimé ; suffisant pour ré-écouter ou re-transcrire
+- 'deleted'  : audio supprimé après AUDIO_RETENTION_DAYS ; transcription, résumés
+               et statistiques restent en base
+
+Les documents de outputs/audio_{id} (PDF, Word, profils) sont supprimés après
+OUTPUTS_RETENTION_DAYS : ils se régénèrent depuis la base (app/regenerate.py).
+Les WAV 16 kHz à côté des originaux (anciennes versions de convert_to_wav) sont
+supprimés ; la conversion n'en écrit plus.
+
+Quota : USER_STORAGE_QUOTA_MB d'audio stocké par utilisateur, vérifié à l'upload.
+
+Usage (depuis backend/) :
+    python -m app.storage --dry-run
+    python -m app.storage
+    python -m app.storage --user 3
+"""
+import os
+import sys
+import shutil
+import argparse
+import subprocess
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from app.database import connect
+
+load_dotenv()
+
+# ============ CONFIGURATION ============
+
+# Transcodage en Opus dès la fin du traitement (sinon au prochain passage de la CLI)
+AUDIO_ARCHIVE_AFTER_PROCESSING = os.getenv("AUDIO_ARCHIVE_AFTER_PROCESSING", "true").lower() in ("1", "true", "yes")
+AUDIO_ARCHIVE_BITRATE = os.getenv("AUDIO_ARCHIVE_BITRATE", "24k")
+# Jours avant suppression de l'audio archivé (0 = conservé indéfiniment)
+AUDIO_RETENTION_DAYS = float(os.getenv("AUDIO_RETENTION_DAYS", "0"))
+# Jours avant suppression des documents générés (0 = conservés indéfiniment)
+OUTPUTS_RETENTION_DAYS = float(os.getenv("OUTPUTS_RETENTION_DAYS", "0"))
+# Audio stocké autorisé par utilisateur (0 = illimité)
+USER_STORAGE_QUOTA_MB = float(os.getenv("USER_STORAGE_QUOTA_MB", "0"))
+
+ARCHIVE_EXTENSION = ".opus"
+
+
+class StorageQuotaExceeded(Exception):
+    """Quota de stockage audio dépassé"""
+
+
+def file_size(path: str) -> int:
+    return os.path.getsize(path) if path and os.path.exists(path) else 0
+
+
+def _bitrate_bytes_per_second(bitrate: str) -> float:
+    bitrate = bitrate.lower()
+    factor = 1000 if bitrate.endswith("k") else 1
+    return float(bitrate.rstrip("k")) * factor / 8
+
+
+def sidecar_paths(audio_path: str) -> list:
+    """WAV de travail laissés à côté d'un original par les anciennes conversions"""
+    base, _ = os.path.splitext(audio_path)
+    return [p for p in (base + ".wav", base + ".speech.wav") if p != audio_path]
+
+
+def remove_sidecars(audio_path: str, dry_run: bool = False) -> int:
+    """Supprime les WAV à côté de l'original ; retourne les octets libérés"""
+    reclaimed = 0
+    for path in sidecar_paths(audio_path):
+        size = file_size(path)
+        if size:
+            reclaimed += size
+            if not dry_run:
+                os.remove(path)
+    return reclaimed
+
+
+def transcode_to_opus(audio_path: str, bitrate: str = None) -> str:
+    """Transcode en Opus mono (profil voix) à côté de l'original ; retourne le nouveau chemin"""
+    base, _ = os.path.splitext(audio_path)
+    opus_path = base + ARCHIVE_EXTENSION
+    tmp_path = opus_path + ".tmp"
+    try:
+        subprocess.run([
+            "ffmpeg", "-y", "-v", "error",
+            "-i", audio_path,
+            "-vn", "-ac", "1",
+            "-c:a", "libopus", "-b:a", bitrate or AUDIO_ARCHIVE_BITRATE,
+            "-application", "voip",
+            "-f", "ogg", tmp_path
+        ], check=True)
+        os.replace(tmp_path, opus_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return opus_path
+
+
+def archive_audio(cur, audio_id: int, dry_run: bool = False) -> int:
+    """
+    Passe un fichier traité au palier 'archived' (Opus, original supprimé).
+    Si l'Opus n'est pas plus petit (original déjà très compressé), l'original est gardé.
+    Retourne les octets libérés (estimés d'après la durée en dry_run).
+    """
+    cur.execute(
+        """SELECT file_path, duration FROM fichiers_audio
+        WHERE id_audio = %s AND status = 'completed' AND storage_tier = 'original'""",
+        (audio_id,)
+    )
+    fichier = cur.fetchone()
+    if not fichier or not os.path.exists(fichier['file_path']):
+        return 0
+
+    audio_path = fichier['file_path']
+    original_size = file_size(audio_path)
+    if dry_run:
+        # Les WAV de travail sont comptés à part par run_lifecycle
+        estimated = (fichier['duration'] or 0) * _bitrate_bytes_per_second(AUDIO_ARCHIVE_BITRATE)
+        return max(0, int(original_size - estimated))
+
+    reclaimed = remove_sidecars(audio_path)
+
+    new_path = audio_path
+    if not audio_path.endswith(ARCHIVE_EXTENSION):
+        opus_path = transcode_to_opus(audio_path)
+        if file_size(opus_path) < original_size:
+            os.remove(audio_path)
+            new_path = opus_path
+        else:
+            os.remove(opus_path)
+
+    new_size = file_size(new_path)
+    cur.execute(
+        """UPDATE fichiers_audio
+        SET file_path = %s, storage_tier = 'archived', storage_bytes = %s, archived_at = CURRENT_TIMESTAMP
+        WHERE id_audio = %s""",
+        (new_path, new_size, audio_id)
+    )
+    return reclaimed + original_size - new_size
+
+
+def delete_audio(cur, audio_id: int, dry_run: bool = False) -> int:
+    """Palier 'deleted' : supprime l'audio (et ses WAV), garde la transcription"""
+    cur.execute("SELECT file_path FROM fichiers_audio WHERE id_audio = %s", (audio_id,))
+    fichier = cur.fetchone()
+    if not fichier:
+        return 0
+    reclaimed = remove_sidecars(fichier['file_path'], dry_run) + file_size(fichier['file_path'])
+    if not dry_run:
+        if os.path.exists(fichier['file_path']):
+            os.remove(fichier['file_path'])
+        cur.execute(
+            "UPDATE fichiers_audio SET storage_tier = 'deleted', storage_bytes = 0 WHERE id_audio = %s",
+            (audio_id,)
+        )
+    return reclaimed
+
+
+def purge_outputs(cur, audio_id: int, dry_run: bool = False) -> int:
+    """Supprime outputs/audio_{id} (régénérable) ; retourne les octets libérés"""
+    output_dir = os.path.join("outputs", f"audio_{audio_id}")
+    reclaimed = 0
+    for root, _, files in os.walk(output_dir):
+        reclaimed += sum(file_size(os.path.join(root, name)) for name in files)
+    if not dry_run:
+        shutil.rmtree(output_dir, ignore_errors=True)
+        cur.execute(
+            "UPDATE fichiers_audio SET outputs_purged_at = CURRENT_TIMESTAMP WHERE id_audio = %s",
+            (audio_id,)
+        )
+    return reclaimed
+
+
+# ============ QUOTA ============
+
+def user_storage_bytes(cur, user_id: int) -> int:
+    cur.execute(
+        """SELECT COALESCE(SUM(storage_bytes), 0) AS used
+        FROM fichiers_audio
+        WHERE id_user = %s AND storage_tier <> 'deleted'""",
+        (user_id,)
+    )
+    return int(cur.fetchone()['used'])
+
+
+def check_storage_quota(cur, user_id: int, size: int):
+    """Lève StorageQuotaExceeded si size octets de plus dépasseraient le quota"""
+    if USER_STORAGE_QUOTA_MB <= 0:
+        return
+    used = user_storage_bytes(cur, user_id)
+    quota = USER_STORAGE_QUOTA_MB * 1024 * 1024
+    if used + size > quota:
+        raise StorageQuotaExceeded(
+            f"Quota de stockage dépassé : {used / 1024 / 1024:.0f} Mo utilisés, "
+            f"{size / 1024 / 1024:.0f} Mo demandés, limite {USER_STORAGE_QUOTA_MB:.0f} Mo"
+        )
+
+
+# ============ PASSAGE COMPLET ============
+
+def run_lifecycle(user_id: int = None, dry_run: bool = False) -> dict:
+    """
+    Applique les paliers à tous les fichiers (ou à ceux d'un utilisateur).
+    Retourne les octets libérés par catégorie et le nombre de fichiers concernés.
+    """
+    report = {name: {"files": 0, "bytes": 0} for name in ("sidecars", "archived", "audio_deleted", "outputs")}
+
+    def account(name, reclaimed):
+        if reclaimed:
+            report[name]["files"] += 1
+            report[name]["bytes"] += reclaimed
+
+    user_filter = "AND id_user = %s" if user_id is not None else ""
+    user_params = (user_id,) if user_id is not None else ()
+
+    conn = connect()
+    try:
+        cur = conn.cursor()
+
+        # Taille des fichiers antérieurs au suivi du stockage
+        cur.execute(
+            f"""SELECT id_audio, file_path FROM fichiers_audio
+            WHERE storage_bytes IS NULL AND storage_tier <> 'deleted' {user_filter}""",
+            user_params
+        )
+        for row in cur.fetchall():
+            if not dry_run:
+                cur.execute(
+                    "UPDATE fichiers_audio SET storage_bytes = %s WHERE id_audio = %s",
+                    (file_size(row['file_path']), row['id_audio'])
+                )
+        conn.commit()
+
+        # WAV de travail des fichiers qui ne sont pas en cours de traitement
+        cur.execute(
+            f"""SELECT file_path FROM fichiers_audio
+            WHERE status NOT IN ('pending', 'processing') AND storage_tier = 'original' {user_filter}""",
+            user_params
+        )
+        for row in cur.fetchall():
+            account("sidecars", remove_sidecars(row['file_path'], dry_run))
+
+        # Originaux traités → Opus
+        cur.execute(
+            f"""SELECT id_audio FROM fichiers_audio
+            WHERE status = 'completed' AND storage_tier = 'original' {user_filter}
+            ORDER BY id_audio""",
+            user_params
+        )
+        for row in cur.fetchall():
+            try:
+                account("archived", archive_audio(cur, row['id_audio'], dry_run))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"⚠️ Archivage {row['id_audio']} échoué : {e}")
+
+        if AUDIO_RETENTION_DAYS > 0:
+            cur.execute(
+                f"""SELECT id_audio FROM fichiers_audio
+                WHERE status IN ('completed', 'failed') AND storage_tier <> 'deleted'
+                    AND date_upload < CURRENT_TIMESTAMP - make_interval(days => %s) {user_filter}""",
+                (int(AUDIO_RETENTION_DAYS), *user_params)
+            )
+            for row in cur.fetchall():
+                account("audio_deleted", delete_audio(cur, row['id_audio'], dry_run))
+                conn.commit()
+
+        if OUTPUTS_RETENTION_DAYS > 0:
+            cur.execute(
+                f"""SELECT id_audio FROM fichiers_audio
+                WHERE status = 'completed' AND outputs_purged_at IS NULL
+                    AND date_upload < CURRENT_TIMESTAMP - make_interval(days => %s) {user_filter}""",
+                (int(OUTPUTS_RETENTION_DAYS), *user_params)
+            )
+            for row in cur.fetchall():
+                account("outputs", purge_outputs(cur, row['id_audio'], dry_run))
+                conn.commit()
+
+        cur.close()
+    finally:
+        conn.close()
+
+    report["total_bytes"] = sum(r["bytes"] for r in report.values())
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cycle de vie du stockage audio")
+    parser.add_argument("--user", type=int, help="Seulement les fichiers de cet utilisateur")
+    parser.add_argument("--dry-run", action="store_true", help="Estimer sans rien supprimer")
+    args = parser.parse_args()
+
+    report = run_lifecycle(user_id=args.user, dry_run=args.dry_run)
+    labels = {
+        "sidecars": "WAV de travail",
+        "archived": "Archivage Opus",
+        "audio_deleted": f"Audio expiré ({AUDIO_RETENTION_DAYS:.0f} j)",
+        "outputs": f"Documents expirés ({OUTPUTS_RETENTION_DAYS:.0f} j)"
+    }
+    print(f"\n{'Estimation' if args.dry_run else 'Espace libéré'} :")
+    for name, label in labels.items():
+        r = report[name]
+        print(f"  {label:<26}{r['files']:>6} fichiers{r['bytes'] / 1024 / 1024:>12.1f} Mo")
+    print(f"✅ Total : {report['total_bytes'] / 1024 / 1024:.1f} Mo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+# backend/app/worker.py
+"""
+Worker de transcription : réclame les fichiers 'pending' dans Postgres et les traite.
+
+Plusieurs workers (sur autant de machines que voulu) se partagent la table
+fichiers_audio sans autre service : la réclamation utilise
+SELECT ... FOR UPDATE SKIP LOCKED, et chaque job est protégé par un bail
+(lease_expires_at) prolongé par un heartbeat. Un job dont le worker a disparu
+redevient réclamable à l'expiration du bail, dans la limite de WORKER_MAX_ATTEMPTS.
+
+Usage (depuis backend/, avec JOB_EXECUTION=worker côté API) :
+    python -m app.worker
+    python -m app.worker --concurrency 2 --worker-id gpu-node-1
+"""
+import os
+import sys
+import time
+import socket
+import signal
+import argparse
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from app.database import connect
+from app.processing import LeaseLost, process_audio
+from app.scheduler import SCHEDULER_USER_MAX_JOBS, lock_user
+
+# ============ CONFIGURATION ============
+
+WORKER_LEASE_SECONDS = int(os.getenv("WORKER_LEASE_SECONDS", "120"))
+WORKER_HEARTBEAT_SECONDS = int(os.getenv("WORKER_HEARTBEAT_SECONDS", "30"))
+WORKER_POLL_SECONDS = float(os.getenv("WORKER_POLL_SECONDS", "5"))
+WORKER_MAX_ATTEMPTS = int(os.getenv("WORKER_MAX_ATTEMPTS", "3"))
+
+
+def claim_job(worker_id: str):
+    """
+    Réclame le job disponible le plus court (ou un job au bail expiré).
+    Respecte la limite de jobs simultanés par utilisateur. Retourne la ligne ou None.
+
+    Le filtre de la sous-requête ne voit pas les réclamations concurrentes encore
+    non validées : après la réclamation, l'utilisateur est verrouillé (lock_user)
+    et le compte est refait ; au-delà de la limite, la réclamation est annulée.
+    """
+    conn = connect()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            """UPDATE fichiers_audio
+            SET status = 'processing',
+                worker_id = %s,
+                lease_expires_at = CURRENT_TIMESTAMP + make_interval(secs => %s),
+                attempts = attempts + 1
+            WHERE id_audio = (
+                SELECT f.id_audio FROM fichiers_audio f
+                WHERE (f.status = 'pending'
+                       OR (f.status = 'processing' AND f.lease_expires_at < CURRENT_TIMESTAMP))
+                    AND f.attempts < %s
+                    AND (SELECT COUNT(*) FROM fichiers_audio r
+                         WHERE r.id_user = f.id_user
+                           AND r.status = 'processing'
+                           AND r.lease_expires_at >= CURRENT_TIMESTAMP) < %s
+                ORDER BY f.duration NULLS LAST, f.date_upload
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id_audio, id_user, duration, attempts""",
+            (worker_id, WORKER_LEASE_SECONDS, WORKER_MAX_ATTEMPTS, SCHEDULER_USER_MAX_JOBS)
+        )
+        job = cur.fetchone()
+        if job:
+            lock_user(cur, job['id_user'])
+            # Nouvelle requête, nouvel instantané : voit les réclamations validées entre-temps
+            cur.execute(
+                """SELECT COUNT(*) AS running FROM fichiers_audio
+                WHERE id_user = %s AND status = 'processing'
+                    AND lease_expires_at >= CURRENT_TIMESTAMP""",
+                (job['id_user'],)
+            )
+            if cur.fetchone()['running'] > SCHEDULER_USER_MAX_JOBS:
+                conn.rollback()
+                cur.close()
+                return None
+        conn.commit()
+        cur.close()
+        return job
+    finally:
+        conn.close()
+
+
+def fail_exhausted_jobs() -> int:
+    """Passe en 'failed' les jobs abandonnés qui ont épuisé leurs tentatives"""
+    conn = connect()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            """UPDATE fichiers_audio
+            SET status = 'failed', worker_id = NULL, lease_expires_at = NULL,
+                last_error = COALESCE(last_error, 'Bail expiré : tentatives épuisées')
+            WHERE status = 'processing'
+                AND lease_expires_at < CURRENT_TIMESTAMP
+                AND attempts >= %s""",
+            (WORKER_MAX_ATTEMPTS,)
+        )
+        count = cur.rowcount
+        conn.commit()
+        cur.close()
+        return count
+    finally:
+        conn.close()
+
+
+def heartbeat(audio_id: int, worker_id: str, stop: threading.Event):
+    """Prolonge le bail tant que le job tourne (uniquement s'il appartient encore au worker)"""
+    while not stop.wait(WORKER_HEARTBEAT_SECONDS):
+        try:
+            conn = connect()
+            try:
+                cur = conn.cursor()
+                cur.execute(
+                    """UPDATE fichiers_audio
+                    SET lease_expires_at = CURRENT_TIMESTAMP + make_interval(secs => %s)
+                    WHERE id_audio = %s AND worker_id = %s""",
+                    (WORKER_LEASE_SECONDS, audio_id, worker_id)
+                )
+                conn.commit()
+                cur.close()
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"⚠️ Heartbeat {audio_id} échoué : {e}")
+
+
+def release_job(audio_id: int, worker_id: str, attempts: int, error: str):
+    """
+    Après une erreur : remet le job en file, ou 'failed' si les tentatives sont épuisées.
+    Retourne le statut, ou None si le job appartient déjà à un autre worker.
+    """
+    status = 'pending' if attempts < WORKER_MAX_ATTEMPTS else 'failed'
+    conn = connect()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            """UPDATE fichiers_audio
+            SET status = %s, worker_id = NULL, lease_expires_at = NULL, last_error = %s
+            WHERE id_audio = %s AND worker_id = %s""",
+            (status, error, audio_id, worker_id)
+        )
+        if cur.rowcount == 0:
+            status = None
+        conn.commit()
+        cur.close()
+    finally:
+        conn.close()
+    return status
+
+
+def run_job(job: dict, worker_id: str, profile: bool = None):
+    audio_id = job['id_audio']
+    print(f"🔧 [{worker_id}] Job {audio_id} réclamé (tentative {job['attempts']}/{WORKER_MAX_ATTEMPTS})")
+
+    stop = threading.Event()
+    beat = threading.Thread(target=heartbeat, args=(audio_id, worker_id, stop), daemon=True)
+    beat.start()
+    try:
+        process_audio(audio_id, profile=profile, worker_id=worker_id)
+        print(f"✅ [{worker_id}] Job {audio_id} terminé")
+    except LeaseLost as e:
+        print(f"⚠️ [{worker_id}] {e} : résultats abandonnés")
+    except Exception as e:
+        status = release_job(audio_id, worker_id, job['attempts'], str(e))
+        print(f"❌ [{worker_id}] Job {audio_id} en erreur ({e}) → {status}")
+    finally:
+        stop.set()
+        beat.join()
+
+
+def worker_loop(worker_id: str, stopping: threading.Event, profile: bool = None):
+    while not stopping.is_set():
+        try:
+            fail_exhausted_jobs()
+            job = claim_job(worker_id)
+        except Exception as e:
+            print(f"⚠️ [{worker_id}] Base indisponible : {e}")
+            job = None
+        if job is None:
+            stopping.wait(WORKER_POLL_SECONDS)
+            continue
+        run_job(job, worker_id, profile=profile)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker de transcription (file Postgres)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Jobs traités en parallèle par ce processus")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}")
+    parser.add_argument("--profile", action="store_true", help="Profiler tous les jobs (sinon selon l'option du job)")
+    args = parser.parse_args()
+
+    stopping = threading.Event()
+
+    def shutdown(signum, frame):
+        print("🛑 Arrêt demandé : fin des jobs en cours...")
+        stopping.set()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    print(f"🚀 Worker {args.worker_id} démarré ({args.concurrency} job(s) en parallèle, "
+          f"bail {WORKER_LEASE_SECONDS}s, {WORKER_MAX_ATTEMPTS} tentatives max)")
+
+    threads = [
+        threading.Thread(target=worker_loop, args=(f"{args.worker_id}-{i}", stopping, args.profile or None))
+        for i in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        time.sleep(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# backend/benchmarks/diarization.py
+"""
+Mesure l'effet des réglages de diarisation sur le temps de traitement CPU.
+
+Usage (depuis backend/) :
+    python benchmarks/diarization.py reunion.m4a --num-speakers 3
+    python benchmarks/diarization.py reunion.m4a --num-speakers 3 --batch-sizes 32 64 --threads 4 8
+
+Compare la configuration par défaut (aucune indication) à :
+- l'indication du nombre de participants (num_speakers)
+- différentes tailles de lot embedding/segmentation
+- différents nombres de threads torch
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from IA.transcriptiondiarization import pipeline, convert_to_wav, configure_diarization, diarize
+
+
+def timed(label, wav_path, runs, **hints):
+    durations = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        segments, _ = diarize(wav_path, **hints)
+        durations.append(time.perf_counter() - t0)
+    best = min(durations)
+    speakers = len(set(s["speaker"] for s in segments))
+    print(f"{label:<45}{best:>9.1f}s{speakers:>10}")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des réglages de diarisation")
+    parser.add_argument("audio_file")
+    parser.add_argument("--num-speakers", type=int, required=True, help="Nombre réel de participants")
+    parser.add_argument("--batch-sizes", type=int, nargs="*", default=[32])
+    parser.add_argument("--threads", type=int, nargs="*", default=[])
+    parser.add_argument("--runs", type=int, default=1)
+    args = parser.parse_args()
+
+    wav_path = convert_to_wav(args.audio_file)
+    default_embedding = pipeline.embedding_batch_size
+    default_segmentation = pipeline.segmentation_batch_size
+
+    print(f"{'configuration':<45}{'temps':>10}{'speakers':>10}")
+    baseline = timed("défaut", wav_path, args.runs)
+    results = {}
+    results["num_speakers"] = timed(f"num_speakers={args.num_speakers}", wav_path, args.runs,
+                                    num_speakers=args.num_speakers)
+
+    for batch_size in args.batch_sizes:
+        configure_diarization(embedding_batch_size=batch_size, segmentation_batch_size=batch_size)
+        results[f"batch={batch_size}"] = timed(
+            f"num_speakers + batch embedding/segmentation={batch_size}", wav_path, args.runs,
+            num_speakers=args.num_speakers)
+    configure_diarization(default_embedding, default_segmentation)
+
+    for threads in args.threads:
+        configure_diarization(num_threads=threads)
+        results[f"threads={threads}"] = timed(
+            f"num_speakers + torch threads={threads}", wav_path, args.runs, num_speakers=args.num_speakers)
+
+    print("\n🚀 Accélération par rapport au défaut :")
+    for label, duration in results.items():
+        print(f"  {label:<20} x{baseline / duration:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# backend/benchmarks/login_load.py
+"""
+Test de charge de /login (pic de connexions du matin).
+
+Usage (API démarrée) :
+    python benchmarks/login_load.py --url http://localhost:8000 --requests 500 --concurrency 50
+
+Pendant le pic, /health (endpoint lié à la base) est interrogé en parallèle pour
+vérifier que le hachage bcrypt ne bloque plus les autres endpoints.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+import httpx
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, int(round(p / 100 * (len(values) - 1)))))
+    return values[k]
+
+
+def report(name, latencies, errors, elapsed):
+    print(f"\n📊 {name}")
+    throughput = len(latencies) / elapsed if elapsed else 0.0
+    print(f"  requêtes : {len(latencies)} OK, {errors} erreurs en {elapsed:.2f}s ({throughput:.1f} req/s)")
+    for p in (50, 95, 99):
+        print(f"  p{p} : {percentile(latencies, p) * 1000:.1f} ms")
+
+
+async def run(url, total, concurrency):
+    email = f"load_{uuid.uuid4().hex[:8]}@example.com"
+    password = "motdepasse-test"
+
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+        r = await client.post("/register", json={"name": "Load Test", "email": email, "password": password})
+        r.raise_for_status()
+        print(f"✅ Utilisateur de test créé : {email}")
+
+        login_latencies, health_latencies = [], []
+        login_errors = 0
+        health_errors = 0
+        semaphore = asyncio.Semaphore(concurrency)
+        done = asyncio.Event()
+
+        async def one_login():
+            nonlocal login_errors
+            async with semaphore:
+                t0 = time.perf_counter()
+                r = await client.post("/login", json={"email": email, "password": password})
+                if r.status_code == 200:
+                    login_latencies.append(time.perf_counter() - t0)
+                else:
+                    login_errors += 1
+
+        async def probe_health():
+            nonlocal health_errors
+            while not done.is_set():
+                t0 = time.perf_counter()
+                r = await client.get("/health")
+                if r.status_code == 200:
+                    health_latencies.append(time.perf_counter() - t0)
+                else:
+                    health_errors += 1
+                await asyncio.sleep(0.05)
+
+        prober = asyncio.create_task(probe_health())
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one_login() for _ in range(total)))
+        elapsed = time.perf_counter() - t0
+        done.set()
+        await prober
+
+    report(f"POST /login (concurrence {concurrency})", login_latencies, login_errors, elapsed)
+    report("GET /health pendant le pic", health_latencies, health_errors, elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge de /login")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# backend/benchmarks/prompt_compression.py
+"""
+Compression extractive du prompt (IA/compression.py) : tokens économisés
+contre fidélité, sur des transcriptions nettoyées.
+
+Sans --llm : tokens avant/après, phrases de décision/action conservées,
+couverture du vocabulaire et temps de sélection, par budget, à comparer à
+l'ancienne troncature à 3000 caractères (ligne « tronqué ») ; le budget par
+défaut (PROMPT_TOKEN_BUDGET) est marqué d'une étoile.
+Avec --llm : génère aussi le compte-rendu (Groq, ou GROQ_BASE_URL) sur le texte
+complet (référence), sur le texte compressé et sur l'ancienne troncature à
+3000 caractères, puis mesure le recouvrement ROUGE-1 / ROUGE-2 avec la référence.
+
+Usage (depuis backend/) :
+    python benchmarks/prompt_compression.py outputs/audio_*/transcription_nettoyee.txt
+    python benchmarks/prompt_compression.py reunion1.txt reunion2.txt --budgets 500 1000 2000 --llm
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from IA.compression import (
+    PROMPT_TOKEN_BUDGET, STOP_WORDS, compress_text, estimate_tokens, has_cue, split_sentences
+)
+
+TRUNCATION_CHARS = 3000
+
+WORD_RE = re.compile(r"\w+")
+
+
+def words(text):
+    return WORD_RE.findall(text.lower())
+
+
+def content_words(text):
+    return {w for w in words(text) if w not in STOP_WORDS and len(w) > 2}
+
+
+def rouge_n(candidate, reference, n=1):
+    """F-mesure ROUGE-N (recouvrement de n-grammes)"""
+    def ngrams(tokens):
+        return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+    cand, ref = ngrams(words(candidate)), ngrams(words(reference))
+    overlap = sum((cand & ref).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(cand.values())
+    recall = overlap / sum(ref.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def cue_recall(original, compressed):
+    cues = [s for s in split_sentences(original) if has_cue(s)]
+    if not cues:
+        return None
+    return sum(1 for s in cues if s in compressed) / len(cues)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la compression du prompt")
+    parser.add_argument("text_files", nargs="+", help="Transcriptions nettoyées (texte)")
+    parser.add_argument("--budgets", nargs="+", type=int, default=sorted({500, PROMPT_TOKEN_BUDGET, 1000, 2000}))
+    parser.add_argument("--llm", action="store_true", help="Mesurer le recouvrement des comptes-rendus générés")
+    parser.add_argument("--reference-tokens", type=int, default=24000,
+                        help="Budget du compte-rendu de référence (texte complet jusqu'à ce plafond)")
+    args = parser.parse_args()
+
+    if args.llm:
+        from IA.resume import generate_compte_rendu
+
+    for path in args.text_files:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        tokens = estimate_tokens(text)
+        print(f"\n📄 {path} : {tokens} tokens, {len(split_sentences(text))} phrases")
+
+        reference = truncated_overlap = None
+        if args.llm:
+            reference = generate_compte_rendu(text, token_budget=args.reference_tokens)["compte_rendu_complet"]
+            truncated = generate_compte_rendu(text, compress=False)["compte_rendu_complet"]
+            truncated_overlap = (rouge_n(truncated, reference, 1), rouge_n(truncated, reference, 2))
+
+        header = f"{'budget':>8}{'tokens':>9}{'économie':>10}{'décisions':>11}{'vocabulaire':>13}{'temps':>9}"
+        if args.llm:
+            header += f"{'ROUGE-1':>10}{'ROUGE-2':>10}"
+        print(header)
+
+        vocabulary = content_words(text)
+        for budget in args.budgets:
+            t0 = time.perf_counter()
+            compressed = compress_text(text, token_budget=budget)
+            seconds = time.perf_counter() - t0
+
+            after = estimate_tokens(compressed)
+            cues = cue_recall(text, compressed)
+            coverage = len(content_words(compressed) & vocabulary) / max(len(vocabulary), 1)
+            label = f"{budget}*" if budget == PROMPT_TOKEN_BUDGET else str(budget)
+            line = (f"{label:>8}{after:>9}{100 * (1 - after / max(tokens, 1)):>9.0f}%"
+                    f"{'-' if cues is None else f'{100 * cues:.0f}%':>11}{100 * coverage:>12.0f}%{seconds * 1000:>7.0f}ms")
+            if args.llm:
+                report = generate_compte_rendu(compressed, token_budget=budget)["compte_rendu_complet"]
+                line += f"{rouge_n(report, reference, 1):>10.3f}{rouge_n(report, reference, 2):>10.3f}"
+            print(line)
+
+        truncated_text = text[:TRUNCATION_CHARS]
+        after = estimate_tokens(truncated_text)
+        cues = cue_recall(text, truncated_text)
+        coverage = len(content_words(truncated_text) & vocabulary) / max(len(vocabulary), 1)
+        line = (f"{'tronqué':>8}{after:>9}{100 * (1 - after / max(tokens, 1)):>9.0f}%"
+                f"{'-' if cues is None else f'{100 * cues:.0f}%':>11}{100 * coverage:>12.0f}%{'':>9}")
+        if truncated_overlap:
+            line += f"{truncated_overlap[0]:>10.3f}{truncated_overlap[1]:>10.3f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# backend/benchmarks/segment_storage.py
+"""
+Compare les deux formats de stockage des segments (app/segment_store.py) :
+latence d'écriture, de lecture complète et d'une page, et taille sur disque.
+
+Usage (depuis backend/, base configurée comme pour l'API) :
+    python benchmarks/segment_storage.py
+    python benchmarks/segment_storage.py --meetings 20 --segments 5000 --block-size 256
+
+Les réunions de test appartiennent à un utilisateur dédié, supprimé à la fin.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.database import connect
+from app.segment_store import STORAGE_MODES, write_segments
+
+BENCH_EMAIL = "bench-segments@meetvocal.local"
+WORDS = ("alors donc projet réunion budget planning équipe client livraison "
+         "semaine prochaine valider point important question réponse").split()
+
+
+def fake_segments(count, num_speakers=4, seed=0):
+    rng = random.Random(seed)
+    t = 0.0
+    for _ in range(count):
+        duration = rng.uniform(1.5, 8.0)
+        yield {
+            "start": t,
+            "end": t + duration,
+            "speaker": f"SPEAKER_{rng.randrange(num_speakers):02d}",
+            "text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 25)))
+        }
+        t += duration + rng.uniform(0.0, 0.5)
+
+
+def relation_sizes(cur):
+    cur.execute(
+        """SELECT pg_total_relation_size('transcriptions') AS rows_size,
+                  pg_total_relation_size('transcription_blocks') AS blocks_size"""
+    )
+    row = cur.fetchone()
+    return {"rows": row['rows_size'], "blocks": row['blocks_size']}
+
+
+def vacuum():
+    conn = connect()
+    conn.autocommit = True
+    cur = conn.cursor()
+    cur.execute("VACUUM ANALYZE transcriptions")
+    cur.execute("VACUUM ANALYZE transcription_blocks")
+    cur.close()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du stockage des segments")
+    parser.add_argument("--meetings", type=int, default=10)
+    parser.add_argument("--segments", type=int, default=3000, help="Segments par réunion")
+    parser.add_argument("--block-size", type=int, default=256)
+    parser.add_argument("--page-size", type=int, default=200)
+    args = parser.parse_args()
+
+    conn = connect()
+    cur = conn.cursor()
+    cur.execute("DELETE FROM utilisateurs WHERE email = %s", (BENCH_EMAIL,))
+    cur.execute(
+        """INSERT INTO utilisateurs (name, email, password)
+        VALUES ('bench', %s, 'x') RETURNING id_user""",
+        (BENCH_EMAIL,)
+    )
+    user_id = cur.fetchone()['id_user']
+    conn.commit()
+
+    results = {}
+    try:
+        vacuum()
+        sizes_before = relation_sizes(cur)
+
+        for mode in STORAGE_MODES:
+            audio_ids = []
+            for m in range(args.meetings):
+                cur.execute(
+                    """INSERT INTO fichiers_audio (id_user, title, status, file_path)
+                    VALUES (%s, %s, 'completed', '') RETURNING id_audio""",
+                    (user_id, f"bench {mode} {m}")
+                )
+                audio_ids.append(cur.fetchone()['id_audio'])
+            conn.commit()
+
+            t0 = time.perf_counter()
+            for m, audio_id in enumerate(audio_ids):
+                write_segments(cur, audio_id, fake_segments(args.segments, seed=m),
+                               storage=mode, block_size=args.block_size)
+                conn.commit()
+            write_seconds = time.perf_counter() - t0
+
+            vacuum()
+            t0 = time.perf_counter()
+            for audio_id in audio_ids:
+                cur.execute(
+                    """SELECT text_brut, start_time, end_time, speaker
+                    FROM transcription_segments
+                    WHERE id_audio = %s ORDER BY sequence_number""",
+                    (audio_id,)
+                )
+                assert len(cur.fetchall()) == args.segments
+            read_seconds = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            for audio_id in audio_ids:
+                cur.execute(
+                    """SELECT text_brut, start_time, end_time, speaker
+                    FROM transcription_segments
+                    WHERE id_audio = %s AND sequence_number >= %s
+                    ORDER BY sequence_number LIMIT %s""",
+                    (audio_id, args.segments // 2, args.page_size)
+                )
+                cur.fetchall()
+            page_seconds = time.perf_counter() - t0
+
+            sizes = relation_sizes(cur)
+            results[mode] = {
+                "write_ms": 1000 * write_seconds / args.meetings,
+                "read_ms": 1000 * read_seconds / args.meetings,
+                "page_ms": 1000 * page_seconds / args.meetings,
+                "size_mb": (sizes[mode] - sizes_before[mode]) / 1024 / 1024
+            }
+    finally:
+        conn.rollback()
+        cur.execute("DELETE FROM utilisateurs WHERE email = %s", (BENCH_EMAIL,))
+        conn.commit()
+        cur.close()
+        conn.close()
+
+    print(f"\n{args.meetings} réunions × {args.segments} segments (blocs de {args.block_size})")
+    print(f"{'format':<10}{'écriture':>12}{'lecture':>12}{'page':>12}{'taille':>12}")
+    for mode, r in results.items():
+        print(f"{mode:<10}{r['write_ms']:>10.1f}ms{r['read_ms']:>10.1f}ms{r['page_ms']:>10.1f}ms{r['size_mb']:>10.2f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# backend/benchmarks/summarizers.py
+"""
+Compare les résumeurs locaux : mémoire résidente et latence par backend.
+
+Usage (depuis backend/) :
+    SUMMARIZER_MODEL_PATH=/models/barthez python benchmarks/summarizers.py transcript.txt
+    python benchmarks/summarizers.py transcript.txt --backends bart quantized --runs 3
+
+Chaque backend est mesuré dans un processus séparé pour que la mémoire
+d'un modèle ne fausse pas la mesure du suivant.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def measure(backend, text_file, runs):
+    from IA.summarizers import get_summarizer, current_rss_mb
+
+    with open(text_file, encoding="utf-8") as f:
+        text = " ".join(f.read().split()[:400])
+
+    summarizer = get_summarizer(backend)
+    summarizer.load()
+    latencies = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        summarizer.summarize(text, max_length=100, min_length=30)
+        latencies.append(time.perf_counter() - t0)
+
+    result = summarizer.report()
+    result["process_rss_mb"] = round(current_rss_mb(), 1)
+    result["min_latency_seconds"] = round(min(latencies), 3)
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des résumeurs locaux")
+    parser.add_argument("text_file", help="Fichier texte (transcription nettoyée)")
+    parser.add_argument("--backends", nargs="+", default=["bart", "quantized"])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure(args.child, args.text_file, args.runs)
+        return
+
+    print(f"{'backend':<12}{'chargement':>12}{'+RSS (Mo)':>12}{'RSS total':>12}{'latence moy.':>14}{'latence min':>13}")
+    for backend in args.backends:
+        proc = subprocess.run(
+            [sys.executable, __file__, args.text_file, "--runs", str(args.runs), "--child", backend],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            print(f"{backend:<12}❌ {proc.stderr.strip().splitlines()[-1] if proc.stderr else 'échec'}")
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"{backend:<12}{r['load_seconds']:>11}s{r['rss_mb']:>12}{r['process_rss_mb']:>12}"
+              f"{r['avg_latency_seconds']:>13}s{r['min_latency_seconds']:>12}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+# backend/loadtest/fake_groq.py
+"""
+Faux serveur Groq (API compatible OpenAI) pour les tests de charge.
+
+- POST .../chat/completions : compte-rendu factice au format attendu par resume.py,
+  en une réponse ou en streaming ("stream": true, événements SSE, un mot toutes
+  les --token-ms millisecondes après la latence du premier token) ; avec
+  response_format json_object, l'objet JSON de l'appel unique (SUMMARY_MODE=llm)
+- POST .../audio/transcriptions : segments Whisper factices (verbose_json)
+
+Latence et taux de réponses 429 configurables, pour simuler la limitation de débit.
+
+Usage (depuis backend/) :
+    python loadtest/fake_groq.py --port 8090 --latency-ms 800 --jitter-ms 300 --rate-429 0.05
+puis côté API : GROQ_BASE_URL=http://127.0.0.1:8090 GROQ_API_KEY=loadtest
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COMPTE_RENDU = """# RÉSUMÉ EXÉCUTIF
+Réunion de test générée par le faux serveur Groq.
+
+# CONTEXTE ET OBJECTIF
+Mesurer la capacité de l'API.
+
+# POINTS CLÉS DISCUTÉS
+- Point 1
+- Point 2
+
+# DÉCISIONS PRISES
+- Aucune
+
+# ACTIONS À ENTREPRENDRE
+- Aucune
+"""
+
+SPEAKER_IDS_RE = re.compile(r"clés JSON attendues\) : (\[.*\])")
+
+WORDS = "alors donc le projet avance bien nous devons valider le planning avec le client".split()
+
+
+def structured_report(payload):
+    """Réponse JSON de l'appel unique : une entrée par identifiant listé dans le prompt"""
+    prompt = payload["messages"][-1]["content"]
+    match = SPEAKER_IDS_RE.search(prompt)
+    speakers = json.loads(match.group(1)) if match else []
+    return json.dumps({
+        "compte_rendu": COMPTE_RENDU,
+        "resume_court": "Réunion de test générée par le faux serveur Groq.",
+        "resumes_par_intervenant": {speaker: f"{speaker} présente l'avancement du projet." for speaker in speakers}
+    }, ensure_ascii=False)
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {"chat": 0, "transcription": 0, "429": 0}
+
+    def incr(self, key):
+        with self.lock:
+            self.counts[key] += 1
+
+
+def make_handler(config, stats):
+    class FakeGroqHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body, headers=None):
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _stream_chat(self):
+            """Compte-rendu en chunks « chat.completion.chunk » (SSE), comme l'API Groq"""
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+
+            def event(delta, finish_reason=None):
+                chunk = {
+                    "id": "chatcmpl-loadtest",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": "loadtest",
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+                }
+                self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+            event({"role": "assistant", "content": ""})
+            for token in re.findall(r"\S+\s*", COMPTE_RENDU):
+                time.sleep(config.token_ms / 1000)
+                event({"content": token})
+            event({}, "stop")
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+        def do_POST(self):
+            # Le corps JSON est lu pour l'option stream ; l'audio (multipart) est ignoré
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            payload = {}
+            if self.headers.get("Content-Type", "").startswith("application/json"):
+                payload = json.loads(body or b"{}")
+
+            delay = max(0.0, config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)) / 1000
+            time.sleep(delay)
+
+            if random.random() < config.rate_429:
+                stats.incr("429")
+                return self._send(
+                    429,
+                    {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                    {"Retry-After": str(config.retry_after)}
+                )
+
+            if self.path.endswith("/chat/completions"):
+                stats.incr("chat")
+                if payload.get("stream"):
+                    return self._stream_chat()
+                content = COMPTE_RENDU
+                if (payload.get("response_format") or {}).get("type") == "json_object":
+                    content = structured_report(payload)
+                return self._send(200, {
+                    "id": "chatcmpl-loadtest",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": "loadtest",
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop"
+                    }],
+                    "usage": {"prompt_tokens": 1000, "completion_tokens": 200, "total_tokens": 1200}
+                })
+
+            if self.path.endswith("/audio/transcriptions"):
+                stats.incr("transcription")
+                segments = []
+                for i, start in enumerate(range(0, int(config.audio_seconds), 5)):
+                    segments.append({
+                        "id": i,
+                        "start": float(start),
+                        "end": float(min(start + 5, config.audio_seconds)),
+                        "text": " ".join(random.choice(WORDS) for _ in range(12))
+                    })
+                return self._send(200, {
+                    "text": " ".join(s["text"] for s in segments),
+                    "language": "fr",
+                    "duration": config.audio_seconds,
+                    "segments": segments
+                })
+
+            self._send(404, {"error": {"message": f"Chemin inconnu : {self.path}"}})
+
+    return FakeGroqHandler
+
+
+def serve(port, latency_ms=500, jitter_ms=0, rate_429=0.0, retry_after=1, audio_seconds=60, token_ms=20):
+    """Démarre le serveur dans un thread ; retourne (serveur, stats)"""
+    config = argparse.Namespace(latency_ms=latency_ms, jitter_ms=jitter_ms, rate_429=rate_429,
+                                retry_after=retry_after, audio_seconds=audio_seconds, token_ms=token_ms)
+    stats = Stats()
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(config, stats))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Faux serveur Groq pour les tests de charge")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=500)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Proportion de réponses 429 (0-1)")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--audio-seconds", type=float, default=60, help="Durée couverte par les segments renvoyés")
+    parser.add_argument("--token-ms", type=float, default=20, help="Intervalle entre tokens en streaming")
+    args = parser.parse_args()
+
+    server, stats = serve(args.port, args.latency_ms, args.jitter_ms, args.rate_429,
+                          args.retry_after, args.audio_seconds, args.token_ms)
+    print(f"🤖 Faux Groq sur http://127.0.0.1:{args.port} "
+          f"(latence {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms, 429 : {args.rate_429:.0%})")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"📊 {stats.counts}")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+# backend/loadtest/run.py
+"""
+Test de charge de bout en bout de l'API, avec des remplaçants locaux.
+
+Démarre (sauf --url) :
+- le faux serveur Groq (loadtest/fake_groq.py) : latence et taux de 429 configurables
+- l'API (uvicorn app.main:app) sur la base Postgres locale (DATABASE_URL / DB_*),
+  avec DIARIZATION_BACKEND=fake et SUMMARIZER_BACKEND=fake (pas de modèle à charger)
+
+puis envoie un trafic mixte (register/login, upload, GET /fichiers, compte-rendu,
+PDF) à concurrence fixe et affiche débit et p50/p95/p99 par endpoint.
+
+Usage (depuis backend/, schéma SQL_File.sql appliqué) :
+    python loadtest/run.py --concurrency 50 --duration 60
+    python loadtest/run.py --groq-latency-ms 1500 --groq-429-rate 0.1 --mix login=2,fichiers=5,compte_rendu=3,pdf=1,upload=1
+    python loadtest/run.py --url http://api-staging:8000 --concurrency 20
+    python loadtest/run.py --mix compte_rendu_stream=1 --groq-latency-ms 600 --groq-token-ms 30
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+import numpy as np
+import soundfile as sf
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from loadtest.fake_groq import serve as serve_fake_groq
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..")
+PASSWORD = "motdepasse-loadtest"
+DEFAULT_MIX = "login=2,fichiers=5,compte_rendu=3,pdf=1,upload=1"
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, int(round(p / 100 * (len(values) - 1)))))
+    return values[k]
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, weight = part.split("=")
+        weights[name.strip()] = float(weight)
+    unknown = set(weights) - set(OPERATIONS)
+    if unknown:
+        raise ValueError(f"Opérations inconnues : {', '.join(sorted(unknown))} (disponibles : {', '.join(OPERATIONS)})")
+    return weights
+
+
+def make_audio(path: str, seconds: float):
+    """Audio de test : bruit faible + bips, pour que le VAD garde de la « parole »"""
+    sr = 16000
+    t = np.arange(int(seconds * sr)) / sr
+    signal = 0.01 * np.random.default_rng(0).standard_normal(len(t))
+    signal += 0.3 * np.sin(2 * np.pi * 220 * t) * (np.sin(2 * np.pi * 0.2 * t) > 0)
+    sf.write(path, signal.astype(np.float32), sr)
+
+
+class Recorder:
+    """Latences et erreurs par endpoint"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.statuses = {}
+
+    def record(self, name, seconds, status):
+        self.statuses.setdefault(name, {}).setdefault(status, 0)
+        self.statuses[name][status] += 1
+        if status < 400:
+            self.latencies.setdefault(name, []).append(seconds)
+        else:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def report(self, elapsed):
+        print(f"\n{'endpoint':<16}{'ok':>8}{'erreurs':>9}{'req/s':>9}{'p50':>10}{'p95':>10}{'p99':>10}")
+        total = 0
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            values = self.latencies.get(name, [])
+            total += len(values)
+            print(f"{name:<16}{len(values):>8}{self.errors.get(name, 0):>9}{len(values) / elapsed:>9.1f}"
+                  f"{percentile(values, 50) * 1000:>8.0f}ms{percentile(values, 95) * 1000:>8.0f}ms"
+                  f"{percentile(values, 99) * 1000:>8.0f}ms")
+        print(f"\n✅ {total} requêtes réussies en {elapsed:.1f}s ({total / elapsed:.1f} req/s)")
+        for name, statuses in sorted(self.statuses.items()):
+            errors = {code: n for code, n in statuses.items() if code >= 400}
+            if errors:
+                print(f"⚠️ {name} : {errors}")
+
+    def to_dict(self, elapsed):
+        return {
+            name: {
+                "ok": len(self.latencies.get(name, [])),
+                "errors": self.errors.get(name, 0),
+                "throughput": len(self.latencies.get(name, [])) / elapsed,
+                **{f"p{p}_ms": percentile(self.latencies.get(name, []), p) * 1000 for p in (50, 95, 99)}
+            }
+            for name in set(self.latencies) | set(self.errors)
+        }
+
+
+async def timed(recorder, name, coro):
+    t0 = time.perf_counter()
+    try:
+        response = await coro
+        status = response.status_code
+    except httpx.HTTPError:
+        response, status = None, 599
+    recorder.record(name, time.perf_counter() - t0, status)
+    return response
+
+
+# ============ OPÉRATIONS ============
+
+async def op_login(client, user, ctx):
+    await timed(ctx.recorder, "login", client.post("/login", json={"email": user["email"], "password": PASSWORD}))
+
+
+async def op_fichiers(client, user, ctx):
+    await timed(ctx.recorder, "fichiers", client.get("/fichiers", headers=user["headers"]))
+
+
+async def op_compte_rendu(client, user, ctx):
+    if user["completed"]:
+        audio_id = random.choice(user["completed"])
+        await timed(ctx.recorder, "compte_rendu",
+                    client.get(f"/fichiers/{audio_id}/compte-rendu", headers=user["headers"]))
+
+
+async def op_pdf(client, user, ctx):
+    if user["completed"]:
+        audio_id = random.choice(user["completed"])
+        await timed(ctx.recorder, "pdf", client.get(f"/fichiers/{audio_id}/pdf", headers=user["headers"]))
+
+
+async def op_compte_rendu_stream(client, user, ctx):
+    """Compte-rendu en streaming : temps jusqu'au premier fragment (stream_ttfb) et durée totale"""
+    if not user["completed"]:
+        return
+    audio_id = random.choice(user["completed"])
+    t0 = time.perf_counter()
+    status = 599
+    try:
+        async with client.stream("POST", f"/fichiers/{audio_id}/compte-rendu/stream",
+                                 headers=user["headers"]) as response:
+            status = response.status_code
+            first = True
+            async for line in response.aiter_lines():
+                if first and line.startswith("event: delta"):
+                    ctx.recorder.record("stream_ttfb", time.perf_counter() - t0, status)
+                    first = False
+                elif line.startswith("event: error"):
+                    status = 502
+    except httpx.HTTPError:
+        pass
+    ctx.recorder.record("compte_rendu_stream", time.perf_counter() - t0, status)
+
+
+async def op_upload(client, user, ctx):
+    with open(ctx.audio_path, "rb") as f:
+        data = f.read()
+    await timed(ctx.recorder, "upload", client.post(
+        "/upload",
+        headers=user["headers"],
+        files={"file": (f"loadtest_{uuid.uuid4().hex[:6]}.wav", data, "audio/wav")},
+        data={"title": "loadtest"}
+    ))
+
+
+async def op_register(client, user, ctx):
+    email = f"loadtest_{uuid.uuid4().hex[:10]}@example.com"
+    await timed(ctx.recorder, "register",
+                client.post("/register", json={"name": "Load Test", "email": email, "password": PASSWORD}))
+
+
+OPERATIONS = {
+    "register": op_register,
+    "login": op_login,
+    "fichiers": op_fichiers,
+    "compte_rendu": op_compte_rendu,
+    "compte_rendu_stream": op_compte_rendu_stream,
+    "pdf": op_pdf,
+    "upload": op_upload,
+}
+
+
+# ============ PRÉPARATION ============
+
+async def create_users(client, count):
+    users = []
+    for _ in range(count):
+        email = f"loadtest_{uuid.uuid4().hex[:10]}@example.com"
+        r = await client.post("/register", json={"name": "Load Test", "email": email, "password": PASSWORD})
+        r.raise_for_status()
+        r = await client.post("/login", json={"email": email, "password": PASSWORD})
+        r.raise_for_status()
+        users.append({
+            "email": email,
+            "headers": {"Authorization": f"Bearer {r.json()['access_token']}"},
+            "completed": []
+        })
+    return users
+
+
+async def seed_meetings(client, users, audio_path, timeout):
+    """Un fichier traité par utilisateur, pour les lectures compte-rendu / PDF"""
+    pending = {}
+    with open(audio_path, "rb") as f:
+        data = f.read()
+    for user in users:
+        r = await client.post("/upload", headers=user["headers"],
+                              files={"file": ("seed.wav", data, "audio/wav")}, data={"title": "seed"})
+        r.raise_for_status()
+        pending[r.json()["id_audio"]] = user
+
+    deadline = time.monotonic() + timeout
+    while pending and time.monotonic() < deadline:
+        await asyncio.sleep(1)
+        for audio_id, user in list(pending.items()):
+            r = await client.get(f"/fichiers/{audio_id}/status", headers=user["headers"])
+            status = r.json().get("status")
+            if status == "completed":
+                user["completed"].append(audio_id)
+                del pending[audio_id]
+            elif status == "failed":
+                print(f"⚠️ Traitement de préparation {audio_id} en échec")
+                del pending[audio_id]
+    if pending:
+        print(f"⚠️ {len(pending)} fichiers de préparation non terminés après {timeout:.0f}s")
+
+
+# ============ SERVICES LOCAUX ============
+
+def start_api(port, groq_url, workers, real_summarizer):
+    env = {
+        **os.environ,
+        "GROQ_BASE_URL": groq_url,
+        "GROQ_API_KEY": "loadtest",
+        "ASR_BACKEND": "groq",
+        "DIARIZATION_BACKEND": "fake",
+        "USER_DAILY_AUDIO_MINUTES": "0",
+        "SECRET_KEY": os.getenv("SECRET_KEY", "loadtest-secret"),
+    }
+    if not real_summarizer:
+        env["SUMMARIZER_BACKEND"] = "fake"
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+
+
+async def wait_for_api(url, timeout=120):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=url, timeout=5) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(1)
+    raise RuntimeError(f"L'API n'a pas démarré sur {url}")
+
+
+# ============ CHARGE ============
+
+async def drive(args, url):
+    weights = parse_mix(args.mix)
+    names = list(weights)
+    probabilities = [weights[n] for n in names]
+
+    ctx = argparse.Namespace(recorder=Recorder(), audio_path=os.path.join(args.tmp_dir, "loadtest.wav"))
+    make_audio(ctx.audio_path, args.audio_seconds)
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+        print(f"👥 Création de {args.users} utilisateurs...")
+        users = await create_users(client, args.users)
+        if {"compte_rendu", "compte_rendu_stream", "pdf"} & set(names):
+            print("📥 Préparation des réunions (upload + traitement)...")
+            await seed_meetings(client, users, ctx.audio_path, args.seed_timeout)
+
+        print(f"🚀 Charge : {args.concurrency} clients pendant {args.duration:.0f}s, mix {args.mix}")
+        stop_at = time.monotonic() + args.duration
+
+        async def virtual_user():
+            while time.monotonic() < stop_at:
+                name = random.choices(names, probabilities)[0]
+                await OPERATIONS[name](client, random.choice(users), ctx)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(virtual_user() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - t0
+
+    ctx.recorder.report(elapsed)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(ctx.recorder.to_dict(elapsed), f, indent=2)
+        print(f"💾 Résultats : {args.json}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge de bout en bout de l'API")
+    parser.add_argument("--url", help="API déjà démarrée (sinon API + faux Groq lancés localement)")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--api-workers", type=int, default=1, help="Workers uvicorn")
+    parser.add_argument("--groq-port", type=int, default=8090)
+    parser.add_argument("--groq-latency-ms", type=float, default=800)
+    parser.add_argument("--groq-jitter-ms", type=float, default=200)
+    parser.add_argument("--groq-429-rate", type=float, default=0.0)
+    parser.add_argument("--groq-token-ms", type=float, default=20, help="Intervalle entre tokens (streaming)")
+    parser.add_argument("--real-summarizer", action="store_true", help="Garder le résumeur BART réel")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=60, help="Durée de la charge (secondes)")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Poids des opérations ({', '.join(OPERATIONS)})")
+    parser.add_argument("--audio-seconds", type=float, default=60, help="Durée de l'audio uploadé")
+    parser.add_argument("--seed-timeout", type=float, default=300)
+    parser.add_argument("--timeout", type=float, default=120, help="Timeout HTTP (secondes)")
+    parser.add_argument("--json", help="Écrire les résultats dans ce fichier")
+    args = parser.parse_args()
+
+    api = groq = None
+    url = args.url
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        args.tmp_dir = tmp_dir
+        try:
+            if not url:
+                groq, groq_stats = serve_fake_groq(
+                    args.groq_port, args.groq_latency_ms, args.groq_jitter_ms,
+                    args.groq_429_rate, audio_seconds=args.audio_seconds, token_ms=args.groq_token_ms
+                )
+                print(f"🤖 Faux Groq : http://127.0.0.1:{args.groq_port}")
+                api = start_api(args.port, f"http://127.0.0.1:{args.groq_port}",
+                                args.api_workers, args.real_summarizer)
+                url = f"http://127.0.0.1:{args.port}"
+                asyncio.run(wait_for_api(url))
+                print(f"✅ API démarrée : {url}")
+
+            asyncio.run(drive(args, url))
+
+            if groq:
+                print(f"🤖 Appels au faux Groq : {groq_stats.counts}")
+        finally:
+            if api:
+                api.terminate()
+                api.wait()
+            if groq:
+                groq.shutdown()
+
+
+if __name__ == "__main__":
+    main()
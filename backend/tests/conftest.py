@@ -0,0 +1,6 @@
+# backend/tests/conftest.py
+import os
+import sys
+
+# Les modules s'importent depuis backend/ (IA.*, app.*), comme pour l'API
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
@@ -0,0 +1,50 @@
+# backend/tests/test_analytics.py
+from IA.analytics import compute_meeting_stats
+
+
+def seg(start, end, speaker, text):
+    return {"start": start, "end": end, "speaker": speaker, "text": text}
+
+
+SEGMENTS = [
+    seg(0.0, 10.0, "SPEAKER_00", "un deux trois"),
+    seg(9.0, 15.0, "SPEAKER_01", "quatre cinq"),      # coupe la parole
+    seg(15.0, 20.0, "SPEAKER_00", "six"),
+    seg(20.0, 30.0, "SPEAKER_00", "sept huit"),
+]
+
+
+def test_meeting_stats():
+    stats = compute_meeting_stats(SEGMENTS)
+    assert stats["duration"] == 30.0
+    assert stats["num_speakers"] == 2
+    assert stats["num_segments"] == 4
+    assert stats["num_turns"] == 3
+    assert stats["num_interruptions"] == 1
+    assert stats["words_per_minute"] == 16.0
+    assert stats["speakers"]["SPEAKER_00"] == {
+        "talk_time": 25.0, "talk_ratio": 0.806, "turns": 2, "segments": 3,
+        "words": 6, "words_per_minute": 14.4, "interruptions": 0
+    }
+    assert stats["speakers"]["SPEAKER_01"] == {
+        "talk_time": 6.0, "talk_ratio": 0.194, "turns": 1, "segments": 1,
+        "words": 2, "words_per_minute": 20.0, "interruptions": 1
+    }
+
+
+def test_interruptions_come_from_diarization_when_given():
+    diar = [
+        {"start": 0.0, "end": 10.0, "speaker": "SPEAKER_00"},
+        {"start": 8.0, "end": 9.0, "speaker": "SPEAKER_02"},   # absent de la transcription
+        {"start": 8.5, "end": 15.0, "speaker": "SPEAKER_01"},
+        {"start": 14.0, "end": 30.0, "speaker": "SPEAKER_00"},
+    ]
+    speakers = compute_meeting_stats(SEGMENTS, diar)["speakers"]
+    assert speakers["SPEAKER_00"]["interruptions"] == 1
+    assert speakers["SPEAKER_01"]["interruptions"] == 1
+    assert "SPEAKER_02" not in speakers
+
+
+def test_empty_meeting():
+    stats = compute_meeting_stats([])
+    assert stats["num_segments"] == 0 and stats["speakers"] == {}
@@ -0,0 +1,48 @@
+# backend/tests/test_asr.py
+import numpy as np
+import pytest
+import soundfile as sf
+
+from IA.asr import FakeASRBackend, LocalWhisperBackend, WHISPER_MAX_CHUNK_SECONDS
+
+
+@pytest.fixture
+def wav_12s(tmp_path):
+    path = tmp_path / "audio.wav"
+    sf.write(path, np.zeros(16000 * 12, dtype=np.float32), 16000)
+    return str(path)
+
+
+def test_fake_backend_segments_cover_audio(wav_12s):
+    segments = FakeASRBackend(segment_seconds=5.0).transcribe(wav_12s)
+    assert [(s["start"], s["end"]) for s in segments] == [(0.0, 5.0), (5.0, 10.0), (10.0, 12.0)]
+    assert segments[0]["text"] == "Segment numéro 1."
+
+
+def test_fake_backend_cycles_texts(wav_12s):
+    segments = FakeASRBackend(segment_seconds=4.0, texts=["a", "b"]).transcribe(wav_12s)
+    assert [s["text"] for s in segments] == ["a", "b", "a"]
+
+
+def test_local_chunk_seconds_capped_at_whisper_limit():
+    backend = LocalWhisperBackend(model_path="inutilise", chunk_seconds=45, overlap_seconds=2)
+    assert backend.chunk_seconds == WHISPER_MAX_CHUNK_SECONDS
+
+
+def test_local_overlap_must_be_smaller_than_half_chunk():
+    with pytest.raises(ValueError):
+        LocalWhisperBackend(model_path="inutilise", chunk_seconds=10, overlap_seconds=5)
+
+
+def test_local_chunks_overlap_and_ownership_is_contiguous(wav_12s):
+    backend = LocalWhisperBackend(model_path="inutilise", chunk_seconds=5, overlap_seconds=1)
+    chunks = list(backend._iter_chunks(wav_12s))
+
+    assert [offset for offset, *_ in chunks] == [0.0, 4.0, 8.0]
+    assert all(len(samples) <= 5 * 16000 for _, samples, _, _ in chunks)
+    keeps = [keep for *_, keep in chunks]
+    assert keeps[0][0] == float("-inf") and keeps[-1][1] == float("inf")
+    # Frontière au milieu du recouvrement : chaque instant appartient à un seul morceau
+    for (_, until), (since, _) in zip(keeps, keeps[1:]):
+        assert until == since
+    assert keeps[0][1] == pytest.approx(4.5)
@@ -0,0 +1,72 @@
+# backend/tests/test_chunked_upload.py
+import hashlib
+import os
+
+import pytest
+
+from app import chunked_upload
+from app.chunked_upload import (
+    UploadError, chunks_manifest_digest, cleanup_expired_sessions, complete_upload,
+    init_upload, upload_status, write_chunk
+)
+
+DATA = bytes(range(256)) * 10  # 2560 octets, 3 morceaux de 1000
+CHUNK = 1000
+
+
+@pytest.fixture(autouse=True)
+def sessions_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(chunked_upload, "CHUNKED_UPLOAD_DIR", str(tmp_path / "sessions"))
+    return tmp_path
+
+
+def digests():
+    return [hashlib.sha256(DATA[i:i + CHUNK]).hexdigest() for i in range(0, len(DATA), CHUNK)]
+
+
+def upload(order=(2, 0, 1)):
+    upload_id = init_upload(1, "reunion.wav", len(DATA), chunk_size=CHUNK)["upload_id"]
+    for index in order:
+        write_chunk(upload_id, 1, index, DATA[index * CHUNK:(index + 1) * CHUNK], digests()[index])
+    return upload_id
+
+
+def test_complete_checks_the_chunk_manifest_and_the_full_hash(sessions_dir):
+    result = complete_upload(upload(), 1, str(sessions_dir), chunks_sha256=chunks_manifest_digest(digests()))
+    assert result["sha256"] == hashlib.sha256(DATA).hexdigest()
+    assert result["chunks_sha256"] == chunks_manifest_digest(digests())
+    with open(result["path"], "rb") as f:
+        assert f.read() == DATA
+
+
+def test_complete_rejects_a_manifest_of_other_chunks(sessions_dir):
+    wrong = chunks_manifest_digest(list(reversed(digests())))
+    with pytest.raises(UploadError) as e:
+        complete_upload(upload(), 1, str(sessions_dir), chunks_sha256=wrong)
+    assert e.value.status_code == 422
+
+
+def test_chunk_with_bad_checksum_is_rejected():
+    upload_id = init_upload(1, "reunion.wav", len(DATA), chunk_size=CHUNK)["upload_id"]
+    with pytest.raises(UploadError):
+        write_chunk(upload_id, 1, 0, DATA[:CHUNK], "0" * 64)
+    assert upload_status(upload_id, 1)["missing"] == [0, 1, 2]
+
+
+def test_complete_with_missing_chunks_is_a_conflict(sessions_dir):
+    with pytest.raises(UploadError) as e:
+        complete_upload(upload(order=(0, 2)), 1, str(sessions_dir))
+    assert e.value.status_code == 409
+
+
+def test_chunk_writes_keep_an_active_session_alive():
+    upload_id = init_upload(1, "reunion.wav", len(DATA), chunk_size=CHUNK)["upload_id"]
+    session_dir = chunked_upload._session_dir(upload_id)
+    os.utime(session_dir, (0, 0))
+    write_chunk(upload_id, 1, 0, DATA[:CHUNK])
+    cleanup_expired_sessions()
+    assert os.path.isdir(session_dir)
+
+    os.utime(session_dir, (0, 0))
+    cleanup_expired_sessions()
+    assert not os.path.exists(session_dir)
@@ -0,0 +1,46 @@
+# backend/tests/test_compaction.py
+from IA.compaction import compact_segments, expand_segments
+
+
+def seg(start, end, text, speaker="SPEAKER_00"):
+    return {"start": start, "end": end, "speaker": speaker, "text": text}
+
+
+SEGMENTS = [
+    seg(0.0, 2.0, "Bonjour à tous."),
+    seg(2.3, 4.0, " On commence ?"),
+    seg(4.5, 6.0, "Oui.", "SPEAKER_01"),
+    seg(9.0, 10.0, "Allons-y.", "SPEAKER_01"),
+]
+
+
+def test_consecutive_turns_of_a_speaker_are_merged():
+    compacted = list(compact_segments(SEGMENTS, max_seconds=60, max_gap=1.0))
+    assert [(s["start"], s["end"], s["text"]) for s in compacted] == [
+        (0.0, 4.0, "Bonjour à tous. On commence ?"),
+        (4.5, 6.0, "Oui."),
+        (9.0, 10.0, "Allons-y."),
+    ]
+    assert compacted[0]["offsets"] == [[0.0, 2.0, 0], [2.3, 4.0, 16]]
+    assert "offsets" not in compacted[1]
+
+
+def test_expand_restores_original_segments():
+    compacted = compact_segments(SEGMENTS, max_seconds=60, max_gap=1.0)
+    expanded = list(expand_segments(compacted))
+    assert [(s["start"], s["end"], s["text"]) for s in expanded] == [
+        (s["start"], s["end"], s["text"].strip()) for s in SEGMENTS
+    ]
+
+
+def test_compaction_is_idempotent():
+    once = list(compact_segments(SEGMENTS, max_seconds=60, max_gap=1.0))
+    twice = list(compact_segments(once, max_seconds=60, max_gap=1.0))
+    assert twice == once
+
+
+def test_max_seconds_bounds_merged_turns():
+    segments = [seg(float(i), float(i) + 1, f"mot{i}") for i in range(10)]
+    compacted = list(compact_segments(segments, max_seconds=4, max_gap=1.0))
+    assert all(s["end"] - s["start"] <= 4 for s in compacted)
+    assert len(compacted) == 3
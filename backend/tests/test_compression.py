@@ -0,0 +1,35 @@
+# backend/tests/test_compression.py
+from IA.compression import compress_text, estimate_tokens, split_sentences
+
+FILLER = [
+    "Le projet avance correctement selon l'équipe technique du client.",
+    "Les tests de performance montrent une amélioration nette des temps de réponse.",
+    "La documentation utilisateur reste incomplète sur plusieurs écrans importants.",
+    "Le serveur de préproduction a été redémarré plusieurs fois cette semaine.",
+]
+DECISION = "On a décidé de livrer la version deux avant vendredi prochain."
+
+
+def test_text_under_budget_is_unchanged():
+    text = " ".join(FILLER)
+    assert compress_text(text, token_budget=10_000) == text
+
+
+def test_compressed_text_fits_budget_and_keeps_decisions():
+    text = " ".join(FILLER * 20 + [DECISION] + FILLER * 20)
+    compressed = compress_text(text, token_budget=100)
+    assert estimate_tokens(compressed) <= 100
+    assert DECISION in compressed
+
+
+def test_redundant_sentences_are_dropped_and_order_is_kept():
+    text = " ".join(FILLER * 20)
+    sentences = split_sentences(compress_text(text, token_budget=200))
+    assert len(sentences) == len(set(sentences))
+    order = [FILLER.index(s) for s in sentences]
+    assert order == sorted(order)
+
+
+def test_single_sentence_longer_than_budget_is_cut():
+    text = "mot " * 500
+    assert len(compress_text(text, token_budget=10)) <= 40
@@ -0,0 +1,47 @@
+# backend/tests/test_exports.py
+import pytest
+
+from app.exports import reshape_cues, split_cue
+
+
+def cue(start, end, text, speaker="SPEAKER_00"):
+    return {"start": start, "end": end, "speaker": speaker, "text": text}
+
+
+def test_split_cue_never_exceeds_max_duration():
+    parts = list(split_cue(cue(0.0, 10.0, "a b c d e"), max_duration=3))
+    assert all(p["end"] - p["start"] <= 3 + 1e-9 for p in parts)
+    assert " ".join(p["text"] for p in parts) == "a b c d e"
+    assert parts[0]["start"] == 0.0 and parts[-1]["end"] == 10.0
+
+
+def test_split_cue_with_fewer_words_than_slices_skips_empty_slices():
+    parts = list(split_cue(cue(5.0, 15.0, "a b"), max_duration=3))
+    assert [p["text"] for p in parts] == ["a", "b"]
+    assert all(p["end"] - p["start"] <= 3 + 1e-9 for p in parts)
+
+
+def test_split_cue_short_or_empty_cue_unchanged():
+    short = cue(0.0, 2.0, "a b c")
+    assert list(split_cue(short, max_duration=3)) == [short]
+    empty = cue(0.0, 10.0, "")
+    assert list(split_cue(empty, max_duration=3)) == [empty]
+
+
+def test_reshape_merges_same_speaker_within_gap():
+    cues = [cue(0.0, 1.0, "a"), cue(1.5, 2.0, "b"), cue(2.2, 3.0, "c", "SPEAKER_01")]
+    merged = list(reshape_cues(cues, merge=True, max_gap=1.0))
+    assert [(c["start"], c["end"], c["text"]) for c in merged] == [(0.0, 2.0, "a b"), (2.2, 3.0, "c")]
+
+
+def test_reshape_merge_respects_max_duration():
+    cues = [cue(0.0, 2.0, "a"), cue(2.1, 4.0, "b")]
+    merged = list(reshape_cues(cues, max_duration=3, merge=True))
+    assert [c["text"] for c in merged] == ["a", "b"]
+
+
+def test_reshape_splits_long_cues():
+    cues = [cue(0.0, 9.0, "un deux trois quatre cinq six")]
+    parts = list(reshape_cues(cues, max_duration=3))
+    assert len(parts) == 3
+    assert parts[-1]["end"] == pytest.approx(9.0)
@@ -0,0 +1,29 @@
+# backend/tests/test_passwords.py
+import asyncio
+
+import pytest
+
+from app import passwords
+from app.passwords import hash_password, hash_rounds, needs_rehash, verify_password_async
+
+
+@pytest.fixture(autouse=True)
+def cheap_rounds(monkeypatch):
+    # Coût minimal de bcrypt pour que les tests restent rapides
+    monkeypatch.setattr(passwords, "BCRYPT_ROUNDS", 5)
+
+
+def test_needs_rehash_compares_the_cost_with_bcrypt_rounds():
+    assert hash_rounds(hash_password("secret", rounds=4)) == 4
+    assert needs_rehash(hash_password("secret", rounds=4))
+    assert not needs_rehash(hash_password("secret"))
+    assert needs_rehash("pas un hash bcrypt")
+
+
+def test_login_returns_a_new_hash_only_when_the_cost_changed():
+    old = hash_password("secret", rounds=4)
+    valid, new_hash = asyncio.run(verify_password_async("secret", old))
+    assert valid and hash_rounds(new_hash) == 5
+
+    assert asyncio.run(verify_password_async("secret", new_hash)) == (True, None)
+    assert asyncio.run(verify_password_async("autre", old)) == (False, None)
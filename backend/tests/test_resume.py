@@ -0,0 +1,70 @@
+# backend/tests/test_resume.py
+import json
+
+import pytest
+
+from IA import resume
+from IA.resume import parse_structured_report, speaker_budgets, speaker_excerpts
+
+REPORT = "# RÉSUMÉ EXÉCUTIF\nPoint d'étape du projet.\n\n# DÉCISIONS PRISES\n- Livraison vendredi"
+
+
+def response(**fields):
+    return json.dumps({"compte_rendu": REPORT, "resumes_par_intervenant": {}, **fields})
+
+
+def test_valid_response_is_parsed():
+    parsed = parse_structured_report(
+        response(resume_court="Point d'étape.", resumes_par_intervenant={"SPEAKER_00": "Présente le planning."}),
+        ["SPEAKER_00"]
+    )
+    assert parsed == {
+        "compte_rendu_complet": REPORT,
+        "resume_court": "Point d'étape.",
+        "speaker_summaries": {"SPEAKER_00": "Présente le planning."},
+    }
+
+
+def test_speaker_keys_are_matched_loosely_and_unknown_keys_ignored():
+    parsed = parse_structured_report(
+        response(resumes_par_intervenant={" speaker_00 ": "A.", "Inconnu": "B.", "Julien": ""}),
+        ["SPEAKER_00", "Julien"]
+    )
+    assert parsed["speaker_summaries"] == {"SPEAKER_00": "A."}
+
+
+def test_missing_short_summary_falls_back_to_first_paragraph():
+    parsed = parse_structured_report(response(resumes_par_intervenant={"A": "x"}), ["A"])
+    assert parsed["resume_court"] == "# DÉCISIONS PRISES\n- Livraison vendredi"
+
+
+@pytest.mark.parametrize("content", [
+    "pas du json",
+    "[]",
+    json.dumps({"compte_rendu": " ", "resumes_par_intervenant": {"A": "x"}}),
+    json.dumps({"compte_rendu": REPORT}),
+    json.dumps({"compte_rendu": REPORT, "resumes_par_intervenant": {"B": "x"}}),
+])
+def test_invalid_responses_are_rejected(content):
+    with pytest.raises(ValueError):
+        parse_structured_report(content, ["A"])
+
+
+def test_speaker_budgets_are_proportional_with_a_floor():
+    budgets = speaker_budgets({"A": "x" * 40_000, "B": "x" * 10_000, "C": "x" * 40}, token_budget=1000)
+    assert budgets["A"] == pytest.approx(4 * budgets["B"], abs=4)
+    assert budgets["C"] == 10
+    assert budgets["A"] + budgets["B"] <= 1000
+
+
+
+def test_speaker_excerpts_fit_their_share_and_follow_the_compression_flag(monkeypatch):
+    sentence = "Nous devons livrer le module de facturation avant la fin du mois. "
+    texts = {"A": sentence * 200, "B": sentence * 50}
+    budgets = speaker_budgets(texts, token_budget=400)
+    excerpts = speaker_excerpts(texts, token_budget=400)
+    for speaker in texts:
+        assert len(excerpts[speaker]) <= budgets[speaker] * 4
+    monkeypatch.setattr(resume, "PROMPT_COMPRESSION", False)
+    truncated = speaker_excerpts(texts, token_budget=400)
+    assert truncated == {speaker: texts[speaker][:budgets[speaker] * 4] for speaker in texts}
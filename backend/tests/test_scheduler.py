@@ -0,0 +1,56 @@
+# backend/tests/test_scheduler.py
+import threading
+import time
+
+from app.scheduler import JobScheduler
+
+
+def noop(audio_id):
+    pass
+
+
+def test_eta_follows_shortest_job_first():
+    scheduler = JobScheduler(noop, workers=1, user_max_jobs=1, speed_factor=1.0)
+    scheduler.submit(1, user_id=1, duration=30)
+    scheduler.submit(2, user_id=2, duration=10)
+    assert scheduler.estimate(2) == {"status": "queued", "position": 1, "eta_seconds": 10}
+    assert scheduler.estimate(1) == {"status": "queued", "position": 2, "eta_seconds": 40}
+    assert scheduler.estimate(3) is None
+
+
+def test_eta_waits_for_the_user_limit():
+    scheduler = JobScheduler(noop, workers=2, user_max_jobs=1, speed_factor=1.0)
+    scheduler.submit(1, user_id=1, duration=10)
+    scheduler.submit(2, user_id=1, duration=20)
+    scheduler.submit(3, user_id=2, duration=30)
+    # Le job 2 attend la fin du job 1 (même utilisateur) alors qu'un worker est libre
+    assert scheduler.estimate(2)["eta_seconds"] == 30
+    assert scheduler.estimate(3) == {"status": "queued", "position": 3, "eta_seconds": 40}
+
+
+def test_workers_run_shortest_eligible_job_first():
+    started = []
+    gate = threading.Event()
+
+    def run_job(audio_id):
+        started.append(audio_id)
+        gate.wait(5)
+
+    scheduler = JobScheduler(run_job, workers=2, user_max_jobs=1, speed_factor=1.0)
+    scheduler.submit(1, user_id=1, duration=30)
+    scheduler.submit(2, user_id=1, duration=10)
+    scheduler.submit(3, user_id=2, duration=20)
+    scheduler.start()
+
+    deadline = time.monotonic() + 5
+    while len(started) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # Deux workers, mais l'utilisateur 1 n'en occupe qu'un : le job 1 attend
+    assert sorted(started) == [2, 3]
+    assert scheduler.estimate(1)["position"] == 1
+    assert scheduler.estimate(2)["status"] == "running"
+
+    gate.set()
+    while len(started) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert started[-1] == 1
@@ -0,0 +1,83 @@
+# backend/tests/test_segment_store.py
+from app.segment_store import pack_block, unpack_block, read_segments
+
+SEGMENTS = [
+    {"start": 0.0, "end": 1.5, "speaker": "SPEAKER_00", "text": "Bonjour"},
+    {"start": 1.5, "end": 3.25, "speaker": "Julien", "text": "Salut, ça va ?"},
+    {"start": 3.5, "end": 9.0, "speaker": "SPEAKER_00", "text": "Oui. Et toi ?",
+     "offsets": [[0.0, 1.0, 0], [1.5, 5.5, 5]]},
+]
+
+
+def test_pack_block_dictionary_encodes_speakers():
+    block = pack_block(SEGMENTS)
+    assert block["speaker_dict"] == ["SPEAKER_00", "Julien"]
+    assert block["speaker_codes"] == [0, 1, 0]
+    assert block["text_offsets"] == [0, 7, 21, 34]
+    assert block["sub_offsets"] == [None, None, [[0.0, 1.0, 0], [1.5, 5.5, 5]]]
+
+
+def test_unpack_block_round_trip():
+    assert unpack_block(pack_block(SEGMENTS)) == SEGMENTS
+
+
+def test_block_without_compacted_segments_has_no_sub_offsets():
+    block = pack_block(SEGMENTS[:2])
+    assert block["sub_offsets"] is None
+    assert unpack_block(block) == SEGMENTS[:2]
+
+
+class BlocksCursor:
+    """Curseur factice : blocs filtrés comme en SQL"""
+
+    def __init__(self, blocks):
+        self.blocks = blocks
+        self.result = []
+
+    def execute(self, sql, params):
+        if "FROM transcription_blocks" in sql:
+            _, offset, end = params
+            self.result = [
+                b for b in self.blocks
+                if b["first_sequence"] + b["num_segments"] > offset and b["first_sequence"] < end
+            ]
+        else:
+            raise AssertionError(f"requête inattendue : {sql}")
+
+    def fetchall(self):
+        return self.result
+
+
+def test_read_segments_only_unpacks_blocks_overlapping_the_page():
+    segments = [
+        {"start": float(i), "end": i + 1.0, "speaker": "SPEAKER_00", "text": f"s{i}"}
+        for i in range(10)
+    ]
+    blocks = [
+        {**pack_block(segments[i:i + 4]), "first_sequence": i, "num_segments": len(segments[i:i + 4])}
+        for i in range(0, 10, 4)
+    ]
+    cur = BlocksCursor(blocks)
+    page = read_segments(cur, 1, offset=3, limit=3, storage="blocks")
+    assert [s["seq"] for s in page] == [3, 4, 5]
+    assert [s["text"] for s in page] == ["s3", "s4", "s5"]
+    assert cur.result == blocks[:2]
+
+
+class RowsCursor:
+    def __init__(self):
+        self.queries = []
+
+    def execute(self, sql, params):
+        self.queries.append(sql)
+
+    def fetchall(self):
+        return [{"sequence_number": 3, "start_time": 3.0, "end_time": 4.0, "speaker": "SPEAKER_00",
+                 "text_brut": "s3", "sub_offsets": None}]
+
+
+def test_read_segments_rows_format_is_a_single_query():
+    cur = RowsCursor()
+    page = read_segments(cur, 1, offset=3, limit=1, storage="rows")
+    assert page == [{"seq": 3, "start": 3.0, "end": 4.0, "speaker": "SPEAKER_00", "text": "s3", "offsets": None}]
+    assert len(cur.queries) == 1 and "FROM transcriptions" in cur.queries[0]
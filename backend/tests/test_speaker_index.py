@@ -0,0 +1,43 @@
+# backend/tests/test_speaker_index.py
+import numpy as np
+
+from IA.speaker_index import SpeakerIndex
+
+
+def index(tmp_path):
+    idx = SpeakerIndex(str(tmp_path / "user_1"))
+    idx.add("Alice", [1.0, 0.0, 0.0])
+    idx.add("Bob", [[0.0, 1.0, 0.0], [0.0, 0.9, 0.1]])
+    return idx
+
+
+def test_identify_maps_clusters_to_the_closest_known_participant(tmp_path):
+    mapping = index(tmp_path).identify({
+        "SPEAKER_00": [0.9, 0.1, 0.0],
+        "SPEAKER_01": [0.1, 1.0, 0.0],
+        "SPEAKER_02": [0.0, 0.0, 1.0],                  # inconnu : sous le seuil
+        "SPEAKER_03": [np.nan, 0.0, 0.0],               # trop court pour Pyannote
+    }, threshold=0.6)
+    assert mapping == {"SPEAKER_00": "Alice", "SPEAKER_01": "Bob"}
+
+
+def test_identify_gives_a_participant_to_a_single_cluster(tmp_path):
+    mapping = index(tmp_path).identify({
+        "SPEAKER_00": [0.95, 0.05, 0.0],
+        "SPEAKER_01": [1.0, 0.0, 0.0],
+    }, threshold=0.6)
+    assert mapping == {"SPEAKER_01": "Alice"}
+
+
+def test_identify_with_an_empty_index(tmp_path):
+    assert SpeakerIndex(str(tmp_path)).identify({"SPEAKER_00": [1.0, 0.0]}) == {}
+
+
+def test_saved_index_identifies_the_same_way(tmp_path):
+    idx = index(tmp_path)
+    idx.save()
+    loaded = SpeakerIndex.load(1, index_dir=str(tmp_path))
+    assert loaded.participants == ["Alice", "Bob"]
+    assert loaded.identify({"SPEAKER_00": [0.0, 1.0, 0.05]}) == {"SPEAKER_00": "Bob"}
+    assert loaded.remove("Bob") == 2
+    assert loaded.identify({"SPEAKER_00": [0.0, 1.0, 0.05]}) == {}
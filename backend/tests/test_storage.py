@@ -0,0 +1,24 @@
+# backend/tests/test_storage.py
+from app.storage import _bitrate_bytes_per_second, remove_sidecars, sidecar_paths
+
+
+def test_bitrate_bytes_per_second():
+    assert _bitrate_bytes_per_second("24k") == 3000
+    assert _bitrate_bytes_per_second("24K") == 3000
+    assert _bitrate_bytes_per_second("64000") == 8000
+
+
+def test_sidecar_paths_never_include_the_original():
+    assert sidecar_paths("uploads/reunion.mp3") == ["uploads/reunion.wav", "uploads/reunion.speech.wav"]
+    assert sidecar_paths("uploads/reunion.wav") == ["uploads/reunion.speech.wav"]
+
+
+def test_remove_sidecars(tmp_path):
+    original = tmp_path / "reunion.mp3"
+    original.write_bytes(b"mp3")
+    (tmp_path / "reunion.wav").write_bytes(b"0" * 100)
+
+    assert remove_sidecars(str(original), dry_run=True) == 100
+    assert (tmp_path / "reunion.wav").exists()
+    assert remove_sidecars(str(original)) == 100
+    assert not (tmp_path / "reunion.wav").exists() and original.exists()
@@ -0,0 +1,40 @@
+# backend/tests/test_vad.py
+import numpy as np
+import pytest
+
+from IA.vad import TimeMap, detect_speech
+
+
+def test_time_map_projects_compressed_time_on_original():
+    # Parole de 2 à 5 s puis de 10 à 12 s : 5 s d'audio compressé
+    time_map = TimeMap([(2.0, 5.0), (10.0, 12.0)])
+    assert time_map.speech_seconds == 5.0
+    assert time_map.to_original(0.0) == 2.0
+    assert time_map.to_original(2.5) == 4.5
+    assert time_map.to_original(3.5) == 10.5
+    np.testing.assert_allclose(time_map.to_original([1.0, 4.0]), [3.0, 11.0])
+
+
+def test_time_map_clamps_past_the_end():
+    time_map = TimeMap([(2.0, 5.0)])
+    assert time_map.to_original(10.0) == 5.0
+
+
+def test_remap_segments_keeps_extra_fields():
+    time_map = TimeMap([(2.0, 5.0), (10.0, 12.0)])
+    segments = [{"start": 0.5, "end": 3.5, "speaker": "SPEAKER_00"}]
+    remapped = time_map.remap_segments(segments)
+    assert remapped == [{"start": 2.5, "end": 10.5, "speaker": "SPEAKER_00"}]
+    assert segments[0]["start"] == 0.5
+
+
+def test_empty_time_map_is_identity():
+    assert TimeMap([]).to_original(3.0) == 3.0
+
+
+def test_detect_speech_finds_loud_regions():
+    frame_ms = 30
+    energies = np.full(1000, -70.0)
+    energies[100:200] = -20.0
+    regions = detect_speech(energies, frame_ms=frame_ms, margin_db=12, min_silence=1.0, padding=0.0)
+    assert regions == [pytest.approx((3.0, 6.0))]
@@ -0,0 +1,86 @@
+# backend/tests/test_worker.py
+import pytest
+
+from app import worker
+from app.processing import LeaseLost, fence, owner_clause
+
+
+class FakeCursor:
+    """Curseur factice : enregistre les requêtes, rend les résultats dans l'ordre"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.queries = []
+
+    def execute(self, sql, params=None):
+        self.queries.append(" ".join(sql.split()))
+
+    def fetchone(self):
+        return self.results.pop(0)
+
+    def close(self):
+        pass
+
+
+class FakeConn:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.committed = self.rolled_back = False
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    def install(results):
+        conn = FakeConn(FakeCursor(results))
+        monkeypatch.setattr(worker, "connect", lambda: conn)
+        return conn
+    return install
+
+
+JOB = {"id_audio": 7, "id_user": 3, "duration": 60.0, "attempts": 1}
+
+
+def test_claim_rechecks_user_limit_under_lock(fake_db):
+    conn = fake_db([JOB, {"running": worker.SCHEDULER_USER_MAX_JOBS}])
+    assert worker.claim_job("w1") == JOB
+    assert conn.committed and not conn.rolled_back
+    queries = conn.cursor().queries
+    assert "FOR UPDATE" in queries[1] and "utilisateurs" in queries[1]
+    assert queries[2].startswith("SELECT COUNT(*)")
+
+
+def test_claim_over_user_limit_is_rolled_back(fake_db):
+    conn = fake_db([JOB, {"running": worker.SCHEDULER_USER_MAX_JOBS + 1}])
+    assert worker.claim_job("w1") is None
+    assert conn.rolled_back and not conn.committed
+
+
+def test_claim_without_job(fake_db):
+    conn = fake_db([None])
+    assert worker.claim_job("w1") is None
+    assert len(conn.cursor().queries) == 1
+
+
+def test_fence_raises_when_job_was_reclaimed():
+    with pytest.raises(LeaseLost):
+        fence(FakeCursor([None]), 7, "w1")
+
+
+def test_fence_and_owner_clause_are_noops_outside_worker_mode():
+    cur = FakeCursor([])
+    fence(cur, 7, None)
+    assert cur.queries == []
+    assert owner_clause(None) == ("", ())
+    assert owner_clause("w1") == (" AND worker_id = %s", ("w1",))
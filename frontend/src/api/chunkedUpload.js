@@ -0,0 +1,159 @@
+// Upload reprenable par morceaux : init → PUT morceau N (en parallèle) → complete
+// Protocole côté serveur : backend/app/chunked_upload.py
+import { request, ApiError } from './client'
+
+const DEFAULT_CONCURRENCY = 4
+const DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+const MAX_RETRIES = 5
+
+// Clé de reprise : même fichier (nom, taille, date de modification) → même session
+function resumeKey(file) {
+  return `meetvocal:upload:${file.name}:${file.size}:${file.lastModified}`
+}
+
+async function sha256Hex(buffer) {
+  const digest = await crypto.subtle.digest('SHA-256', buffer)
+  return Array.from(new Uint8Array(digest), (b) => b.toString(16).padStart(2, '0')).join('')
+}
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms))
+
+const chunkBlob = (file, chunkSize, index) =>
+  file.slice(index * chunkSize, Math.min((index + 1) * chunkSize, file.size))
+
+// Checksum du fichier complet à partir des SHA-256 des morceaux envoyés (WebCrypto
+// n'a pas de hash incrémental) : SHA-256 de leur concaténation, vérifié par /complete.
+// null si un hash manque (session reprise depuis un autre onglet ou un ancien client)
+async function chunksManifest(digests, total) {
+  if (digests.length !== total || digests.some((d) => !d)) return null
+  return sha256Hex(new TextEncoder().encode(digests.join('')))
+}
+
+// Session et hash des morceaux déjà acceptés, conservés pour la reprise
+function saveSession(session) {
+  localStorage.setItem(session.key, JSON.stringify({ uploadId: session.uploadId, digests: session.digests }))
+}
+
+function loadSession(key) {
+  const stored = localStorage.getItem(key)
+  if (!stored) return null
+  try {
+    return JSON.parse(stored)
+  } catch {
+    return { uploadId: stored, digests: [] }
+  }
+}
+
+// Durée lue dans les métadonnées du fichier (null si le navigateur ne sait pas la lire) :
+// le serveur refuse dès /init un upload qui dépasserait le quota de minutes
+function audioDuration(file) {
+  return new Promise((resolve) => {
+    const url = URL.createObjectURL(file)
+    const audio = new Audio()
+    const done = (value) => {
+      URL.revokeObjectURL(url)
+      resolve(Number.isFinite(value) ? value : null)
+    }
+    audio.preload = 'metadata'
+    audio.onloadedmetadata = () => done(audio.duration)
+    audio.onerror = () => done(null)
+    audio.src = url
+  })
+}
+
+// Session existante (reprise) ou nouvelle session
+async function openSession(file, options, signal) {
+  const key = resumeKey(file)
+  const previous = loadSession(key)
+  if (previous) {
+    try {
+      const status = await request('GET', `/uploads/${previous.uploadId}`, { signal })
+      return {
+        key,
+        uploadId: previous.uploadId,
+        chunkSize: status.chunk_size,
+        missing: status.missing,
+        total: status.total_chunks,
+        digests: previous.digests ?? [],
+      }
+    } catch (e) {
+      if (!(e instanceof ApiError && e.status === 404)) throw e
+      localStorage.removeItem(key)
+    }
+  }
+
+  const duration = await audioDuration(file)
+  const session = await request('POST', '/uploads/init', {
+    signal,
+    body: {
+      filename: file.name,
+      size: file.size,
+      chunk_size: options.chunkSize || DEFAULT_CHUNK_SIZE,
+      duration,
+      title: options.title || null,
+      num_speakers: options.numSpeakers || null,
+      min_speakers: options.minSpeakers || null,
+      max_speakers: options.maxSpeakers || null,
+    },
+  })
+  const missing = Array.from({ length: session.total_chunks }, (_, i) => i)
+  const opened = { key, uploadId: session.upload_id, chunkSize: session.chunk_size, missing, total: session.total_chunks, digests: [] }
+  saveSession(opened)
+  return opened
+}
+
+async function putChunk(file, session, index, signal) {
+  // Hash calculé juste avant l'envoi : chaque morceau n'est lu qu'une fois
+  const buffer = await chunkBlob(file, session.chunkSize, index).arrayBuffer()
+  const checksum = await sha256Hex(buffer)
+
+  for (let attempt = 0; ; attempt++) {
+    try {
+      const result = await request('PUT', `/uploads/${session.uploadId}/chunks/${index}`, {
+        body: buffer,
+        headers: { 'X-Chunk-SHA256': checksum },
+        signal,
+      })
+      session.digests[index] = checksum
+      saveSession(session)
+      return result
+    } catch (e) {
+      // Erreurs client (hors 408/429) : inutile de réessayer
+      const retryable = !(e instanceof ApiError) || e.status >= 500 || e.status === 408 || e.status === 429
+      if (signal?.aborted || !retryable || attempt >= MAX_RETRIES) throw e
+      await sleep(Math.min(1000 * 2 ** attempt, 15000))
+    }
+  }
+}
+
+/**
+ * Envoie `file` par morceaux, `concurrency` à la fois, et reprend là où une
+ * tentative précédente s'est arrêtée. onProgress({ sent, total, percent }).
+ * Retourne la réponse de /complete (id_audio, position, ETA...).
+ */
+export async function uploadFile(file, options = {}) {
+  const { concurrency = DEFAULT_CONCURRENCY, onProgress, signal } = options
+  const session = await openSession(file, options, signal)
+
+  const queue = [...session.missing]
+  let sent = session.total - queue.length
+  const report = () => onProgress?.({ sent, total: session.total, percent: Math.round((100 * sent) / session.total) })
+  report()
+
+  const worker = async () => {
+    while (queue.length) {
+      const index = queue.shift()
+      await putChunk(file, session, index, signal)
+      sent++
+      report()
+    }
+  }
+  await Promise.all(Array.from({ length: Math.min(concurrency, queue.length) }, worker))
+
+  const result = await request('POST', `/uploads/${session.uploadId}/complete`, {
+    signal,
+    body: { chunks_sha256: await chunksManifest(session.digests, session.total) },
+  })
+  localStorage.removeItem(session.key)
+  return result
+}
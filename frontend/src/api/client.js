@@ -0,0 +1,50 @@
+// Client HTTP de l'API MeetVocal (token JWT conservé dans localStorage)
+
+export const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000'
+
+const TOKEN_KEY = 'meetvocal:token'
+
+export function getToken() {
+  return localStorage.getItem(TOKEN_KEY)
+}
+
+export function setToken(token) {
+  if (token) localStorage.setItem(TOKEN_KEY, token)
+  else localStorage.removeItem(TOKEN_KEY)
+}
+
+export class ApiError extends Error {
+  constructor(status, detail) {
+    super(typeof detail === 'string' ? detail : JSON.stringify(detail))
+    this.status = status
+    this.detail = detail
+  }
+}
+
+// Requête authentifiée ; `body` objet → JSON, Blob/ArrayBuffer → envoyé tel quel
+export async function request(method, path, { body, headers = {}, signal } = {}) {
+  const init = { method, headers: { ...headers }, signal }
+  const token = getToken()
+  if (token) init.headers.Authorization = `Bearer ${token}`
+
+  if (body instanceof Blob || body instanceof ArrayBuffer) {
+    init.body = body
+    init.headers['Content-Type'] ??= 'application/octet-stream'
+  } else if (body !== undefined) {
+    init.body = JSON.stringify(body)
+    init.headers['Content-Type'] = 'application/json'
+  }
+
+  const response = await fetch(`${API_URL}${path}`, init)
+  const data = response.headers.get('content-type')?.includes('application/json')
+    ? await response.json()
+    : await response.text()
+  if (!response.ok) throw new ApiError(response.status, data?.detail ?? data)
+  return data
+}
+
+export async function login(email, password) {
+  const data = await request('POST', '/login', { body: { email, password } })
+  setToken(data.access_token)
+  return data
+}
@@ -0,0 +1,46 @@
+// Compte-rendu régénéré en streaming (Server-Sent Events sur une requête POST)
+import { API_URL, ApiError, getToken } from './client'
+
+// Découpe un flux SSE en événements { event, data }
+function* parseEvents(buffer) {
+  for (const block of buffer) {
+    let event = 'message'
+    const data = []
+    for (const line of block.split('\n')) {
+      if (line.startsWith('event:')) event = line.slice(6).trim()
+      else if (line.startsWith('data:')) data.push(line.slice(5).trim())
+    }
+    if (data.length) yield { event, data: JSON.parse(data.join('\n')) }
+  }
+}
+
+// onDelta(texte) à chaque fragment, onSection({ titre, contenu }) par section terminée ;
+// résout avec { compte_rendu_complet, resume_court } une fois enregistré côté serveur
+export async function streamCompteRendu(audioId, { onDelta, onSection, signal } = {}) {
+  const response = await fetch(`${API_URL}/fichiers/${audioId}/compte-rendu/stream`, {
+    method: 'POST',
+    headers: { Authorization: `Bearer ${getToken()}` },
+    signal,
+  })
+  if (!response.ok) {
+    const data = await response.json().catch(() => ({}))
+    throw new ApiError(response.status, data.detail ?? response.statusText)
+  }
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader()
+  let pending = ''
+  for (;;) {
+    const { value, done } = await reader.read()
+    if (done) break
+    pending += value
+    const blocks = pending.split('\n\n')
+    pending = blocks.pop()
+    for (const { event, data } of parseEvents(blocks)) {
+      if (event === 'delta') onDelta?.(data)
+      else if (event === 'section') onSection?.(data)
+      else if (event === 'error') throw new ApiError(502, data.detail)
+      else if (event === 'done') return data
+    }
+  }
+  throw new ApiError(502, 'Flux interrompu avant la fin du compte-rendu')
+}
@@ -0,0 +1,37 @@
+// Lecture paginée de la transcription d'une réunion
+import { request } from './client'
+
+export const PAGE_SIZE = 200
+
+export function fetchFichiers() {
+  return request('GET', '/fichiers')
+}
+
+export function fetchSegmentIndex(audioId) {
+  return request('GET', `/fichiers/${audioId}/segments/index`)
+}
+
+export function fetchSegmentPage(audioId, page, signal) {
+  return request('GET', `/fichiers/${audioId}/segments?offset=${page * PAGE_SIZE}&limit=${PAGE_SIZE}`, { signal })
+}
+
+// Premier segment commençant à `seconds` ou après (recherche dichotomique sur l'index)
+export function findSegmentAt(starts, seconds) {
+  let lo = 0
+  let hi = starts.length
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1
+    if (starts[mid] < seconds) lo = mid + 1
+    else hi = mid
+  }
+  return Math.min(lo, starts.length - 1)
+}
+
+export function formatTime(seconds) {
+  const h = Math.floor(seconds / 3600)
+  const m = Math.floor((seconds % 3600) / 60)
+  const s = Math.floor(seconds % 60)
+  const mm = String(m).padStart(2, '0')
+  const ss = String(s).padStart(2, '0')
+  return h ? `${h}:${mm}:${ss}` : `${mm}:${ss}`
+}